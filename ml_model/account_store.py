@@ -0,0 +1,325 @@
+"""
+Per-Account Aggregate Store
+Offline build of per-account transaction aggregates from the PaySim data,
+served through a compact open-addressing index with O(1) lookups
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from fraud_db import FraudDatabase
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.path.join(SCRIPT_DIR, 'account_aggregates.joblib')
+CSV_PATH = os.path.join(SCRIPT_DIR, 'PS_20174392719_1491204439457_log.csv')
+
+# Same order as the LabelEncoder fitted in train_fraud_model.py
+TRANSACTION_TYPES = ['CASH_IN', 'CASH_OUT', 'DEBIT', 'PAYMENT', 'TRANSFER']
+
+# Key tags stored in the two low bits of an encoded account ID
+_TAG_CUSTOMER = 1
+_TAG_MERCHANT = 2
+_TAG_HASHED = 3
+
+_FIB_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def encode_account_id(account_id: str) -> int:
+    """
+    Map an account ID to a non-zero int64 key
+
+    PaySim IDs ('C1231006815', 'M1979787155') encode losslessly as
+    number * 4 + tag; anything else falls back to a 61-bit hash.
+    """
+    account_id = str(account_id)
+    prefix, digits = account_id[:1], account_id[1:]
+    if prefix in ('C', 'M') and digits.isdigit() and len(digits) <= 17:
+        return int(digits) * 4 + (_TAG_CUSTOMER if prefix == 'C' else _TAG_MERCHANT)
+    digest = hashlib.blake2b(account_id.encode('utf-8'), digest_size=8).digest()
+    return (int.from_bytes(digest, 'little') >> 3) * 4 + _TAG_HASHED
+
+
+def decode_account_key(key: int) -> Optional[str]:
+    """Inverse of encode_account_id for PaySim IDs (hashed keys can't be decoded)"""
+    key = int(key)
+    tag = key & 3
+    if tag == _TAG_HASHED:
+        return None
+    return f"{'C' if tag == _TAG_CUSTOMER else 'M'}{key >> 2}"
+
+
+def encode_account_ids(account_ids) -> np.ndarray:
+    """Vectorized encode_account_id for a column of IDs"""
+    ids = pd.Series(account_ids, dtype=object).astype(str)
+    prefix = ids.str[:1]
+    digits = ids.str[1:]
+    numeric = prefix.isin(['C', 'M']) & digits.str.fullmatch(r'\d{1,17}')
+    keys = np.empty(len(ids), dtype=np.int64)
+    if numeric.any():
+        tags = np.where(prefix[numeric] == 'C', _TAG_CUSTOMER, _TAG_MERCHANT)
+        keys[numeric.to_numpy()] = digits[numeric].astype(np.int64).to_numpy() * 4 + tags
+    if not numeric.all():
+        rest = ~numeric.to_numpy()
+        keys[rest] = [encode_account_id(v) for v in ids[~numeric]]
+    return keys
+
+
+class AccountIndex:
+    """Open-addressing hash table mapping encoded account keys to row numbers"""
+
+    def __init__(self, slots: np.ndarray, rows: np.ndarray):
+        self.slots = slots
+        self.rows = rows
+        self.mask = len(slots) - 1
+        self.shift = np.uint64(64 - int(len(slots)).bit_length() + 1)
+
+    @classmethod
+    def build(cls, keys: np.ndarray, load_factor: float = 0.6) -> 'AccountIndex':
+        """Build a table for unique non-zero keys with linear probing"""
+        capacity = 1 << max(4, int(np.ceil(np.log2(max(len(keys), 1) / load_factor))))
+        index = cls(np.zeros(capacity, dtype=np.int64), np.full(capacity, -1, dtype=np.int32))
+
+        pending = np.arange(len(keys))
+        probe = index._home(keys)
+        while len(pending):
+            # Each round, the first pending key per empty slot claims it; the rest move on
+            empty = index.slots[probe] == 0
+            candidates = pending[empty]
+            slots_wanted = probe[empty]
+            _, first = np.unique(slots_wanted, return_index=True)
+            winners = candidates[first]
+            index.slots[slots_wanted[first]] = keys[winners]
+            index.rows[slots_wanted[first]] = winners
+
+            placed = np.zeros(len(pending), dtype=bool)
+            placed[np.flatnonzero(empty)[first]] = True
+            pending = pending[~placed]
+            probe = (probe[~placed] + 1) & index.mask
+        return index
+
+    def _home(self, keys) -> np.ndarray:
+        hashed = np.asarray(keys, dtype=np.int64).astype(np.uint64) * _FIB_MULTIPLIER
+        return (hashed >> self.shift).astype(np.int64) & self.mask
+
+    def get(self, key: int) -> int:
+        """Row number for a key, or -1 when absent"""
+        slots = self.slots
+        slot = int(((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> int(self.shift)) & self.mask
+        while True:
+            found = slots[slot]
+            if found == key:
+                return int(self.rows[slot])
+            if found == 0:
+                return -1
+            slot = (slot + 1) & self.mask
+
+    def get_many(self, keys: np.ndarray) -> np.ndarray:
+        """Vectorized get() for an array of keys"""
+        keys = np.asarray(keys, dtype=np.int64)
+        result = np.full(len(keys), -1, dtype=np.int32)
+        pending = np.arange(len(keys))
+        probe = self._home(keys)
+        while len(pending):
+            found = self.slots[probe]
+            hit = found == keys[pending]
+            result[pending[hit]] = self.rows[probe[hit]]
+            active = ~hit & (found != 0)
+            pending = pending[active]
+            probe = (probe[active] + 1) & self.mask
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        return self.slots.nbytes + self.rows.nbytes
+
+
+def _chunk_partials(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate one chunk of transactions by account, both as sender and recipient"""
+    type_codes = pd.Categorical(chunk['type'], categories=TRANSACTION_TYPES).codes
+    frames = []
+    for role, column in (('sent', 'nameOrig'), ('received', 'nameDest')):
+        frame = pd.DataFrame({
+            'key': encode_account_ids(chunk[column].to_numpy()),
+            'n_sent': int(role == 'sent'),
+            'n_received': int(role == 'received'),
+            'amount_sum': chunk['amount'].to_numpy(dtype=np.float64),
+            'amount_max': chunk['amount'].to_numpy(dtype=np.float64),
+            'fraud_count': chunk['is_fraud'].to_numpy(dtype=np.int64),
+            'first_step': chunk['step'].to_numpy(dtype=np.int64),
+            'last_step': chunk['step'].to_numpy(dtype=np.int64),
+        })
+        for code, name in enumerate(TRANSACTION_TYPES):
+            frame[name] = (type_codes == code).astype(np.int64)
+        frames.append(frame)
+    return _combine(pd.concat(frames, ignore_index=True))
+
+
+def _combine(partials: pd.DataFrame) -> pd.DataFrame:
+    """Merge partial aggregates that share an account key"""
+    reducers = {
+        'n_sent': 'sum', 'n_received': 'sum', 'amount_sum': 'sum', 'amount_max': 'max',
+        'fraud_count': 'sum', 'first_step': 'min', 'last_step': 'max',
+        **{name: 'sum' for name in TRANSACTION_TYPES}
+    }
+    return partials.groupby('key', sort=False).agg(reducers).reset_index()
+
+
+def iter_database_chunks(chunk_size: int = 500000) -> Iterator[pd.DataFrame]:
+    """Stream the fraud_training_data table in DataFrame chunks"""
+    columns = ['step', 'type', 'amount', 'nameOrig', 'nameDest', 'is_fraud']
+    db = FraudDatabase()
+    for rows in db.iterate('account_transactions', batch_size=chunk_size):
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def iter_csv_chunks(csv_path: str, chunk_size: int = 500000) -> Iterator[pd.DataFrame]:
+    """Stream the PaySim CSV in DataFrame chunks"""
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size,
+                             usecols=['step', 'type', 'amount', 'nameOrig', 'nameDest', 'isFraud']):
+        yield chunk.rename(columns={'isFraud': 'is_fraud'})
+
+
+def build_store(chunks: Iterable[pd.DataFrame]) -> Dict:
+    """Aggregate transaction chunks into the compact columnar store layout"""
+    partials = []
+    n_transactions = 0
+    for chunk in chunks:
+        n_transactions += len(chunk)
+        partials.append(_chunk_partials(chunk))
+        print(f"   Aggregated {n_transactions:,} transactions", end='\r')
+    print()
+
+    if not partials:
+        raise ValueError("No transactions found to aggregate")
+    totals = _combine(pd.concat(partials, ignore_index=True)) if len(partials) > 1 else partials[0]
+    keys = totals['key'].to_numpy(dtype=np.int64)
+    index = AccountIndex.build(keys)
+
+    return {
+        'keys': keys,
+        'slots': index.slots,
+        'rows': index.rows,
+        'n_sent': totals['n_sent'].to_numpy(dtype=np.uint32),
+        'n_received': totals['n_received'].to_numpy(dtype=np.uint32),
+        'amount_sum': totals['amount_sum'].to_numpy(dtype=np.float64),
+        'amount_max': totals['amount_max'].to_numpy(dtype=np.float64),
+        'fraud_count': totals['fraud_count'].to_numpy(dtype=np.uint32),
+        'type_counts': totals[TRANSACTION_TYPES].to_numpy(dtype=np.uint32),
+        'first_step': totals['first_step'].to_numpy(dtype=np.int32),
+        'last_step': totals['last_step'].to_numpy(dtype=np.int32),
+        'transaction_types': TRANSACTION_TYPES,
+        'n_transactions': n_transactions
+    }
+
+
+class AccountAggregateStore:
+    """Read side of the aggregate store: O(1) per-account lookups"""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.index = AccountIndex(data['slots'], data['rows'])
+        self.transaction_types = list(data['transaction_types'])
+        # Last step of the whole dataset, the "now" that account activity is measured against
+        self.final_step = int(data['last_step'].max()) if len(data['last_step']) else 0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional['AccountAggregateStore']:
+        """Memory-map a built store, or return None if it hasn't been built"""
+        path = path or STORE_PATH
+        if not os.path.exists(path):
+            return None
+        data = joblib.load(path, mmap_mode='r')
+        # Plain ndarray views over the mapping index faster than np.memmap
+        return cls({k: np.asarray(v) if isinstance(v, np.ndarray) else v for k, v in data.items()})
+
+    def __len__(self) -> int:
+        return len(self.data['keys'])
+
+    def _row_to_dict(self, row: int) -> Dict:
+        d = self.data
+        n_sent = int(d['n_sent'][row])
+        n_received = int(d['n_received'][row])
+        n_total = n_sent + n_received
+        type_counts = {
+            name: int(count)
+            for name, count in zip(self.transaction_types, d['type_counts'][row]) if count
+        }
+        return {
+            'transaction_count': n_total,
+            'sent_count': n_sent,
+            'received_count': n_received,
+            'amount_sum': float(d['amount_sum'][row]),
+            'amount_avg': float(d['amount_sum'][row]) / n_total if n_total else 0.0,
+            'amount_max': float(d['amount_max'][row]),
+            'fraud_count': int(d['fraud_count'][row]),
+            'type_counts': type_counts,
+            'first_step': int(d['first_step'][row]),
+            'last_step': int(d['last_step'][row]),
+            'idle_steps': self.final_step - int(d['last_step'][row])
+        }
+
+    def lookup(self, account_id: str) -> Optional[Dict]:
+        """Aggregates for one account ID, or None if it never transacted"""
+        row = self.index.get(encode_account_id(account_id))
+        return self._row_to_dict(row) if row >= 0 else None
+
+    def lookup_many(self, account_ids: List[str]) -> List[Optional[Dict]]:
+        """Aggregates for many account IDs in one vectorized probe"""
+        rows = self.index.get_many(encode_account_ids(account_ids))
+        return [self._row_to_dict(row) if row >= 0 else None for row in rows]
+
+    def get_info(self) -> Dict:
+        nbytes = sum(v.nbytes for v in self.data.values() if isinstance(v, np.ndarray))
+        return {
+            'accounts': len(self),
+            'transactions': int(self.data['n_transactions']),
+            'memory_mb': round(nbytes / 1e6, 2)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the per-account aggregate store')
+    parser.add_argument('--csv', nargs='?', const=CSV_PATH, default=None,
+                        help='Read the PaySim CSV instead of fraud_training_data')
+    parser.add_argument('--output', default=STORE_PATH, help='Where to write the store')
+    parser.add_argument('--chunk-size', type=int, default=500000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BUILDING ACCOUNT AGGREGATE STORE")
+    print("=" * 60)
+    print(f"\nSource: {args.csv or 'fraud_training_data'}")
+
+    start = time.perf_counter()
+    chunks = iter_csv_chunks(args.csv, args.chunk_size) if args.csv else iter_database_chunks(args.chunk_size)
+    data = build_store(chunks)
+    build_time = time.perf_counter() - start
+
+    joblib.dump(data, args.output)
+    store = AccountAggregateStore.load(args.output)
+    info = store.get_info()
+
+    # Measure lookup throughput on a sample of real keys
+    sample = [a for a in map(decode_account_key, data['keys'][:5000]) if a]
+    start = time.perf_counter()
+    for account_id in sample:
+        store.lookup(account_id)
+    lookup_us = (time.perf_counter() - start) / max(len(sample), 1) * 1e6
+
+    print(f"\nAccounts: {info['accounts']:,}")
+    print(f"Transactions: {info['transactions']:,}")
+    print(f"Build time: {build_time:.1f}s")
+    print(f"Store size: {os.path.getsize(args.output) / 1e6:.1f} MB")
+    print(f"Lookup latency: {lookup_us:.1f} µs ({1e6 / lookup_us if lookup_us else 0:,.0f} lookups/sec)")
+    print(f"\nStore saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
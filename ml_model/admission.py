@@ -0,0 +1,159 @@
+"""
+Admission Control
+Bound the number of requests scoring with the model at once. Requests wait
+for a slot only until their route's queue-time deadline; past it, or when too
+many are already waiting, they are shed to the rule-only fallback scorer
+instead of piling up behind the workers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Longest a request may have been queued before it is scored, per route
+DEFAULT_DEADLINES_MS = {
+    '/api/predict': 250,
+    '/api/analyze': 250,
+    '/api/analyze/sweep': 250,
+    '/api/predict/batch': 2000,
+    'unix-socket': 250,          # socket_server.SOCKET_ROUTE
+}
+DEFAULT_DEADLINE_MS = 500
+
+
+def parse_request_start(header: Optional[str]) -> Optional[float]:
+    """
+    Epoch seconds from an X-Request-Start header set by the proxy in front
+    of the server ('t=1700000000.123', or milli/microseconds since the epoch)
+    """
+    if not header:
+        return None
+    try:
+        value = float(header.strip().removeprefix('t='))
+    except ValueError:
+        return None
+    if value > 1e14:
+        return value / 1e6
+    if value > 1e11:
+        return value / 1e3
+    return value
+
+
+def parse_deadlines(spec: str) -> Dict[str, float]:
+    """'/api/predict=200,/api/predict/batch=3000' -> {route: milliseconds}"""
+    deadlines = {}
+    for item in spec.split(','):
+        if '=' in item:
+            route, ms = item.split('=', 1)
+            deadlines[route.strip()] = float(ms)
+    return deadlines
+
+
+class _RouteStats:
+    def __init__(self):
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class AdmissionController:
+    """In-flight limit with a bounded wait queue and per-route deadlines"""
+
+    def __init__(self, max_in_flight: int = 4, max_queued: int = 16,
+                 deadlines_ms: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            max_in_flight: Requests allowed to score with the model at once
+            max_queued: Requests allowed to wait for a slot; more are shed at once
+            deadlines_ms: Overrides for DEFAULT_DEADLINES_MS
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.deadlines_ms = {**DEFAULT_DEADLINES_MS, **(deadlines_ms or {})}
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._stats: Dict[str, _RouteStats] = {}
+
+    def _route_stats(self, route: str) -> _RouteStats:
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = _RouteStats()
+        return stats
+
+    @contextmanager
+    def admit(self, route: str, request_start: Optional[float] = None) -> Iterator[Optional[str]]:
+        """
+        Hold a model slot for the block, or explain why none was granted
+
+        Args:
+            route: Request path, selects the deadline
+            request_start: Epoch seconds the request entered the proxy queue
+                (see parse_request_start); time spent there counts too
+
+        Yields:
+            None when admitted, else the shed reason ('queue_full' or
+            'deadline') to pass to FraudDetector as the fallback reason
+        """
+        deadline = self.deadlines_ms.get(route, DEFAULT_DEADLINE_MS) / 1000
+        waited_upstream = max(0.0, time.time() - request_start) if request_start else 0.0
+        start = time.perf_counter()
+
+        with self._lock:
+            stats = self._route_stats(route)
+            if self._queued >= self.max_queued:
+                stats.shed_queue_full += 1
+                reason = 'queue_full'
+            else:
+                self._queued += 1
+                reason = None
+
+        if reason is None:
+            remaining = deadline - waited_upstream
+            acquired = remaining > 0 and self._slots.acquire(timeout=remaining)
+            waited_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._queued -= 1
+                if acquired:
+                    self._in_flight += 1
+                    stats.admitted += 1
+                    stats.wait_ms_total += waited_ms
+                    stats.wait_ms_max = max(stats.wait_ms_max, waited_ms)
+                else:
+                    stats.shed_deadline += 1
+                    reason = 'deadline'
+
+        if reason is not None:
+            yield reason
+            return
+        try:
+            yield None
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            routes = {
+                route: {
+                    'admitted': s.admitted,
+                    'shed_queue_full': s.shed_queue_full,
+                    'shed_deadline': s.shed_deadline,
+                    'avg_wait_ms': round(s.wait_ms_total / s.admitted, 2) if s.admitted else None,
+                    'max_wait_ms': round(s.wait_ms_max, 2),
+                    'deadline_ms': self.deadlines_ms.get(route, DEFAULT_DEADLINE_MS)
+                }
+                for route, s in self._stats.items()
+            }
+            return {
+                'max_in_flight': self.max_in_flight,
+                'max_queued': self.max_queued,
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'routes': routes
+            }
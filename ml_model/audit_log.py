@@ -0,0 +1,338 @@
+"""
+Prediction Audit Log
+Asynchronous, batched, append-only audit trail of every scored transaction,
+plus a command line tool to query it
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIT_DIR = os.path.join(SCRIPT_DIR, 'audit')
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        endpoint TEXT NOT NULL,
+        transaction_id TEXT,
+        type TEXT,
+        amount REAL,
+        name_orig TEXT,
+        name_dest TEXT,
+        fraud_probability REAL,
+        risk_level TEXT,
+        is_fraud INTEGER,
+        payload TEXT
+    )
+"""
+
+INSERT = """
+    INSERT INTO audit_log (ts, endpoint, transaction_id, type, amount, name_orig, name_dest,
+                           fraud_probability, risk_level, is_fraud, payload)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+COLUMNS = ['id', 'ts', 'endpoint', 'transaction_id', 'type', 'amount', 'name_orig', 'name_dest',
+           'fraud_probability', 'risk_level', 'is_fraud', 'payload']
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _column_value(value):
+    """A value SQLite can bind: numbers and text as they are, anything else as text"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, float)):
+        return value
+    if isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+        return value
+    return str(value)
+
+
+def _rows_from_columns(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Rebuild per-row transaction dicts from columnar input (on the writer thread)"""
+    n = len(columns['amount'])
+    return [{name: values[i].item() for name, values in columns.items()} for i in range(n)]
+
+
+class AuditSink:
+    """
+    Bounded in-memory queue drained by a background writer
+
+    Requests only enqueue references to their transactions and results; the
+    writer serializes them and inserts whole batches per SQLite transaction
+    into segment files that rotate by row count. When the queue is full,
+    records are dropped and counted rather than blocking the request; rows
+    that fail to insert are counted as dropped too, without losing the
+    rest of their batch.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_pending_rows: int = 50000,
+                 batch_size: int = 1000, flush_interval: float = 1.0,
+                 segment_max_rows: int = 1000000, max_segments: int = 50):
+        """
+        Args:
+            directory: Where segment files are written. Defaults to ml_model/audit
+            max_pending_rows: Rows allowed in memory before new records are dropped
+            batch_size: Target rows per write transaction
+            flush_interval: Max seconds a record waits before being written
+            segment_max_rows: Rows per segment file before rotating to a new one
+            max_segments: Oldest segments beyond this count are deleted (0 = keep all)
+        """
+        self.directory = directory or os.environ.get('FRAUD_AUDIT_DIR', AUDIT_DIR)
+        self.max_pending_rows = max_pending_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_rows = segment_max_rows
+        self.max_segments = max_segments
+
+        self._queue = queue.Queue()
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn = None
+        self._segment_path = None
+        self._segment_rows = 0
+        self._segment_seq = 0
+        self._metrics = {
+            'enqueued': 0, 'dropped': 0, 'written': 0, 'batches': 0,
+            'write_errors': 0, 'segments_rotated': 0, 'last_batch_ms': 0.0
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._writer = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, endpoint: str, transactions: Union[List[Dict], Dict[str, np.ndarray]],
+               results: List[Dict]) -> bool:
+        """
+        Queue prediction records without blocking
+
+        Args:
+            endpoint: Route that produced the predictions
+            transactions: Transaction dicts, or columnar input arrays
+            results: Prediction results, one per transaction
+
+        Returns:
+            False if the records were dropped because the queue is full
+        """
+        n = len(results)
+        with self._lock:
+            if self._pending_rows + n > self.max_pending_rows:
+                self._metrics['dropped'] += n
+                return False
+            self._pending_rows += n
+            self._metrics['enqueued'] += n
+        self._queue.put((time.time(), endpoint, transactions, results))
+        return True
+
+    def _open_segment(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._metrics['segments_rotated'] += 1
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._segment_seq += 1
+        name = f'audit-{stamp}-{os.getpid()}-{self._segment_seq:04d}.db'
+        self._segment_path = os.path.join(self.directory, name)
+        self._conn = sqlite3.connect(self._segment_path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(SCHEMA)
+        self._segment_rows = 0
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        if not self.max_segments:
+            return
+        segments = sorted(glob.glob(os.path.join(self.directory, 'audit-*.db')), key=os.path.getmtime)
+        for path in segments[:-self.max_segments]:
+            if path != self._segment_path:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+
+    def _to_rows(self, item) -> List[tuple]:
+        ts, endpoint, transactions, results = item
+        if isinstance(transactions, dict):
+            transactions = _rows_from_columns(transactions)
+        rows = []
+        for transaction, result in zip(transactions, results):
+            # Request fields are unvalidated JSON, so every column is coerced
+            rows.append((
+                ts, endpoint,
+                str(transaction.get('transaction_id', '')) or None,
+                _column_value(transaction.get('type')),
+                _column_value(transaction.get('amount')),
+                _column_value(transaction.get('nameOrig')),
+                _column_value(transaction.get('nameDest')),
+                _column_value(result.get('fraud_probability')),
+                _column_value(result.get('risk_level')),
+                int(bool(result.get('is_fraud'))),
+                json.dumps({'transaction': transaction, 'result': result}, default=_json_default)
+            ))
+        return rows
+
+    def _insert_rows(self, rows: List[tuple]) -> int:
+        """Insert rows one at a time in a single transaction, skipping any that fail; returns rows written"""
+        written = 0
+        with self._conn:
+            for row in rows:
+                try:
+                    self._conn.execute(INSERT, row)
+                    written += 1
+                except (sqlite3.InterfaceError, sqlite3.IntegrityError, OverflowError):
+                    pass
+        return written
+
+    def _write(self, items: List):
+        start = time.perf_counter()
+        total = sum(len(item[3]) for item in items)
+        rows = []
+        for item in items:
+            try:
+                rows.extend(self._to_rows(item))
+            except Exception:
+                pass
+        written = 0
+        try:
+            if self._conn is None or self._segment_rows >= self.segment_max_rows:
+                self._open_segment()
+            try:
+                with self._conn:
+                    self._conn.executemany(INSERT, rows)
+                written = len(rows)
+            except (sqlite3.InterfaceError, sqlite3.IntegrityError, OverflowError):
+                # A row SQLite can't store rolled the batch back; keep the rest
+                self._metrics['write_errors'] += 1
+                written = self._insert_rows(rows)
+            self._metrics['batches'] += 1
+        except Exception:
+            self._metrics['write_errors'] += 1
+        self._segment_rows += written
+        self._metrics['last_batch_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        with self._lock:
+            # Rows that never reached the segment count as dropped
+            self._metrics['written'] += written
+            self._metrics['dropped'] += total - written
+            self._pending_rows -= total
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            rows = len(items[0][3])
+            while rows < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+                rows += len(item[3])
+            self._write(items)
+        if self._conn is not None:
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        """Queue depth, throughput and drop counters"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['queue_depth_rows'] = self._pending_rows
+        metrics['max_pending_rows'] = self.max_pending_rows
+        metrics['writer_alive'] = self._writer.is_alive()
+        metrics['segment'] = os.path.basename(self._segment_path) if self._segment_path else None
+        metrics['segment_rows'] = self._segment_rows
+        return metrics
+
+    def close(self, timeout: float = 10.0):
+        """Flush everything queued and stop the writer"""
+        self._stop.set()
+        self._writer.join(timeout)
+
+
+def query_audit_log(directory: str, since: Optional[float] = None, until: Optional[float] = None,
+                    endpoint: Optional[str] = None, risk_level: Optional[str] = None,
+                    fraud_only: bool = False, limit: int = 100) -> List[Dict]:
+    """Read matching records across all segments, oldest first"""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append('ts >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append('ts < ?')
+        params.append(until)
+    if endpoint:
+        clauses.append('endpoint = ?')
+        params.append(endpoint)
+    if risk_level:
+        clauses.append('risk_level = ?')
+        params.append(risk_level)
+    if fraud_only:
+        clauses.append('is_fraud = 1')
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    records = []
+    for path in sorted(glob.glob(os.path.join(directory, 'audit-*.db'))):
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM audit_log {where} ORDER BY id LIMIT ?",
+                                  (*params, limit - len(records)))
+            records.extend(dict(zip(COLUMNS, row)) for row in cursor)
+        finally:
+            conn.close()
+        if len(records) >= limit:
+            break
+    return records
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the prediction audit log')
+    parser.add_argument('--dir', default=os.environ.get('FRAUD_AUDIT_DIR', AUDIT_DIR))
+    parser.add_argument('--since', help='ISO timestamp, e.g. 2024-01-31T09:00')
+    parser.add_argument('--until', help='ISO timestamp')
+    parser.add_argument('--endpoint', help='e.g. /api/analyze')
+    parser.add_argument('--risk-level', choices=['low', 'medium', 'high', 'critical', 'unknown', 'error'])
+    parser.add_argument('--fraud-only', action='store_true')
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--json', action='store_true', help='Print full JSON records')
+    args = parser.parse_args()
+
+    records = query_audit_log(
+        args.dir, _parse_time(args.since), _parse_time(args.until),
+        args.endpoint, args.risk_level, args.fraud_only, args.limit
+    )
+    for record in records:
+        if args.json:
+            record['payload'] = json.loads(record['payload'])
+            print(json.dumps(record))
+        else:
+            ts = datetime.fromtimestamp(record['ts']).isoformat(timespec='seconds')
+            print(f"{ts}  {record['endpoint']:<20} {record['type'] or '-':<9} "
+                  f"{record['amount'] or 0:>14,.2f}  p={record['fraud_probability'] or 0:.4f} "
+                  f"{record['risk_level']:<8} {'FRAUD' if record['is_fraud'] else ''}")
+    if not args.json:
+        print(f"\n{len(records)} record(s)")
+
+
+if __name__ == "__main__":
+    main()
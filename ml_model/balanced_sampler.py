@@ -0,0 +1,201 @@
+"""
+Streaming Class-Balanced Sampler
+Builds the undersampled training set while the source streams past in
+chunks, instead of materializing every row and undersampling afterwards.
+All fraud rows are kept; the majority class goes through a bounded
+reservoir, so memory is set by the sample size rather than the dataset.
+
+Run directly to compare the streaming and in-memory training pipelines
+(wall time, peak memory, model quality) on a PaySim CSV.
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import resource
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESERVOIR_ROWS = 200000
+
+
+class StreamingBalancedSampler:
+    """
+    Train/test split and majority-class undersampling in one pass
+
+    Each row goes to the test split with probability test_size (independent
+    of its class, so both splits keep the class mix in expectation). Train
+    fraud rows are all kept. Train majority rows get a uniform random key
+    and the reservoir holds the reservoir_rows smallest keys seen, a uniform
+    sample without replacement; sample() keeps the int(fraud / ratio)
+    smallest of those, which is again uniform.
+    """
+
+    def __init__(self, ratio: float = 0.1, test_size: float = 0.2,
+                 reservoir_rows: int = DEFAULT_RESERVOIR_ROWS, seed: int = 42, label: str = 'isFraud'):
+        """
+        Args:
+            ratio: Fraud to non-fraud ratio of the training sample (as
+                RandomUnderSampler's sampling_strategy)
+            test_size: Share of rows held out for evaluation, kept in full
+            reservoir_rows: Upper bound on majority rows held while streaming;
+                must exceed the final int(fraud / ratio) for an exact ratio
+            seed: Seed for the split and the reservoir keys
+            label: Binary class column, 1 for the minority (fraud) class
+        """
+        self.ratio = ratio
+        self.test_size = test_size
+        self.reservoir_rows = reservoir_rows
+        self.label = label
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.majority_rows = 0
+        self._test: List[pd.DataFrame] = []
+        self._fraud: List[pd.DataFrame] = []
+        self._reservoir: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+
+    def update(self, chunk: pd.DataFrame):
+        """Route one chunk of rows to the test split, fraud rows or the reservoir"""
+        is_test = self.rng.random(len(chunk)) < self.test_size
+        is_fraud = chunk[self.label].to_numpy() == 1
+        self.rows += len(chunk)
+        self._test.append(chunk[is_test])
+        self._fraud.append(chunk[~is_test & is_fraud])
+
+        majority = chunk[~is_test & ~is_fraud]
+        keys = self.rng.random(len(majority))
+        self.majority_rows += len(majority)
+        if len(self._keys) >= self.reservoir_rows:
+            # Only keys below the reservoir's largest can still make it in
+            entering = keys < self._keys.max()
+            majority, keys = majority[entering], keys[entering]
+        if not len(majority):
+            return
+        candidates = majority if self._reservoir is None else pd.concat([self._reservoir, majority])
+        keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.reservoir_rows:
+            keep = np.argpartition(keys, self.reservoir_rows)[:self.reservoir_rows]
+            candidates, keys = candidates.iloc[keep], keys[keep]
+        self._reservoir, self._keys = candidates, keys
+
+    def sample(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns:
+            (train, test) frames; train is every train fraud row plus
+            int(fraud / ratio) uniformly sampled majority rows
+        """
+        fraud = pd.concat(self._fraud)
+        test = pd.concat(self._test)
+        target = int(len(fraud) / self.ratio)
+        if self._reservoir is None:
+            majority = fraud.iloc[:0]
+        elif len(self._keys) > target:
+            majority = self._reservoir.iloc[np.argpartition(self._keys, target)[:target]]
+        else:
+            majority = self._reservoir
+        if len(majority) < target:
+            print(f"⚠️  Only {len(majority):,} non-fraud rows for {target:,} wanted "
+                  f"(raise reservoir_rows above {target:,} for the exact ratio)")
+        return pd.concat([fraud, majority]), test
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_pipeline(sampler: str, data_path: str, reservoir_rows: int, chunk_rows: int) -> Dict:
+    """One training pipeline in a fresh process, so peak memory is its own"""
+    from sklearn.metrics import average_precision_score, precision_score, recall_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    import train_fraud_model as training
+    from model_backends import DEFAULT_BACKEND, build_model
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            contextlib.redirect_stderr(devnull):
+        start = time.perf_counter()
+        if sampler == 'streaming':
+            X_train, X_test, y_train, y_test, _, _ = training.stream_balanced_data(
+                data_path, chunk_rows=chunk_rows, reservoir_rows=reservoir_rows
+            )
+            X_balanced, y_balanced = training.oversample_minority(X_train, y_train)
+        else:
+            df = pd.read_csv(data_path)
+            df, _ = training.feature_engineering(df)
+            X, y, _ = training.prepare_features(df)
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=training.TEST_SIZE, random_state=42, stratify=y
+            )
+            X_balanced, y_balanced = training.handle_class_imbalance(X_train, y_train)
+        data_seconds = time.perf_counter() - start
+        data_peak_mb = _peak_rss_mb()
+
+        scaler = StandardScaler()
+        model = build_model(DEFAULT_BACKEND)
+        start = time.perf_counter()
+        model.fit(scaler.fit_transform(X_balanced), y_balanced)
+        train_seconds = time.perf_counter() - start
+        X_test_scaled = scaler.transform(X_test)
+        proba = model.predict_proba(X_test_scaled)[:, 1]
+        y_test = np.asarray(y_test)
+
+    return {
+        'sampler': sampler,
+        'data_seconds': data_seconds,
+        'data_peak_mb': data_peak_mb,
+        'train_seconds': train_seconds,
+        'peak_mb': _peak_rss_mb(),
+        'balanced_rows': len(y_balanced),
+        'test_rows': len(y_test),
+        'roc_auc': roc_auc_score(y_test, proba),
+        'average_precision': average_precision_score(y_test, proba),
+        'precision': precision_score(y_test, proba > 0.5),
+        'recall': recall_score(y_test, proba > 0.5)
+    }
+
+
+def main():
+    from train_fraud_model import DATA_PATH, DEFAULT_CHUNK_ROWS
+
+    parser = argparse.ArgumentParser(description='Compare the streaming and in-memory training data pipelines')
+    parser.add_argument('--data', default=DATA_PATH, help='PaySim CSV')
+    parser.add_argument('--reservoir-rows', type=int, default=DEFAULT_RESERVOIR_ROWS)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--samplers', default='streaming,in-memory',
+                        help='Comma-separated pipelines to run (streaming, in-memory)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TRAINING DATA PIPELINE COMPARISON")
+    print("=" * 60)
+    print(f"Source: {args.data} ({os.path.getsize(args.data) / 1e6:,.0f} MB)")
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for sampler in [name.strip() for name in args.samplers.split(',') if name.strip()]:
+        with context.Pool(1) as pool:
+            result = pool.apply(_run_pipeline, (sampler, args.data, args.reservoir_rows, args.chunk_rows))
+        results.append(result)
+        print(f"\n{sampler}:")
+        print(f"  Load + split + resample: {result['data_seconds']:.1f} s, peak RSS {result['data_peak_mb']:,.0f} MB")
+        print(f"  Balanced training rows: {result['balanced_rows']:,} (test rows {result['test_rows']:,})")
+        print(f"  Model fit: {result['train_seconds']:.1f} s, overall peak RSS {result['peak_mb']:,.0f} MB")
+        print(f"  ROC-AUC {result['roc_auc']:.4f}, average precision {result['average_precision']:.4f}, "
+              f"precision {result['precision']:.4f}, recall {result['recall']:.4f}")
+
+    by_sampler = {result['sampler']: result for result in results}
+    if {'streaming', 'in-memory'} <= set(by_sampler):
+        streaming, in_memory = by_sampler['streaming'], by_sampler['in-memory']
+        print(f"\nStreaming data stage: {in_memory['data_seconds'] / streaming['data_seconds']:.1f}x faster, "
+              f"{in_memory['data_peak_mb'] / streaming['data_peak_mb']:.1f}x lower peak memory")
+        print(f"ROC-AUC difference (streaming - in-memory): {streaming['roc_auc'] - in_memory['roc_auc']:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
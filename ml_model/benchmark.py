@@ -0,0 +1,248 @@
+"""
+Scoring Benchmarks
+Measure inference paths of FraudDetector on realistic traffic sampled from
+the PaySim dataset (fraud_training_data table, or the CSV with --csv)
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from account_store import CSV_PATH
+from fraud_db import FraudDatabase
+from fraud_predictor import FraudDetector, risk_level_array
+from forest_eval import EarlyExitForest, supports_early_exit
+from binned_forest import BinnedForest
+from compact_forest import CompactForest, compression_report, print_compression_report
+
+TRAFFIC_COLUMNS = [
+    'step', 'type', 'amount', 'nameOrig', 'oldbalanceOrg', 'newbalanceOrig',
+    'nameDest', 'oldbalanceDest', 'newbalanceDest', 'is_fraud'
+]
+
+# Largest binned vs forest probability difference accepted (summation order only)
+BINNED_TOLERANCE = 1e-12
+
+
+def load_traffic(rows: int, csv_path: str = None) -> pd.DataFrame:
+    """Uniform random sample of transactions, i.e. the production type/fraud mix"""
+    if csv_path:
+        df = pd.read_csv(csv_path).rename(columns={'isFraud': 'is_fraud'})
+        return df.sample(n=min(rows, len(df)), random_state=42)[TRAFFIC_COLUMNS]
+    return pd.DataFrame.from_records(FraudDatabase().fetchall('traffic_sample', (rows,)), columns=TRAFFIC_COLUMNS)
+
+
+def traffic_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    columns = {name: df[name].to_numpy(dtype=np.float64) for name in
+               ['step', 'amount', 'oldbalanceOrg', 'newbalanceOrig', 'oldbalanceDest', 'newbalanceDest']}
+    for name in ['type', 'nameOrig', 'nameDest']:
+        columns[name] = df[name].to_numpy(dtype=str)
+    return columns
+
+
+def scaled_features(detector: FraudDetector, df: pd.DataFrame) -> np.ndarray:
+    X = detector._engineer_feature_frame(traffic_columns(df))
+    return detector.scaler.transform(X[detector.feature_columns])
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_early_exit(detector: FraudDetector, df: pd.DataFrame, args):
+    """Average trees evaluated and latency of early exit vs the full forest"""
+    if not supports_early_exit(detector.model):
+        print(f"Early exit needs a tree forest, not {type(detector.model).__name__}")
+        return
+    X = scaled_features(detector, df)
+    forest = EarlyExitForest(detector.model)
+    detector.model.verbose = 0
+
+    full, full_time = _timed(lambda X: detector.model.predict_proba(X)[:, 1], X)
+    (exact, _), exact_time = _timed(lambda X: forest.predict_proba(X, exact=True), X)
+    (early, trees), early_time = _timed(forest.predict_proba, X)
+
+    bands_full = risk_level_array(full)
+    n_single = min(args.single, len(X))
+
+    print(f"\nRows: {len(X):,}   Trees: {forest.n_trees}")
+    print(f"Exact mode matches predict_proba: {np.allclose(exact, full)}")
+    print(f"Risk level agreement: {(risk_level_array(early) == bands_full).mean() * 100:.3f}%")
+    print(f"is_fraud agreement:   {((early > 0.5) == (full > 0.5)).mean() * 100:.3f}%")
+    print(f"\nTrees evaluated: mean {trees.mean():.1f}, median {np.median(trees):.0f}, "
+          f"p95 {np.percentile(trees, 95):.0f}")
+    for level in ['low', 'medium', 'high', 'critical']:
+        mask = bands_full == level
+        if mask.any():
+            print(f"  {level:<9} {mask.sum():>8,} rows   mean {trees[mask].mean():5.1f} trees")
+
+    print(f"\nBatch ({len(X):,} rows):")
+    print(f"  predict_proba  {full_time * 1000:8.1f} ms")
+    print(f"  exact walk     {exact_time * 1000:8.1f} ms")
+    print(f"  early exit     {early_time * 1000:8.1f} ms")
+
+    # Small batches: every tree in one flattened walk vs tree-by-tree early exit,
+    # the measurement behind EarlyExitForest's small_batch default
+    flat = EarlyExitForest(detector.model, small_batch=len(X))
+    eager = EarlyExitForest(detector.model, small_batch=0)
+    print(f"\n{'Batch':>8} {'predict_proba':>14} {'flattened':>12} {'early exit':>12} {'trees':>7}   "
+          f"(µs per batch; default uses the flattened walk up to {forest.small_batch} rows)")
+    for size in (1, 16, 64, 256):
+        if size > len(X):
+            continue
+        calls = max(1, min(n_single, len(X) // size))
+        batches = [X[i * size:(i + 1) * size] for i in range(calls)]
+        times = []
+        for fn in (detector.model.predict_proba, flat.predict_proba, eager.predict_proba):
+            start = time.perf_counter()
+            for batch in batches:
+                fn(batch)
+            times.append((time.perf_counter() - start) / calls * 1e6)
+        mean_trees = np.mean([eager.predict_proba(batch)[1].mean() for batch in batches])
+        print(f"{size:>8,} {times[0]:>14,.0f} {times[1]:>12,.0f} {times[2]:>12,.0f} {mean_trees:>7.1f}")
+
+
+def _boundary_rows(binned: BinnedForest, X: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Rows with one feature set exactly on, or one float32 step either side of, a split threshold"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for f, table in enumerate(binned.tables):
+        if not len(table):
+            continue
+        values = table[rng.integers(len(table), size=min(len(table), 200))].astype(np.float32)
+        for value in (values, np.nextafter(values, np.float32(np.inf)), np.nextafter(values, np.float32(-np.inf))):
+            block = X[rng.integers(len(X), size=len(value))].copy()
+            block[:, f] = value
+            rows.append(block)
+    return np.concatenate(rows)
+
+
+def bench_binned(detector: FraudDetector, df: pd.DataFrame, args) -> bool:
+    """Equivalence and throughput of binned inference vs the forest's own predict_proba; False if not equivalent"""
+    if not supports_early_exit(detector.model):
+        print(f"Binned inference needs a tree forest, not {type(detector.model).__name__}")
+        return True
+    X = scaled_features(detector, df)
+    (binned, build_time) = _timed(BinnedForest, detector.model)
+    detector.model.verbose = 0
+    widths = [len(table) for table in binned.tables]
+
+    print(f"\nRows: {len(X):,}   Trees: {binned.n_trees}   Compiled: {binned.compiled}")
+    print(f"Threshold tables: {sum(widths):,} thresholds, widest {max(widths)} "
+          f"-> {np.dtype(binned.code_dtype).name} codes ({build_time * 1000:.1f} ms to build)")
+
+    # Equivalence: the same leaf in every tree, on traffic and on rows sitting on the thresholds
+    equivalent = True
+    for name, rows in [('traffic', X[:args.single * 10]), ('threshold boundaries', _boundary_rows(binned, X))]:
+        rows32 = rows.astype(np.float32)
+        same = np.array_equal(binned.apply(binned.binarize(rows)), detector.model.apply(rows32) + binned.roots)
+        equivalent &= same
+        print(f"Identical leaves ({name}, {len(rows):,} rows): {same}")
+    full = detector.model.predict_proba(X)[:, 1]
+    proba = binned.predict_proba(X)
+    equivalent &= bool(np.abs(proba - full).max() <= BINNED_TOLERANCE)
+    print(f"Max |probability difference| over all rows: {np.abs(proba - full).max():.2e}")
+    print(f"Risk level agreement: {(risk_level_array(proba) == risk_level_array(full)).mean() * 100:.3f}%")
+    if not equivalent:
+        print("❌ Binned inference differs from the forest")
+        return False
+
+    early = EarlyExitForest(detector.model)
+    # forest_eval's exact path: flattened walk for small batches, per-tree apply above
+    print(f"\n{'Batch':>8} {'predict_proba':>16} {'forest_eval':>16} {'binned':>16}   (rows/sec)")
+    for size in sorted({1, 32, 512, 4096, len(X)}):
+        if size > len(X):
+            continue
+        batch = X[:size]
+        repeats = max(1, min(50, 20000 // size))
+        rates = []
+        for fn in (lambda B: detector.model.predict_proba(B), lambda B: early.predict_proba(B, exact=True),
+                   binned.predict_proba):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                fn(batch)
+            rates.append(size * repeats / (time.perf_counter() - start))
+        print(f"{size:>8,} {rates[0]:>16,.0f} {rates[1]:>16,.0f} {rates[2]:>16,.0f}")
+
+    codes, binarize_time = _timed(binned.binarize, X)
+    _, walk_time = _timed(binned.predict_codes, codes)
+    print(f"\nBinned split at {len(X):,} rows: binarize {binarize_time * 1000:.1f} ms, "
+          f"walk {walk_time * 1000:.1f} ms")
+    return True
+
+
+def bench_compact(detector: FraudDetector, df: pd.DataFrame, args):
+    """Size, deviation and throughput of the compact forest artifact vs the full forest"""
+    if not supports_early_exit(detector.model):
+        print(f"The compact artifact needs a tree forest, not {type(detector.model).__name__}")
+        return
+    X = scaled_features(detector, df)
+    detector.model.verbose = 0
+    boundary = _boundary_rows(BinnedForest(detector.model), X)
+    compacts = {}
+    for bits in (8, 16):
+        compact, build_time = _timed(lambda: CompactForest(detector.model, leaf_bits=bits))
+        compacts[bits] = compact
+        print(f"\n{bits}-bit leaves (built in {build_time * 1000:.0f} ms, compiled: {compact.compiled}):")
+        print_compression_report(compression_report(detector.model, compact, X))
+        # Splits are exact, so on rows sitting on the thresholds the deviation
+        # still stays within the leaf quantization bound
+        deviation = np.abs(compact.predict_proba(boundary)[:, 1]
+                           - detector.model.predict_proba(boundary.astype(np.float32))[:, 1]).max()
+        print(f"Threshold boundaries ({len(boundary):,} rows): max deviation {deviation:.6f} "
+              f"(bound {0.5 / compact.scale:.6f})")
+
+    compact = compacts[8]
+    print(f"\n{'Batch':>8} {'predict_proba':>16} {'compact':>16}   (rows/sec)")
+    for size in sorted({1, 32, 512, 4096, len(X)}):
+        if size > len(X):
+            continue
+        batch = X[:size]
+        repeats = max(1, min(50, 20000 // size))
+        rates = []
+        for fn in (detector.model.predict_proba, compact.predict_proba):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                fn(batch)
+            rates.append(size * repeats / (time.perf_counter() - start))
+        print(f"{size:>8,} {rates[0]:>16,.0f} {rates[1]:>16,.0f}")
+
+
+BENCHMARKS = {
+    'early-exit': bench_early_exit,
+    'binned': bench_binned,
+    'compact': bench_compact,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fraud scoring paths')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--rows', type=int, default=20000, help='Transactions to sample')
+    parser.add_argument('--single', type=int, default=300, help='Single-transaction calls to time')
+    parser.add_argument('--csv', nargs='?', const=CSV_PATH, default=None,
+                        help='Sample the PaySim CSV instead of fraud_training_data')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"BENCHMARK: {args.benchmark}")
+    print("=" * 60)
+
+    detector = FraudDetector()
+    if not detector.is_loaded:
+        print("\n⚠️  Please run train_fraud_model.py first to train the model.")
+        return
+    df = load_traffic(args.rows, args.csv)
+    # Benchmarks with an equivalence check return False when it fails
+    if BENCHMARKS[args.benchmark](detector, df, args) is False:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Two-Stage Scoring Cascade
+A cheap screening model answers the confidently benign (and confidently
+fraudulent) rows; only the uncertain band is scored by the full forest.
+Shared by the training script (fit, margin calibration, report) and
+FraudDetector (serving).
+"""
+
+import os
+import time
+from typing import Dict, Tuple
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENING_PATH = os.path.join(SCRIPT_DIR, 'screening_model.joblib')
+
+# Risk-level boundaries (see fraud_predictor.risk_level_array)
+BAND_THRESHOLDS = (0.3, 0.5, 0.8)
+
+# Short-circuited rows must land in the same band the forest would report:
+# below LOW_CEILING is always 'low', above HIGH_FLOOR is always 'critical'
+LOW_CEILING = BAND_THRESHOLDS[0]
+HIGH_FLOOR = BAND_THRESHOLDS[-1]
+
+
+def train_screening_model(X_train_scaled: np.ndarray, y_train: np.ndarray, kind: str = 'tree'):
+    """
+    Fit the first-stage model on the same scaled, resampled data as the forest
+
+    Args:
+        kind: 'tree' (one depth-8 decision tree) or 'logistic' (linear model)
+    """
+    if kind == 'logistic':
+        model = LogisticRegression(class_weight='balanced', max_iter=1000)
+    else:
+        model = DecisionTreeClassifier(
+            max_depth=8, min_samples_leaf=50, class_weight='balanced', random_state=42
+        )
+    model.fit(X_train_scaled, y_train)
+    return model
+
+
+def screen(screening, low_margin: float, high_margin: float,
+           X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First-stage probabilities and the mask of rows left for the forest
+
+    Returns:
+        (fraud_probability, uncertain) where uncertain marks the rows that
+        fell inside the margins and still need the full forest
+    """
+    fraud_probability = screening.predict_proba(X_scaled)[:, 1]
+    return fraud_probability, (fraud_probability >= low_margin) & (fraud_probability <= high_margin)
+
+
+def cascade_proba(screening, low_margin: float, high_margin: float, forest,
+                  X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fraud probabilities from the cascade
+
+    Returns:
+        (fraud_probability, forest_mask) where forest_mask marks the rows
+        that fell inside the margins and were scored by the full forest
+    """
+    fraud_probability, uncertain = screen(screening, low_margin, high_margin, X_scaled)
+    if uncertain.any():
+        fraud_probability[uncertain] = forest.predict_proba(X_scaled[uncertain])[:, 1]
+    return fraud_probability, uncertain
+
+
+def choose_margins(screen_p: np.ndarray, forest_p: np.ndarray, y: np.ndarray,
+                   max_recall_loss: float = 0.002, max_false_critical: float = 0.001) -> Tuple[float, float]:
+    """
+    Widest margins that stay within the loss budgets on a calibration set
+
+    Args:
+        screen_p, forest_p: Screening and forest fraud probabilities
+        y: True labels
+        max_recall_loss: Share of frauds the forest puts at medium risk or
+            above that may be short-circuited to 'low' instead
+        max_false_critical: Share of traffic the screening model may mark
+            'critical' although the forest would not
+
+    Returns:
+        (low_margin, high_margin): rows with screening probability below
+        low_margin return 'low', above high_margin return 'critical'
+    """
+    # Frauds the forest catches; at most k of them may fall under the low margin
+    caught = np.sort(screen_p[(y == 1) & (forest_p >= LOW_CEILING)])
+    k = int(max_recall_loss * len(caught))
+    low_margin = min(LOW_CEILING, float(caught[k])) if k < len(caught) else LOW_CEILING
+
+    # Rows the forest does not call critical; at most k of them may exceed the high margin
+    not_critical = np.sort(screen_p[forest_p < HIGH_FLOOR])[::-1]
+    k = int(max_false_critical * len(screen_p))
+    high_margin = max(HIGH_FLOOR, float(not_critical[k])) if k < len(not_critical) else HIGH_FLOOR
+    return low_margin, high_margin
+
+
+def _per_row_latency_us(predict, X: np.ndarray, n: int = 300) -> float:
+    rows = X[:n]
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        predict(rows[i:i + 1])
+    return (time.perf_counter() - start) / max(len(rows), 1) * 1e6
+
+
+def cascade_report(screening, low_margin: float, high_margin: float, forest,
+                   X_scaled: np.ndarray, y: np.ndarray) -> Dict:
+    """Short-circuit rate, latency and recall at each risk-level threshold vs the forest alone"""
+    start = time.perf_counter()
+    forest_p = forest.predict_proba(X_scaled)[:, 1]
+    forest_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cascade_p, forest_mask = cascade_proba(screening, low_margin, high_margin, forest, X_scaled)
+    cascade_time = time.perf_counter() - start
+
+    def forest_only(row):
+        return forest.predict_proba(row)
+
+    def cascade_only(row):
+        return cascade_proba(screening, low_margin, high_margin, forest, row)
+
+    # Single-transaction latency is what the /api/predict path pays
+    shuffled = X_scaled[np.random.default_rng(42).permutation(len(X_scaled))]
+    frauds = y == 1
+    recall = {}
+    for threshold in BAND_THRESHOLDS:
+        forest_recall = float((forest_p[frauds] >= threshold).mean()) if frauds.any() else 0.0
+        cascade_recall = float((cascade_p[frauds] >= threshold).mean()) if frauds.any() else 0.0
+        recall[str(threshold)] = {
+            'forest': round(forest_recall, 4),
+            'cascade': round(cascade_recall, 4),
+            'loss': round(forest_recall - cascade_recall, 4)
+        }
+
+    screened = ~forest_mask
+    return {
+        'rows': int(len(y)),
+        'low_margin': round(low_margin, 4),
+        'high_margin': round(high_margin, 4),
+        'short_circuit_fraction': round(float(screened.mean()), 4),
+        'short_circuit_low': round(float((screened & (cascade_p < low_margin)).mean()), 4),
+        'short_circuit_critical': round(float((screened & (cascade_p > high_margin)).mean()), 4),
+        'batch_ms': {'forest': round(forest_time * 1000, 1), 'cascade': round(cascade_time * 1000, 1)},
+        'single_row_us': {
+            'forest': round(_per_row_latency_us(forest_only, shuffled), 1),
+            'cascade': round(_per_row_latency_us(cascade_only, shuffled), 1)
+        },
+        'recall': recall
+    }
+
+
+def save_screening_model(screening, low_margin: float, high_margin: float, report: Dict,
+                         path: str = SCREENING_PATH):
+    joblib.dump({
+        'model': screening,
+        'low_margin': low_margin,
+        'high_margin': high_margin,
+        'report': report
+    }, path)
+
+
+def load_screening_model(model_dir: str):
+    """Screening artifact saved next to the forest, or None if it wasn't trained"""
+    path = os.path.join(model_dir, os.path.basename(SCREENING_PATH))
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
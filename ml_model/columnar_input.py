@@ -0,0 +1,154 @@
+"""
+Columnar Batch Input
+Decode Arrow IPC streams and packed NumPy archives into the column arrays
+consumed by FraudDetector.predict_columns
+
+Packed NumPy layout (Content-Type: application/x-npz):
+    An .npz archive (np.savez, pickling not allowed) holding one 1-D array
+    per transaction field, all of the same length:
+        amount          float/int   required
+        step            float/int   optional, default 1
+        oldbalanceOrg   float/int   optional, default 0
+        newbalanceOrig  float/int   optional, default 0
+        oldbalanceDest  float/int   optional, default 0
+        newbalanceDest  float/int   optional, default 0
+        type            str, or int codes into TRANSACTION_TYPES
+        nameOrig        str         optional
+        nameDest        str         optional
+
+Arrow IPC (Content-Type: application/vnd.apache.arrow.stream) uses the same
+column names, with utf8 columns (plain or dictionary-encoded) for the
+string fields.
+"""
+
+import io
+from typing import Dict
+
+import numpy as np
+
+from account_store import TRANSACTION_TYPES
+from fraud_predictor import NUMERIC_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Optional dependency, Arrow bodies are then rejected
+    pa = None
+
+NPZ_MIMETYPE = 'application/x-npz'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+COLUMNAR_MIMETYPES = (NPZ_MIMETYPE, ARROW_MIMETYPE)
+
+STRING_FIELDS = ('type', 'nameOrig', 'nameDest')
+REQUIRED_FIELDS = ('amount',)
+
+
+class ColumnarInputError(Exception):
+    """Raised when a columnar body fails validation; errors maps column -> message"""
+
+    def __init__(self, message: str, errors: Dict[str, str] = None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+
+def _validate(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Check names, shapes, dtypes and values; return only the known fields"""
+    errors = {}
+    for name in REQUIRED_FIELDS:
+        if name not in columns:
+            errors[name] = 'required column is missing'
+    if errors:
+        raise ColumnarInputError('Invalid columnar input', errors)
+
+    n_rows = len(columns['amount']) if np.ndim(columns['amount']) == 1 else None
+    validated = {}
+    for name, values in columns.items():
+        if name not in NUMERIC_FIELDS and name not in STRING_FIELDS:
+            continue
+        if values.ndim != 1:
+            errors[name] = f'expected a 1-D array, got shape {values.shape}'
+            continue
+        if n_rows is not None and len(values) != n_rows:
+            errors[name] = f'length {len(values)} does not match amount length {n_rows}'
+            continue
+
+        if name in NUMERIC_FIELDS:
+            if values.dtype.kind not in 'biuf':
+                errors[name] = f'expected a numeric column, got dtype {values.dtype}'
+                continue
+            values = values.astype(np.float64, copy=False)
+            bad = ~np.isfinite(values)
+            if bad.any():
+                errors[name] = f'{int(bad.sum())} non-finite values (first at row {int(np.argmax(bad))})'
+                continue
+        elif name == 'type' and values.dtype.kind in 'iu':
+            out_of_range = (values < 0) | (values >= len(TRANSACTION_TYPES))
+            if out_of_range.any():
+                errors[name] = (f'type codes must be 0-{len(TRANSACTION_TYPES) - 1} '
+                                f'({", ".join(TRANSACTION_TYPES)})')
+                continue
+            values = np.asarray(TRANSACTION_TYPES)[values]
+        elif values.dtype.kind == 'S':
+            values = np.char.decode(values, 'utf-8')
+        elif values.dtype.kind != 'U':
+            errors[name] = f'expected a string column, got dtype {values.dtype}'
+            continue
+        validated[name] = values
+
+    if errors:
+        raise ColumnarInputError('Invalid columnar input', errors)
+    return validated
+
+
+def decode_npz(body: bytes) -> Dict[str, np.ndarray]:
+    """Decode a packed NumPy (.npz) body"""
+    if not body.startswith(b'PK'):
+        raise ColumnarInputError('Body is not an .npz archive')
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            columns = {name: archive[name] for name in archive.files}
+    except ValueError as e:
+        # Object arrays need pickling, which is never allowed here
+        raise ColumnarInputError(f'Invalid npz body: {e}')
+    except Exception as e:
+        raise ColumnarInputError(f'Could not read npz body: {e}')
+    return _validate(columns)
+
+
+def decode_arrow(body: bytes) -> Dict[str, np.ndarray]:
+    """Decode an Arrow IPC stream body"""
+    if pa is None:
+        raise ColumnarInputError('Arrow input requires the pyarrow package')
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except Exception as e:
+        raise ColumnarInputError(f'Could not read Arrow stream: {e}')
+
+    columns, errors = {}, {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_dictionary(column.type):
+            # pandas categoricals and pyarrow's default string writers dictionary-encode
+            column = pc.cast(column, column.type.value_type)
+        if column.null_count:
+            errors[name] = f'{column.null_count} null values'
+            continue
+        if name == 'type' and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            # Map to codes in Arrow, then back to a NumPy string array
+            codes = pc.index_in(column, value_set=pa.array(TRANSACTION_TYPES))
+            known = np.asarray(pc.fill_null(codes, -1).to_numpy())
+            columns[name] = np.where(known >= 0, np.asarray(TRANSACTION_TYPES)[known.clip(0)], 'UNKNOWN')
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            columns[name] = np.asarray(column.to_numpy(), dtype=str)
+        else:
+            columns[name] = np.asarray(column.to_numpy())
+    if errors:
+        raise ColumnarInputError('Invalid columnar input', errors)
+    return _validate(columns)
+
+
+def decode_columnar(body: bytes, mimetype: str) -> Dict[str, np.ndarray]:
+    """Decode a columnar request body by its Content-Type"""
+    if mimetype == ARROW_MIMETYPE:
+        return decode_arrow(body)
+    return decode_npz(body)
@@ -0,0 +1,278 @@
+"""
+Compact Forest Artifact
+Inference-only encoding of a fitted binary tree forest, saved next to the
+full model at training time (or built from it later by running this
+module). Per node it keeps a feature index, a float32 threshold, one
+compact child index and a quantized leaf probability, instead of the
+float64 thresholds, impurities, sample counts and per-class values that
+the sklearn trees carry.
+
+- Thresholds are rounded down to float32. Trees compare float32 inputs,
+  and for a float32 x, x <= t exactly when x <= the largest float32 <= t,
+  so no split changes.
+- Leaf probabilities are quantized to leaf_bits; this is the only source
+  of deviation from the full model.
+- Subtrees whose leaves all quantize to the same value become one leaf.
+- Nodes are renumbered depth first, so a left child always follows its
+  parent and only the right child is stored, as a per-tree local index.
+"""
+
+import argparse
+import os
+from typing import Dict
+
+import joblib
+import numpy as np
+
+from binned_forest import map_row_blocks
+
+try:
+    import numba
+except ImportError:  # Optional dependency, compact inference falls back to numpy
+    numba = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPACT_MODEL_PATH = os.path.join(SCRIPT_DIR, 'fraud_detection_model.compact.joblib')
+
+
+if numba is not None:
+    @numba.njit(nogil=True, cache=True)
+    def _walk_compiled(X, roots, depths, feature, threshold, right, value):
+        """Sum of quantized leaf values per row of one block"""
+        n, n_trees = X.shape[0], roots.shape[0]
+        totals = np.zeros(n, dtype=np.int64)
+        for t in range(n_trees):
+            root, depth = roots[t], depths[t]
+            for i in range(n):
+                node = 0
+                for _ in range(depth):
+                    g = root + node
+                    # Leaves have a NaN threshold, so they step to themselves
+                    if X[i, feature[g]] <= threshold[g]:
+                        node = node + 1
+                    else:
+                        node = np.int64(right[g])
+                totals[i] += value[root + node]
+        return totals
+
+
+def _float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 not above each value"""
+    rounded = values.astype(np.float32)
+    over = rounded.astype(np.float64) > values
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+
+# Attributes saved in the artifact
+_STATE = ['leaf_bits', 'scale', 'block_rows', 'classes_', 'n_features_in_', 'n_estimators', 'original_nodes',
+          'roots', 'depths', 'feature', 'threshold', 'right', 'value']
+
+
+class CompactForest:
+    """
+    Compressed, inference-only stand-in for a fitted binary
+    RandomForestClassifier / ExtraTreesClassifier (predict_proba, predict)
+    """
+
+    def __init__(self, forest, leaf_bits: int = 8, block_rows: int = 4096):
+        """
+        Args:
+            forest: Fitted binary tree forest (see forest_eval.supports_early_exit)
+            leaf_bits: Bits per quantized leaf probability (8 or 16); the mean
+                over trees is within 0.5 / (2 ** leaf_bits - 1) of the original
+            block_rows: Rows walked together (and per pool task when compiled)
+        """
+        if leaf_bits not in (8, 16):
+            raise ValueError('leaf_bits must be 8 or 16')
+        self.leaf_bits = leaf_bits
+        self.scale = 2 ** leaf_bits - 1
+        self.block_rows = block_rows
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.n_estimators = len(forest.estimators_)
+        self.original_nodes = sum(e.tree_.node_count for e in forest.estimators_)
+
+        trees = [self._compact_tree(e.tree_) for e in forest.estimators_]
+        sizes = [len(tree['feature']) for tree in trees]
+        self.roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        self.depths = np.array([tree['depth'] for tree in trees], dtype=np.int64)
+        self.feature = np.concatenate([tree['feature'] for tree in trees]).astype(
+            np.uint8 if self.n_features_in_ <= 256 else np.uint16)
+        self.threshold = np.concatenate([tree['threshold'] for tree in trees])
+        self.right = np.concatenate([tree['right'] for tree in trees]).astype(
+            np.uint16 if max(sizes) <= 2 ** 16 else np.uint32)
+        self.value = np.concatenate([tree['value'] for tree in trees]).astype(
+            np.uint8 if leaf_bits == 8 else np.uint16)
+
+    def _compact_tree(self, tree) -> Dict[str, np.ndarray]:
+        left, right = tree.children_left, tree.children_right
+        value = tree.value[:, 0, :]
+        quantized = np.rint(value[:, 1] / value.sum(axis=1) * self.scale).astype(np.int64)
+
+        # Children always have higher ids than their parent, so one backwards
+        # pass collapses every subtree whose leaves share a quantized value
+        leaf = left < 0
+        for node in range(tree.node_count - 1, -1, -1):
+            if not leaf[node] and leaf[left[node]] and leaf[right[node]] \
+                    and quantized[left[node]] == quantized[right[node]]:
+                leaf[node] = True
+                quantized[node] = quantized[left[node]]
+
+        # Depth-first renumbering with the left child right after its parent
+        order, depths, stack = [], [], [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            order.append(node)
+            depths.append(depth)
+            if not leaf[node]:
+                stack.append((right[node], depth + 1))
+                stack.append((left[node], depth + 1))
+        order = np.array(order)
+        new_id = np.empty(tree.node_count, dtype=np.int64)
+        new_id[order] = np.arange(len(order))
+        is_leaf = leaf[order]
+
+        return {
+            'feature': np.where(is_leaf, 0, tree.feature[order]),
+            'threshold': np.where(is_leaf, np.float32(np.nan), _float32_floor(tree.threshold[order])),
+            'right': np.where(is_leaf, np.arange(len(order)), new_id[right[order]]),
+            'value': np.where(is_leaf, quantized[order], 0),
+            'depth': max(depths)
+        }
+
+    @property
+    def compiled(self) -> bool:
+        return numba is not None
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.roots, self.depths, self.feature, self.threshold, self.right, self.value))
+
+    def _leaf_totals(self, X: np.ndarray) -> np.ndarray:
+        if numba is not None:
+            # Blocks go through binned_forest's thread pool (see map_row_blocks)
+            return map_row_blocks(
+                lambda start, end: _walk_compiled(X[start:end], self.roots, self.depths, self.feature,
+                                                  self.threshold, self.right, self.value),
+                len(X), self.block_rows
+            )
+        totals = np.zeros(len(X), dtype=np.int64)
+        for start in range(0, len(X), self.block_rows):
+            block = X[start:start + self.block_rows]
+            rows = np.arange(len(block))[:, None]
+            node = np.zeros((len(block), self.n_estimators), dtype=np.int64)
+            for _ in range(self.depths.max()):
+                g = self.roots + node
+                node = np.where(block[rows, self.feature[g]] <= self.threshold[g], node + 1, self.right[g])
+            totals[start:start + len(block)] = self.value[self.roots + node].sum(axis=1, dtype=np.int64)
+        return totals
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape (n, 2), like the forest's predict_proba"""
+        # Inputs are rounded to float32 first, as the trees themselves do
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        fraud_probability = self._leaf_totals(X) / (self.n_estimators * self.scale)
+        return np.column_stack([1 - fraud_probability, fraud_probability])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+    def state(self) -> Dict:
+        """Plain arrays and numbers, so the artifact doesn't depend on how this module was imported"""
+        return {name: getattr(self, name) for name in _STATE}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'CompactForest':
+        compact = cls.__new__(cls)
+        for name in _STATE:
+            setattr(compact, name, state[name])
+        return compact
+
+    def info(self) -> Dict:
+        return {
+            'trees': self.n_estimators,
+            'nodes': self.n_nodes,
+            'original_nodes': self.original_nodes,
+            'leaf_bits': self.leaf_bits,
+            'memory_kb': round(self.nbytes / 1e3, 1),
+            'compiled': self.compiled
+        }
+
+
+def save_compact_model(compact: CompactForest, path: str = COMPACT_MODEL_PATH):
+    joblib.dump(compact.state(), path)
+
+
+def load_compact_model(path: str = COMPACT_MODEL_PATH) -> CompactForest:
+    return CompactForest.from_state(joblib.load(path))
+
+
+def compression_report(forest, compact: CompactForest, X_scaled: np.ndarray) -> Dict:
+    """Size reduction and probability deviation of compact against forest on scaled rows"""
+    from fraud_predictor import risk_level_array
+    from model_backends import artifact_bytes
+
+    original = forest.predict_proba(X_scaled)[:, 1]
+    compressed = compact.predict_proba(X_scaled)[:, 1]
+    deviation = np.abs(compressed - original)
+    original_bytes, compact_bytes = artifact_bytes(forest), artifact_bytes(compact.state())
+    return {
+        'rows': len(X_scaled),
+        'leaf_bits': compact.leaf_bits,
+        'nodes': compact.n_nodes,
+        'original_nodes': compact.original_nodes,
+        'original_bytes': original_bytes,
+        'compact_bytes': compact_bytes,
+        'size_reduction': round(original_bytes / compact_bytes, 1),
+        'max_probability_deviation': float(deviation.max()),
+        'mean_probability_deviation': float(deviation.mean()),
+        'risk_level_agreement': float((risk_level_array(compressed) == risk_level_array(original)).mean()),
+        'decision_agreement': float(((compressed > 0.5) == (original > 0.5)).mean())
+    }
+
+
+def print_compression_report(report: Dict):
+    print(f"Nodes: {report['original_nodes']:,} -> {report['nodes']:,} after pruning agreeing subtrees")
+    print(f"Artifact: {report['original_bytes'] / 1e6:.2f} MB -> {report['compact_bytes'] / 1e6:.2f} MB "
+          f"({report['size_reduction']}x smaller, {report['leaf_bits']}-bit leaves)")
+    print(f"Max probability deviation: {report['max_probability_deviation']:.6f} "
+          f"(mean {report['mean_probability_deviation']:.6f}) over {report['rows']:,} rows")
+    print(f"Risk level agreement: {report['risk_level_agreement'] * 100:.3f}%, "
+          f"decision agreement: {report['decision_agreement'] * 100:.3f}%")
+
+
+def main():
+    """Compress an already trained model, checking it on a sample of the dataset"""
+    from benchmark import load_traffic, traffic_columns
+    from fraud_predictor import FraudDetector
+
+    parser = argparse.ArgumentParser(description='Build the compact forest artifact for the trained model')
+    parser.add_argument('--rows', type=int, default=100000, help='Transactions to check the deviation on')
+    parser.add_argument('--csv', nargs='?', const=os.path.join(SCRIPT_DIR, 'PS_20174392719_1491204439457_log.csv'),
+                        default=None, help='Sample the PaySim CSV instead of fraud_training_data')
+    parser.add_argument('--leaf-bits', type=int, choices=[8, 16], default=8)
+    parser.add_argument('--output', default=COMPACT_MODEL_PATH)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COMPACT FOREST ARTIFACT")
+    print("=" * 60)
+
+    detector = FraudDetector(explain=False)
+    if not detector.is_loaded:
+        return
+    compact = CompactForest(detector.model, leaf_bits=args.leaf_bits)
+    columns = traffic_columns(load_traffic(args.rows, args.csv))
+    X_scaled = detector.scaler.transform(detector._engineer_feature_frame(columns)[detector.feature_columns])
+    print_compression_report(compression_report(detector.model, compact, X_scaled))
+    save_compact_model(compact, args.output)
+    print(f"\nCompact model saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
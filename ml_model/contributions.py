@@ -0,0 +1,138 @@
+"""
+Tree-Path Feature Contributions
+Attribute each forest prediction to its input features (Saabas method): every
+split on the path from root to leaf changes the node's fraud probability, and
+that change is credited to the split feature. Summed along the path, each
+leaf carries a fixed contribution vector, so explaining a batch is one leaf
+lookup plus a sparse matrix product.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from forest_eval import EarlyExitForest
+
+# Readable names for model features in risk factor messages
+FEATURE_LABELS = {
+    'step': 'Time step',
+    'amount': 'Transaction amount',
+    'oldbalanceOrg': 'Sender balance before',
+    'newbalanceOrig': 'Sender balance after',
+    'oldbalanceDest': 'Recipient balance before',
+    'newbalanceDest': 'Recipient balance after',
+    'typeEncoded': 'Transaction type',
+    'origBalanceDiff': 'Sender balance change',
+    'destBalanceDiff': 'Recipient balance change',
+    'origBalanceError': 'Sender balance discrepancy',
+    'destBalanceError': 'Recipient balance discrepancy',
+    'amountToOrigBalance': 'Amount to sender balance ratio',
+    'amountToDestBalance': 'Amount to recipient balance ratio',
+    'origZeroBalance': 'Sender had zero balance',
+    'destZeroBalance': 'Recipient had zero balance',
+    'newOrigZeroBalance': 'Sender left with zero balance',
+    'completeTransfer': 'Complete account drain',
+    'isMerchant': 'Merchant recipient',
+    'isLargeTransaction': 'Large transaction',
+    'hourOfDay': 'Hour of day',
+    'dayOfMonth': 'Day of month',
+    'origTxCount1h': 'Sender transactions in the last hour',
+    'origAmountSum1h': 'Sender amount in the last hour',
+    'origTxCount24h': 'Sender transactions in the last 24h',
+    'origAmountSum24h': 'Sender amount in the last 24h',
+    'origDistinctDest24h': 'Distinct recipients in the last 24h',
+}
+
+MONEY_FEATURES = {
+    'amount', 'oldbalanceOrg', 'newbalanceOrig', 'oldbalanceDest', 'newbalanceDest',
+    'origBalanceDiff', 'destBalanceDiff', 'origBalanceError', 'destBalanceError',
+    'origAmountSum1h', 'origAmountSum24h'
+}
+FLAG_FEATURES = {
+    'origZeroBalance', 'destZeroBalance', 'newOrigZeroBalance', 'completeTransfer',
+    'isMerchant', 'isLargeTransaction'
+}
+
+
+class PathContributions:
+    """Precomputed per-leaf contribution vectors over a fitted binary forest"""
+
+    def __init__(self, forest, feature_columns: List[str], walker: EarlyExitForest = None):
+        """
+        Args:
+            forest: Fitted binary RandomForestClassifier
+            feature_columns: Model feature names, in training order
+            walker: Flattened forest to reuse (e.g. the early-exit evaluator)
+        """
+        self.walker = walker or EarlyExitForest(forest)
+        self.feature_columns = list(feature_columns)
+        w = self.walker
+
+        # Propagate contributions top-down, one depth level at a time for all trees
+        n_nodes, n_features = len(w.node_proba), len(self.feature_columns)
+        is_internal = w.left != np.arange(n_nodes)
+        node_contrib = np.zeros((n_nodes, n_features))
+        level = w.roots[is_internal[w.roots]]
+        while len(level):
+            parents = np.concatenate([level, level])
+            children = np.concatenate([w.left[level], w.right[level]])
+            node_contrib[children] = node_contrib[parents]
+            node_contrib[children, w.feature[parents]] += w.node_proba[children] - w.node_proba[parents]
+            level = children[is_internal[children]]
+
+        # Scaled by the tree count so summing one leaf per tree gives the forest mean
+        self.leaf_contrib = node_contrib / w.n_trees
+        self.bias = float(w.node_proba[w.roots].mean())
+
+    def explain(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        Per-feature contributions to the fraud probability, shape (n, n_features);
+        bias + row sum equals the forest's predict_proba
+        """
+        leaves = self.walker.apply(X_scaled)
+        n, T = leaves.shape
+        indicator = sparse.csr_matrix(
+            (np.ones(n * T), leaves.ravel(), np.arange(0, n * T + 1, T)),
+            shape=(n, len(self.leaf_contrib))
+        )
+        return indicator @ self.leaf_contrib
+
+    def top_features(self, contributions: np.ndarray, features: np.ndarray, k: int = 3,
+                     min_contribution: float = 0.01) -> List[List[Dict]]:
+        """
+        The k features pushing each prediction hardest towards fraud
+
+        Args:
+            contributions: Output of explain()
+            features: Unscaled model feature values, same shape
+            k: Features to return per row
+            min_contribution: Ignore contributions below this (probability points)
+        """
+        order = np.argsort(-contributions, axis=1)[:, :k]
+        top = []
+        for i, row in enumerate(order):
+            top.append([
+                {
+                    'feature': self.feature_columns[j],
+                    'value': float(features[i, j]),
+                    'contribution': round(float(contributions[i, j]), 4)
+                }
+                for j in row if contributions[i, j] >= min_contribution
+            ])
+        return top
+
+
+def describe_contribution(item: Dict, type_names: np.ndarray) -> str:
+    """Human-readable risk factor for one top feature"""
+    name, value = item['feature'], item['value']
+    if name == 'typeEncoded':
+        shown = str(type_names[int(value)])
+    elif name in MONEY_FEATURES:
+        shown = f"${value:,.2f}"
+    elif name in FLAG_FEATURES:
+        shown = 'yes' if value else 'no'
+    else:
+        shown = f"{value:,.4g}"
+    label = FEATURE_LABELS.get(name, name)
+    return f"{label} ({shown}) raised fraud risk by {item['contribution'] * 100:.1f} points"
@@ -0,0 +1,360 @@
+"""
+Streaming Drift Monitor
+Constant-memory sketches of the scored feature stream (every model feature
+plus the output probability), compared on demand with reference sketches
+saved at training time. Nothing about individual requests is kept.
+
+- QuantileSketch: mergeable KLL-style compactor sketch, all columns at once;
+  gives quantiles and CDFs for Kolmogorov-Smirnov distances
+- BinnedHistogram: counts over fixed bins cut at the reference deciles;
+  gives the population stability index (PSI)
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DRIFT_REFERENCE_PATH = os.path.join(SCRIPT_DIR, 'drift_reference.joblib')
+
+OUTPUT_COLUMN = 'fraud_probability'
+REPORT_QUANTILES = (0.05, 0.5, 0.95)
+
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch over d columns
+
+    Items live in compactor levels; an item at level l stands for 2^l rows.
+    A level holding 2k items is sorted and every other item (random offset)
+    is promoted, so memory grows only with log(n / k). All columns share the
+    level layout and each compaction is one sort along axis 0.
+    """
+
+    def __init__(self, n_columns: int, k: int = 256, seed: int = 0):
+        self.k = k
+        self.n_columns = n_columns
+        self.count = 0
+        self.levels = [np.empty((0, n_columns))]
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+        self._rng = np.random.default_rng(seed)
+
+    def state(self) -> Dict:
+        """Plain arrays for saving (see from_state)"""
+        return {'k': self.k, 'count': self.count, 'levels': self.levels,
+                'minimum': self.minimum, 'maximum': self.maximum}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'QuantileSketch':
+        sketch = cls(len(state['minimum']), k=state['k'])
+        sketch.count = state['count']
+        sketch.levels = list(state['levels'])
+        sketch.minimum, sketch.maximum = state['minimum'], state['maximum']
+        return sketch
+
+    def update(self, X: np.ndarray):
+        """Add a block of rows, shape (n, n_columns)"""
+        if not len(X):
+            return
+        self.levels[0] = np.concatenate([self.levels[0], X])
+        self.count += len(X)
+        self.minimum = np.minimum(self.minimum, X.min(axis=0))
+        self.maximum = np.maximum(self.maximum, X.max(axis=0))
+        self._compact()
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """New sketch summarising both inputs"""
+        merged = QuantileSketch(self.n_columns, self.k)
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([s.levels[l] for s in (self, other) if l < len(s.levels)])
+            for l in range(depth)
+        ]
+        merged.count = self.count + other.count
+        merged.minimum = np.minimum(self.minimum, other.minimum)
+        merged.maximum = np.maximum(self.maximum, other.maximum)
+        merged._compact()
+        return merged
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            level += 1
+            if len(items) < 2 * self.k:
+                continue
+            items = np.sort(items, axis=0)
+            paired = len(items) // 2 * 2
+            promoted = items[self._rng.integers(2):paired:2]
+            self.levels[level - 1] = items[paired:]
+            if level == len(self.levels):
+                self.levels.append(np.empty((0, self.n_columns)))
+            self.levels[level] = np.concatenate([self.levels[level], promoted])
+
+    def _sorted(self, column: int):
+        """Column items in order with their cumulative weight fractions"""
+        items = np.concatenate([level[:, column] for level in self.levels])
+        weights = np.concatenate([np.full(len(level), 2.0 ** l) for l, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        return items[order], cumulative / cumulative[-1]
+
+    def quantiles(self, qs=REPORT_QUANTILES) -> np.ndarray:
+        """Approximate quantiles, shape (len(qs), n_columns)"""
+        result = np.full((len(qs), self.n_columns), np.nan)
+        if not self.count:
+            return result
+        for j in range(self.n_columns):
+            items, cdf = self._sorted(j)
+            idx = np.minimum(np.searchsorted(cdf, qs), len(items) - 1)
+            result[:, j] = items[idx]
+        return result
+
+    def cdf(self, column: int, points: np.ndarray) -> np.ndarray:
+        """Fraction of rows <= each point"""
+        items, cdf = self._sorted(column)
+        idx = np.searchsorted(items, points, side='right') - 1
+        return np.where(idx >= 0, cdf[np.maximum(idx, 0)], 0.0)
+
+    def ks_distance(self, other: 'QuantileSketch') -> np.ndarray:
+        """Kolmogorov-Smirnov statistic per column against another sketch"""
+        distances = np.full(self.n_columns, np.nan)
+        if not (self.count and other.count):
+            return distances
+        for j in range(self.n_columns):
+            points = np.union1d(self._sorted(j)[0], other._sorted(j)[0])
+            distances[j] = np.abs(self.cdf(j, points) - other.cdf(j, points)).max()
+        return distances
+
+
+class BinnedHistogram:
+    """Counts per column over fixed bin edges (bin i holds edges[i-1] <= x < edges[i])"""
+
+    def __init__(self, edges: List[np.ndarray]):
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in self.edges]
+
+    def state(self) -> Dict:
+        return {'edges': self.edges, 'counts': self.counts}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'BinnedHistogram':
+        histogram = cls(state['edges'])
+        histogram.counts = list(state['counts'])
+        return histogram
+
+    def update(self, X: np.ndarray):
+        for j, edges in enumerate(self.edges):
+            self.counts[j] += np.bincount(
+                np.searchsorted(edges, X[:, j], side='right'), minlength=len(edges) + 1
+            )
+
+    def merge(self, other: 'BinnedHistogram') -> 'BinnedHistogram':
+        merged = BinnedHistogram(self.edges)
+        merged.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return merged
+
+    def psi(self, reference: 'BinnedHistogram', floor: float = 1e-4) -> np.ndarray:
+        """Population stability index per column against reference counts"""
+        scores = np.full(len(self.edges), np.nan)
+        for j, (live, ref) in enumerate(zip(self.counts, reference.counts)):
+            if live.sum() and ref.sum():
+                p = np.maximum(live / live.sum(), floor)
+                q = np.maximum(ref / ref.sum(), floor)
+                scores[j] = float(((p - q) * np.log(p / q)).sum())
+        return scores
+
+
+def build_reference(features: np.ndarray, fraud_probability: np.ndarray, feature_columns: List[str],
+                    n_bins: int = 10, k: int = 256, backend: Optional[str] = None) -> Dict:
+    """
+    Reference sketches from the (unbalanced) evaluation data of a trained model
+
+    Args:
+        features: Unscaled model features, shape (n, len(feature_columns))
+        fraud_probability: The model's output on those rows
+    """
+    X = np.column_stack([np.asarray(features, dtype=np.float64), fraud_probability])
+    # Interior decile cut points; ties collapse, so flags get one edge per value
+    edges = [np.unique(np.quantile(X[:, j], np.linspace(0, 1, n_bins + 1)[1:-1])) for j in range(X.shape[1])]
+    histogram = BinnedHistogram(edges)
+    histogram.update(X)
+    sketch = QuantileSketch(X.shape[1], k=k)
+    sketch.update(X)
+    return {
+        'columns': list(feature_columns) + [OUTPUT_COLUMN],
+        'histogram': histogram.state(),
+        'sketch': sketch.state(),
+        'rows': len(X),
+        'backend': backend,
+        'created_at': time.time()
+    }
+
+
+def save_drift_reference(reference: Dict, path: str = DRIFT_REFERENCE_PATH):
+    joblib.dump(reference, path)
+
+
+def load_drift_reference(model_dir: str) -> Optional[Dict]:
+    """Reference saved next to the model, or None if it wasn't built"""
+    path = os.path.join(model_dir, os.path.basename(DRIFT_REFERENCE_PATH))
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+class DriftMonitor:
+    """
+    Live sketches of the scored stream, compared with the reference on demand
+
+    Rows are copied into a small buffer on the scoring path and folded into
+    the sketches a block at a time. Sketches cover two rotating windows of
+    window_rows each; reports merge them, so they describe the most recent
+    window_rows to 2 * window_rows scored rows.
+    """
+
+    def __init__(self, reference: Dict, window_rows: int = 100000, buffer_rows: int = 512):
+        self.reference = reference
+        self.columns = reference['columns']
+        self._reference_histogram = BinnedHistogram.from_state(reference['histogram'])
+        self._reference_sketch = QuantileSketch.from_state(reference['sketch'])
+        self.window_rows = window_rows
+        self._buffer = np.empty((buffer_rows, len(self.columns)))
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self.rows_seen = 0
+        self._previous = None
+        self._current = self._new_window()
+
+    def _new_window(self) -> Dict:
+        return {
+            'histogram': BinnedHistogram(self._reference_histogram.edges),
+            'sketch': QuantileSketch(len(self.columns), k=self._reference_sketch.k),
+            'started_at': time.time()
+        }
+
+    def update(self, features: np.ndarray, fraud_probability: np.ndarray):
+        """Record scored rows: unscaled model features and the output probability"""
+        n = len(fraud_probability)
+        with self._lock:
+            self.rows_seen += n
+            if self._buffered + n > len(self._buffer):
+                self._flush()
+            if n >= len(self._buffer):
+                self._fold(np.column_stack([features, fraud_probability]))
+                return
+            self._buffer[self._buffered:self._buffered + n, :-1] = features
+            self._buffer[self._buffered:self._buffered + n, -1] = fraud_probability
+            self._buffered += n
+
+    def _flush(self):
+        if self._buffered:
+            self._fold(self._buffer[:self._buffered].copy())
+            self._buffered = 0
+
+    def _fold(self, X: np.ndarray):
+        self._current['histogram'].update(X)
+        self._current['sketch'].update(X)
+        if self._current['sketch'].count >= self.window_rows:
+            self._previous, self._current = self._current, self._new_window()
+
+    def reset(self):
+        with self._lock:
+            self._buffered = 0
+            self._previous = None
+            self._current = self._new_window()
+
+    def report(self) -> Dict:
+        """PSI, KS and quantile shifts per column for the recent windows"""
+        with self._lock:
+            self._flush()
+            histogram, sketch = self._current['histogram'], self._current['sketch']
+            started_at = self._current['started_at']
+            if self._previous is not None:
+                histogram = self._previous['histogram'].merge(histogram)
+                sketch = self._previous['sketch'].merge(sketch)
+                started_at = self._previous['started_at']
+
+        reference_sketch = self._reference_sketch
+        psi = histogram.psi(self._reference_histogram)
+        ks = sketch.ks_distance(reference_sketch)
+        live_q = sketch.quantiles(REPORT_QUANTILES)
+        ref_q = reference_sketch.quantiles(REPORT_QUANTILES)
+
+        def rounded(value):
+            return None if np.isnan(value) else round(float(value), 4)
+
+        columns = {}
+        for j, name in enumerate(self.columns):
+            if np.isnan(psi[j]):
+                status = 'no_data'
+            elif psi[j] > PSI_SIGNIFICANT:
+                status = 'significant'
+            elif psi[j] > PSI_MODERATE:
+                status = 'moderate'
+            else:
+                status = 'stable'
+            columns[name] = {
+                'psi': rounded(psi[j]),
+                'ks': rounded(ks[j]),
+                'status': status,
+                'reference_quantiles': {str(q): rounded(v) for q, v in zip(REPORT_QUANTILES, ref_q[:, j])},
+                'live_quantiles': {str(q): rounded(v) for q, v in zip(REPORT_QUANTILES, live_q[:, j])},
+            }
+
+        drifted = sorted((name for name, c in columns.items() if c['status'] in ('moderate', 'significant')),
+                         key=lambda name: -columns[name]['psi'])
+        return {
+            'rows_in_report': int(sketch.count),
+            'rows_seen': self.rows_seen,
+            'window_started_at': started_at,
+            'reference_rows': self.reference['rows'],
+            'reference_backend': self.reference.get('backend'),
+            'drifted_columns': drifted,
+            'output_drift': columns[OUTPUT_COLUMN]['status'],
+            'columns': columns
+        }
+
+
+def main():
+    """Build a reference for an already trained model from a sample of the dataset"""
+    from benchmark import load_traffic, traffic_columns
+    from fraud_predictor import FraudDetector
+
+    parser = argparse.ArgumentParser(description='Build drift reference sketches for the trained model')
+    parser.add_argument('--rows', type=int, default=200000, help='Transactions to sample')
+    parser.add_argument('--csv', nargs='?', const=os.path.join(SCRIPT_DIR, 'PS_20174392719_1491204439457_log.csv'),
+                        default=None, help='Sample the PaySim CSV instead of fraud_training_data')
+    parser.add_argument('--output', default=DRIFT_REFERENCE_PATH)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BUILDING DRIFT REFERENCE")
+    print("=" * 60)
+
+    detector = FraudDetector(explain=False)
+    if not detector.is_loaded:
+        return
+    df = load_traffic(args.rows, args.csv)
+    columns = traffic_columns(df)
+    X = detector._engineer_feature_frame(columns)
+    fraud_probability, _ = detector.score_frame(X, exact=True)
+    features = X[detector.feature_columns].to_numpy(dtype=np.float64)
+    reference = build_reference(features, fraud_probability, detector.feature_columns, backend=detector.backend)
+    save_drift_reference(reference, args.output)
+    print(f"\nRows: {reference['rows']:,}")
+    print(f"Reference saved to: {args.output} ({os.path.getsize(args.output) / 1e3:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Early-Exit Forest Evaluation
+Walk a random forest's trees in a fixed order and stop, per row, as soon as
+the remaining trees can no longer move the mean probability across a
+risk-level boundary or the is_fraud decision
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Risk-level boundaries (see fraud_predictor.risk_level_array); is_fraud flips above 0.5
+BAND_THRESHOLDS = np.array([0.3, 0.5, 0.8])
+DECISION_THRESHOLD = 0.5
+
+
+def supports_early_exit(model) -> bool:
+    """Whether the model is a fitted binary forest of decision trees"""
+    estimators = getattr(model, 'estimators_', None)
+    return (
+        isinstance(estimators, list) and len(estimators) > 0
+        and all(hasattr(e, 'tree_') for e in estimators)
+        and len(getattr(model, 'classes_', [])) == 2
+    )
+
+
+class EarlyExitForest:
+    """
+    Per-tree leaf probability tables over a fitted RandomForestClassifier
+
+    After k of T trees with running sum S, the final mean is bounded by
+    [S / T, (S + T - k) / T]. Once both ends fall in the same risk band and
+    on the same side of the decision threshold, the row's outcome is fixed
+    and the remaining trees are skipped for it.
+    """
+
+    def __init__(self, forest, small_batch: int = 8):
+        """
+        Args:
+            forest: Fitted binary RandomForestClassifier
+            small_batch: Batches up to this size walk all trees at once over the
+                flattened node arrays, which is exact and, for a handful of rows, faster
+                than exiting early tree by tree (each tree step costs a tree.apply
+                call); larger batches exit early. 0 always exits early. See
+                benchmark.py early-exit for the per-batch-size timings.
+        """
+        self.small_batch = small_batch
+        self.trees = []
+        for estimator in forest.estimators_:
+            value = estimator.tree_.value[:, 0, :]
+            leaf_proba = value[:, 1] / value.sum(axis=1)
+            self.trees.append((estimator.tree_, leaf_proba))
+        self.n_trees = len(self.trees)
+        # No outcome can be fixed while the remaining trees could still span a
+        # whole band, so bounds are first checked once fewer than that remain
+        widest_band = np.diff(np.concatenate([[0.0], BAND_THRESHOLDS, [1.0]])).max()
+        self.first_check = min(int(np.floor(self.n_trees * (1 - widest_band))) + 1, self.n_trees)
+        self._flatten()
+    
+    def _flatten(self):
+        """
+        Concatenate all trees' node arrays into flat left/right/feature/threshold/
+        node_proba arrays (node ids offset by each tree's root in roots); leaves
+        point back at themselves so walks can run a fixed number of steps
+        """
+        left, right, feature, threshold, node_proba, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for tree, proba in self.trees:
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(tree.node_count)
+            left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            node_proba.append(proba)
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.node_proba = np.concatenate(node_proba)
+        self.roots = np.array(roots)
+        self.max_depth = depth
+    
+    def _walk(self, X: np.ndarray) -> np.ndarray:
+        """Flattened leaf ids of every tree for every row, shape (n, n_trees)"""
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+    
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf reached in each tree, as ids into the flattened node arrays, shape (n, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) <= self.small_batch:
+            return self._walk(X)
+        return np.column_stack([tree.apply(X) for tree, _ in self.trees]) + self.roots
+
+    def _decided(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        same_band = (np.searchsorted(BAND_THRESHOLDS, lower, side='right') ==
+                     np.searchsorted(BAND_THRESHOLDS, upper, side='right'))
+        return same_band & ((lower > DECISION_THRESHOLD) == (upper > DECISION_THRESHOLD))
+
+    def predict_proba(self, X: np.ndarray, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fraud probability per row
+
+        Args:
+            X: Scaled feature matrix
+            exact: Evaluate every tree (same result as forest.predict_proba)
+
+        Returns:
+            (fraud_probability, trees_evaluated). Rows that exited early get
+            the mean over the trees evaluated, which lies in the final band.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, T = len(X), self.n_trees
+        sums = np.zeros(n)
+        trees_evaluated = np.full(n, T)
+        fraud_probability = np.empty(n)
+        active = np.arange(n)
+
+        if n <= self.small_batch:
+            return self.node_proba[self._walk(X)].mean(axis=1), trees_evaluated
+        
+        rows, start = X, 0
+        for k in range(self.first_check, T + 1) if not exact else [T]:
+            for tree, leaf_proba in self.trees[start:k]:
+                sums[active] += leaf_proba[tree.apply(rows)]
+            start = k
+            if k == T:
+                break
+            partial = sums[active]
+            decided = self._decided(partial / T, (partial + T - k) / T)
+            if decided.any():
+                done = active[decided]
+                fraud_probability[done] = sums[done] / k
+                trees_evaluated[done] = k
+                active = active[~decided]
+                if not len(active):
+                    break
+                rows = X[active]
+
+        fraud_probability[active] = sums[active] / T
+        return fraud_probability, trees_evaluated
@@ -6,11 +6,24 @@ Flask-based REST API for real-time fraud prediction
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from fraud_predictor import FraudDetector
+from fraud_db import FraudDatabase, DatabaseUnavailable
+from account_store import AccountAggregateStore
+from graph_index import AccountGraph
+from response_encoding import NotAcceptable, columnar_predictions, encode_response, negotiate
+from columnar_input import COLUMNAR_MIMETYPES, ColumnarInputError, decode_columnar
+from audit_log import AuditSink
+from startup import DEFAULT_WARMUP_BATCH_SIZES, Startup, warm_up
+from shadow import ShadowScorer, load_candidates
+from drift import DriftMonitor, load_drift_reference
+from socket_server import SOCKET_ROUTE, ScoringSidecar
+from admission import AdmissionController, parse_deadlines, parse_request_start
+from profile_cache import ProfileCache, load_contact_ids
+import atexit
 import logging
+import os
 from datetime import datetime
 import random
-import sqlite3
-import os
+import numpy as np
 
 # Configure logging
 logging.basicConfig(
@@ -25,36 +38,162 @@ app = Flask(__name__)
 # CORS configuration - allow all origins in production (update for specific domains if needed)
 CORS(app, origins=["*"], methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "Authorization"])
 
-# Initialize fraud detector
-fraud_detector = FraudDetector()
+# Phase timings and readiness of this process
+startup = Startup()
+
+# Pooled read-only access to the fraud training data
+fraud_db = startup.phase('database', FraudDatabase)
+
+# Precomputed per-account aggregates (built by account_store.py), if available
+account_store = startup.phase('account_store', AccountAggregateStore.load)
+
+# Sender-recipient graph index (built by graph_index.py), if available
+account_graph = startup.phase('account_graph', AccountGraph.load)
+
+# Initialize fraud detector (FRAUD_CASCADE=1 screens traffic before the full forest,
+# FRAUD_EARLY_EXIT=1 stops walking trees once the risk level is decided,
+# FRAUD_BINNED=1 walks the trees over bin codes of the split thresholds (numba),
+# FRAUD_COMPACT_MODEL=1 serves the compressed forest artifact (compact_forest.py),
+# FRAUD_MODEL_BACKEND serves another trained backend, e.g. hist_gradient_boosting)
+fraud_detector = FraudDetector(
+    graph_index=account_graph,
+    backend=os.environ.get('FRAUD_MODEL_BACKEND') or None,
+    cascade=os.environ.get('FRAUD_CASCADE') == '1',
+    early_exit=os.environ.get('FRAUD_EARLY_EXIT') == '1',
+    binned=os.environ.get('FRAUD_BINNED') == '1',
+    compact=os.environ.get('FRAUD_COMPACT_MODEL') == '1',
+    load=False
+)
+
+# Load the model and warm it up with synthetic predictions. With
+# FRAUD_API_BACKGROUND_LOAD=1 this happens on a background thread so the port
+# binds immediately; /api/health/ready reports when the model is serving, and
+# until then scoring requests get the rule-only fallback.
+WARMUP_BATCH_SIZES = [
+    int(size) for size in
+    os.environ.get('FRAUD_WARMUP_BATCH_SIZES', ','.join(map(str, DEFAULT_WARMUP_BATCH_SIZES))).split(',')
+    if size.strip() and int(size) > 0
+]
+WARMUP_ROUNDS = int(os.environ.get('FRAUD_WARMUP_ROUNDS', '2'))
+
+# Candidate models scored in shadow on live traffic (FRAUD_SHADOW_MODEL_DIRS is a
+# comma-separated list of model directories). Only the primary model answers;
+# shadow work beyond FRAUD_SHADOW_MAX_PENDING in-flight batches is shed.
+SHADOW_MODEL_DIRS = [d.strip() for d in os.environ.get('FRAUD_SHADOW_MODEL_DIRS', '').split(',') if d.strip()]
+shadow_scorer = None
+
+
+def start_shadow():
+    global shadow_scorer
+    if not SHADOW_MODEL_DIRS or not fraud_detector.is_loaded:
+        return
+    shadow_scorer = ShadowScorer(
+        load_candidates(SHADOW_MODEL_DIRS, fraud_detector),
+        max_workers=int(os.environ.get('FRAUD_SHADOW_WORKERS', '2')),
+        max_pending=int(os.environ.get('FRAUD_SHADOW_MAX_PENDING', '8')),
+        sample_rate=float(os.environ.get('FRAUD_SHADOW_SAMPLE_RATE', '1.0'))
+    )
+    atexit.register(shadow_scorer.close)
+    # Attached after warm-up so synthetic traffic stays out of the report
+    fraud_detector.shadow = shadow_scorer
+
+
+# Drift monitoring against the reference sketches saved at training time
+# (FRAUD_DRIFT_MONITOR=0 disables). Reports cover the last
+# FRAUD_DRIFT_WINDOW_ROWS to twice that many model-scored rows.
+drift_monitor = None
+
+
+def start_drift():
+    global drift_monitor
+    if os.environ.get('FRAUD_DRIFT_MONITOR', '1') == '0' or not fraud_detector.is_loaded:
+        return
+    reference = load_drift_reference(fraud_detector.model_dir)
+    if reference is None:
+        print("⚠️  No drift reference found, drift monitoring disabled (run drift.py to build one)")
+        return
+    if reference['columns'][:-1] != list(fraud_detector.feature_columns):
+        print("⚠️  Drift reference features don't match the model, drift monitoring disabled")
+        return
+    drift_monitor = DriftMonitor(reference, window_rows=int(os.environ.get('FRAUD_DRIFT_WINDOW_ROWS', '100000')))
+    # Attached after warm-up so synthetic traffic stays out of the sketches
+    fraud_detector.drift = drift_monitor
+
+
+startup.run([
+    ('model', fraud_detector.load),
+    ('warm_up', lambda: warm_up(fraud_detector, WARMUP_BATCH_SIZES, WARMUP_ROUNDS)),
+    ('shadow', start_shadow),
+    ('drift', start_drift),
+], background=os.environ.get('FRAUD_API_BACKGROUND_LOAD') == '1')
+
+# Bounded model concurrency: requests wait for a slot until their route's
+# queue deadline, then get the rule-only fallback scorer (as they do while
+# the model is loading or missing)
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get('FRAUD_MAX_IN_FLIGHT', '4')),
+    max_queued=int(os.environ.get('FRAUD_MAX_QUEUED', '16')),
+    deadlines_ms=parse_deadlines(os.environ.get('FRAUD_QUEUE_DEADLINES_MS', ''))
+)
+
+# Asynchronous audit trail of every prediction (FRAUD_AUDIT_LOG=0 disables)
+audit_sink = AuditSink() if os.environ.get('FRAUD_AUDIT_LOG', '1') != '0' else None
+if audit_sink:
+    atexit.register(audit_sink.close)
+
+
+def wants_exact_probability():
+    """?exact=1 asks for the full-forest probability in cascade/early-exit mode"""
+    return request.args.get('exact', '').lower() in ('1', 'true', 'yes')
 
-# Database path for fraud training data
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'securebank.db')
+
+def wants_explanation():
+    """?explain=0 skips feature contributions and returns heuristic risk factors"""
+    return request.args.get('explain', '1').lower() not in ('0', 'false', 'no')
+
+
+def admit():
+    """
+    Admission for the current scoring request; yields None or the reason to
+    fall back to rules. Time spent queued at the proxy (X-Request-Start) counts
+    towards the deadline.
+    """
+    return admission.admit(request.path, parse_request_start(request.headers.get('X-Request-Start')))
+
+
+def audit(endpoint, transactions, results):
+    """Hand prediction records to the audit writer without blocking the request"""
+    if audit_sink:
+        audit_sink.record(endpoint, transactions, results)
+
+
+# Optional binary scoring sidecar on a Unix domain socket for callers on this
+# host (FRAUD_SOCKET_PATH enables it; client in socket_client.py). It shares
+# the detector, admission control and audit log with the HTTP endpoints.
+scoring_socket = None
+if os.environ.get('FRAUD_SOCKET_PATH'):
+    scoring_socket = ScoringSidecar(
+        fraud_detector,
+        path=os.environ['FRAUD_SOCKET_PATH'],
+        admit=lambda: admission.admit(SOCKET_ROUTE),
+        audit=audit
+    )
+    scoring_socket.start()
+    atexit.register(scoring_socket.close)
 
 
 def get_dataset_statistics():
     """Get statistics from the imported PaySim dataset"""
     try:
-        if not os.path.exists(DB_PATH):
+        if not fraud_db.is_available():
             return None
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
         
         # Get total records and fraud count
-        cursor.execute("SELECT COUNT(*), SUM(CASE WHEN is_fraud = 1 THEN 1 ELSE 0 END) FROM fraud_training_data")
-        total, fraud_count = cursor.fetchone()
+        total, fraud_count = fraud_db.fetchone('dataset_counts')
         
         # Get average amounts for fraud vs legitimate
-        cursor.execute("""
-            SELECT 
-                AVG(CASE WHEN is_fraud = 1 THEN amount ELSE NULL END) as avg_fraud_amount,
-                AVG(CASE WHEN is_fraud = 0 THEN amount ELSE NULL END) as avg_legit_amount,
-                MAX(amount) as max_amount
-            FROM fraud_training_data
-        """)
-        avg_fraud, avg_legit, max_amount = cursor.fetchone()
-        
-        conn.close()
+        avg_fraud, avg_legit, max_amount = fraud_db.fetchone('dataset_amounts')
+        
         return {
             'total_records': total,
             'fraud_count': fraud_count or 0,
@@ -68,54 +207,177 @@ def get_dataset_statistics():
         return None
 
 
+# Number of dataset samples drawn per contact for each pattern
+FRAUD_SAMPLE_SIZE = 10
+LEGIT_SAMPLE_SIZE = 20
+
+# Recommendations based on ML model patterns
+PROFILE_RECOMMENDATIONS = {
+    'critical': 'BLOCK RECOMMENDED: Pattern matches confirmed fraud cases in PaySim dataset. Transaction blocked.',
+    'high': 'REVIEW REQUIRED: Similar patterns found in fraud training data. Manual verification needed.',
+    'medium': 'CAUTION: Some risk indicators present. Proceed with additional verification.',
+    'low': 'SAFE: Transaction pattern consistent with legitimate users in dataset.'
+}
+
+ACCOUNT_AGES = ['1 week', '2 weeks', '1 month', '3 months', '6 months', '1 year', '2 years', '3 years']
+
+HISTORY_RISK_TYPES = ('TRANSFER', 'CASH_OUT')
+
+
+def _choose_profile_pattern(risk_bias):
+    """Pick whether a contact follows a fraud pattern and its fraud probability"""
+    if risk_bias == 'critical':
+        return True, random.uniform(0.85, 0.98)
+    elif risk_bias == 'high':
+        return True, random.uniform(0.60, 0.85)
+    elif risk_bias == 'medium':
+        return random.choice([True, False]), random.uniform(0.30, 0.60)
+    elif risk_bias == 'low':
+        return False, random.uniform(0.01, 0.15)
+    # Random based on dataset fraud rate (~1.2% in PaySim)
+    return random.random() < 0.15, random.uniform(0.01, 0.95)  # Increase for demo visibility
+
+
+def _history_pattern(history):
+    """
+    Fraud pattern and probability of a known account from its own record:
+    accounts with confirmed fraud score high to critical by their fraud
+    share, the rest low, rising with their share of TRANSFER/CASH_OUT
+    activity (the only types PaySim fraud uses)
+    """
+    n = history['transaction_count']
+    if history['fraud_count']:
+        return True, 0.60 + 0.38 * history['fraud_count'] / n
+    risky = sum(history['type_counts'].get(t, 0) for t in HISTORY_RISK_TYPES)
+    return False, 0.01 + 0.14 * risky / n
+
+
+def _history_confidence(history):
+    """Profile confidence growing with the number of transactions it rests on"""
+    return round(min(0.99, 0.85 + 0.02 * history['transaction_count']), 2)
+
+
+def _format_account_age(first_step, last_step):
+    """Describe the span between an account's first and last step (1 step = 1 hour)"""
+    hours = last_step - first_step + 1
+    if hours < 48:
+        return f'{hours} hours'
+    days = hours // 24
+    if days < 14:
+        return f'{days} days'
+    if days < 60:
+        return f'{days // 7} weeks'
+    if days < 730:
+        return f'{days // 30} months'
+    return f'{days // 365} years'
+
+
+def _history_statistics(history):
+    """Profile statistics (avg, max, common types) from real account aggregates"""
+    type_counts = history['type_counts']
+    common_types = sorted(type_counts, key=lambda x: type_counts[x], reverse=True)[:2]
+    return history['amount_avg'], history['amount_max'], common_types
+
+
+def _build_contact_profile(contact_id, is_fraud_pattern, fraud_probability,
+                           avg_amount, max_amount, common_types, history=None):
+    """
+    Assemble a contact profile from transaction statistics
+    
+    history: per-account aggregates from the account store. When given, the
+    transaction counts, account age, last activity and confidence are real
+    instead of simulated.
+    """
+    # Determine risk level
+    if fraud_probability >= 0.85:
+        risk_level = 'critical'
+    elif fraud_probability >= 0.60:
+        risk_level = 'high'
+    elif fraud_probability >= 0.30:
+        risk_level = 'medium'
+    else:
+        risk_level = 'low'
+    
+    # Generate risk factors based on actual fraud patterns in dataset
+    risk_factors = []
+    if is_fraud_pattern:
+        if 'CASH_OUT' in common_types:
+            risk_factors.append('High frequency of CASH_OUT transactions (common fraud pattern in PaySim)')
+        if 'TRANSFER' in common_types:
+            risk_factors.append('Large TRANSFER transactions to new accounts detected')
+        if avg_amount > 100000:
+            risk_factors.append(f'Average transaction amount ₹{avg_amount:,.0f} exceeds safe threshold')
+        if max_amount > 500000:
+            risk_factors.append(f'Single transaction of ₹{max_amount:,.0f} flagged as suspicious')
+        
+        # Add more dataset-specific factors
+        risk_factors.append('Transaction pattern matches known fraud profiles in training dataset')
+        if history:
+            risk_factors.append(f"{history['fraud_count']} of {history['transaction_count']} "
+                                f"account transactions are confirmed fraud in PaySim")
+        elif random.random() > 0.5:
+            risk_factors.append('Balance anomalies detected (typical of fraudulent transfers)')
+    
+    if history:
+        hist_transactions = history['transaction_count']
+        flagged = history['fraud_count']
+        account_age = _format_account_age(history['first_step'], history['last_step'])
+        last_activity = f"{history['idle_steps'] + 1} hours ago"
+        model_confidence = _history_confidence(history)
+    else:
+        # Simulated history for contacts the dataset has never seen
+        if is_fraud_pattern:
+            hist_transactions = random.randint(5, 30)
+            flagged = max(1, int(hist_transactions * random.uniform(0.2, 0.5)))
+            account_age = random.choice(ACCOUNT_AGES[:4])  # Newer accounts for fraud
+        else:
+            hist_transactions = random.randint(50, 500)
+            flagged = random.randint(0, 2)
+            account_age = random.choice(ACCOUNT_AGES[3:])  # Older accounts for legit
+        last_activity = f'{random.randint(1, 24)} hours ago'
+        model_confidence = round(random.uniform(0.85, 0.99), 2)
+    
+    return {
+        'contact_id': contact_id,
+        'risk_score': round(fraud_probability, 3),
+        'risk_level': risk_level,
+        'is_flagged': is_fraud_pattern,
+        'ml_prediction': is_fraud_pattern,
+        'historical_transactions': hist_transactions,
+        'flagged_transactions': flagged,
+        'avg_transaction_amount': round(float(avg_amount), 2),
+        'max_transaction_amount': round(float(max_amount), 2),
+        'common_transaction_types': common_types,
+        'account_age': account_age,
+        'risk_factors': risk_factors,
+        'recommendation': PROFILE_RECOMMENDATIONS[risk_level],
+        'data_source': 'PaySim account history' if history else 'PaySim ML Dataset',
+        'model_confidence': model_confidence,
+        'last_activity': last_activity
+    }
+
+
 def generate_contact_profile_from_dataset(contact_id, risk_bias=None):
     """
     Generate a realistic contact fraud profile based on actual PaySim dataset patterns
     risk_bias: 'low', 'medium', 'high', 'critical' or None for random
     """
     try:
-        if not os.path.exists(DB_PATH):
-            raise Exception("Database not found")
-            
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        # Known accounts are served from the precomputed aggregates, with the
+        # pattern taken from their own record rather than the demo bias
+        history = account_store.lookup(contact_id) if account_store else None
+        if history:
+            return _build_contact_profile(
+                contact_id, *_history_pattern(history),
+                *_history_statistics(history), history=history
+            )
         
         # Determine if this contact should be fraud-like based on bias
-        if risk_bias == 'critical':
-            is_fraud_pattern = True
-            fraud_probability = random.uniform(0.85, 0.98)
-        elif risk_bias == 'high':
-            is_fraud_pattern = True
-            fraud_probability = random.uniform(0.60, 0.85)
-        elif risk_bias == 'medium':
-            is_fraud_pattern = random.choice([True, False])
-            fraud_probability = random.uniform(0.30, 0.60)
-        elif risk_bias == 'low':
-            is_fraud_pattern = False
-            fraud_probability = random.uniform(0.01, 0.15)
-        else:
-            # Random based on dataset fraud rate (~1.2% in PaySim)
-            is_fraud_pattern = random.random() < 0.15  # Increase for demo visibility
-            fraud_probability = random.uniform(0.01, 0.95)
+        is_fraud_pattern, fraud_probability = _choose_profile_pattern(risk_bias)
         
         # Get sample transactions matching the pattern
-        if is_fraud_pattern:
-            cursor.execute("""
-                SELECT type, amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest
-                FROM fraud_training_data 
-                WHERE is_fraud = 1 
-                ORDER BY RANDOM() LIMIT 10
-            """)
-        else:
-            cursor.execute("""
-                SELECT type, amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest
-                FROM fraud_training_data 
-                WHERE is_fraud = 0 
-                ORDER BY RANDOM() LIMIT 20
-            """)
-        
-        sample_transactions = cursor.fetchall()
-        conn.close()
+        sample_size = FRAUD_SAMPLE_SIZE if is_fraud_pattern else LEGIT_SAMPLE_SIZE
+        sample_transactions = fraud_db.fetchall('profile_samples', (int(is_fraud_pattern), sample_size))
         
         if not sample_transactions:
             raise Exception("No sample data found")
@@ -132,77 +394,124 @@ def generate_contact_profile_from_dataset(contact_id, risk_bias=None):
             type_counts[t] = type_counts.get(t, 0) + 1
         common_types = sorted(type_counts.keys(), key=lambda x: type_counts[x], reverse=True)[:2]
         
-        # Determine risk level
-        if fraud_probability >= 0.85:
-            risk_level = 'critical'
-        elif fraud_probability >= 0.60:
-            risk_level = 'high'
-        elif fraud_probability >= 0.30:
-            risk_level = 'medium'
-        else:
-            risk_level = 'low'
+        return _build_contact_profile(
+            contact_id, is_fraud_pattern, fraud_probability,
+            avg_amount, max_amount, common_types
+        )
         
-        # Generate risk factors based on actual fraud patterns in dataset
-        risk_factors = []
-        if is_fraud_pattern:
-            if 'CASH_OUT' in common_types:
-                risk_factors.append('High frequency of CASH_OUT transactions (common fraud pattern in PaySim)')
-            if 'TRANSFER' in common_types:
-                risk_factors.append('Large TRANSFER transactions to new accounts detected')
-            if avg_amount > 100000:
-                risk_factors.append(f'Average transaction amount ₹{avg_amount:,.0f} exceeds safe threshold')
-            if max_amount > 500000:
-                risk_factors.append(f'Single transaction of ₹{max_amount:,.0f} flagged as suspicious')
-            
-            # Add more dataset-specific factors
-            risk_factors.append('Transaction pattern matches known fraud profiles in training dataset')
-            if random.random() > 0.5:
-                risk_factors.append('Balance anomalies detected (typical of fraudulent transfers)')
+    except Exception as e:
+        logger.error(f"Error generating profile: {e}")
+        return None
+
+
+def _sample_pattern_statistics(is_fraud, n_contacts, sample_size):
+    """
+    Fetch samples for every contact of one pattern in a single query and
+    reduce them to per-contact (avg_amount, max_amount, common_types)
+    """
+    rows = fraud_db.fetchall('profile_samples', (is_fraud, n_contacts * sample_size))
+    if not rows:
+        raise Exception("No sample data found")
+    
+    types, amounts = zip(*((r[0], r[1]) for r in rows))
+    type_names, type_codes = np.unique(np.asarray(types), return_inverse=True)
+    
+    # Small tables are reused across contacts so every contact gets a full sample
+    type_codes = np.resize(type_codes, n_contacts * sample_size).reshape(n_contacts, sample_size)
+    amounts = np.resize(np.asarray(amounts, dtype=np.float64), type_codes.shape)
+    
+    avg_amounts = amounts.mean(axis=1)
+    max_amounts = amounts.max(axis=1)
+    
+    # Per-contact type histogram, most common first (ties keep first-seen order)
+    n_types = len(type_names)
+    offsets = np.arange(n_contacts)[:, None] * n_types
+    type_counts = np.bincount((type_codes + offsets).ravel(), minlength=n_contacts * n_types)
+    type_counts = type_counts.reshape(n_contacts, n_types)
+    first_seen = np.full((n_contacts, n_types), sample_size)
+    rows_idx = np.repeat(np.arange(n_contacts), sample_size)
+    positions = np.tile(np.arange(sample_size), n_contacts)
+    np.minimum.at(first_seen, (rows_idx, type_codes.ravel()), positions)
+    order = np.lexsort((first_seen, -type_counts), axis=1)[:, :2]
+    
+    return [
+        (avg_amounts[i], max_amounts[i],
+         [str(type_names[code]) for code in order[i] if type_counts[i, code] > 0])
+        for i in range(n_contacts)
+    ]
+
+
+def generate_contact_profiles_batch(contacts):
+    """
+    Generate fraud profiles for many contacts with one sampling query per pattern
+    
+    Args:
+        contacts: list of (contact_id, risk_bias) tuples
         
-        # Generate historical transaction counts
-        if is_fraud_pattern:
-            hist_transactions = random.randint(5, 30)
-            flagged = max(1, int(hist_transactions * random.uniform(0.2, 0.5)))
+    Returns:
+        List of profiles in the same order as contacts
+    """
+    if not contacts:
+        return []
+    try:
+        if not fraud_db.is_available():
+            raise DatabaseUnavailable("Database not found")
+        
+        # Known accounts are served from the precomputed aggregates
+        if account_store:
+            histories = account_store.lookup_many([contact_id for contact_id, _ in contacts])
         else:
-            hist_transactions = random.randint(50, 500)
-            flagged = random.randint(0, 2)
+            histories = [None] * len(contacts)
+        patterns = [
+            _history_pattern(history) if history else _choose_profile_pattern(risk_bias)
+            for (_, risk_bias), history in zip(contacts, histories)
+        ]
+        stats = [_history_statistics(h) if h else None for h in histories]
         
-        # Generate recommendations based on ML model patterns
-        recommendations = {
-            'critical': 'BLOCK RECOMMENDED: Pattern matches confirmed fraud cases in PaySim dataset. Transaction blocked.',
-            'high': 'REVIEW REQUIRED: Similar patterns found in fraud training data. Manual verification needed.',
-            'medium': 'CAUTION: Some risk indicators present. Proceed with additional verification.',
-            'low': 'SAFE: Transaction pattern consistent with legitimate users in dataset.'
-        }
+        # Everyone else shares one sampling query per pattern
+        fraud_idx = [i for i, (is_fraud_pattern, _) in enumerate(patterns) if is_fraud_pattern and not histories[i]]
+        legit_idx = [i for i, (is_fraud_pattern, _) in enumerate(patterns) if not is_fraud_pattern and not histories[i]]
         
-        account_ages = ['1 week', '2 weeks', '1 month', '3 months', '6 months', '1 year', '2 years', '3 years']
-        if is_fraud_pattern:
-            account_age = random.choice(account_ages[:4])  # Newer accounts for fraud
-        else:
-            account_age = random.choice(account_ages[3:])  # Older accounts for legit
+        for is_fraud, indices, sample_size in ((1, fraud_idx, FRAUD_SAMPLE_SIZE),
+                                               (0, legit_idx, LEGIT_SAMPLE_SIZE)):
+            if indices:
+                for i, contact_stats in zip(indices, _sample_pattern_statistics(
+                        is_fraud, len(indices), sample_size)):
+                    stats[i] = contact_stats
         
-        return {
-            'contact_id': contact_id,
-            'risk_score': round(fraud_probability, 3),
-            'risk_level': risk_level,
-            'is_flagged': is_fraud_pattern,
-            'ml_prediction': is_fraud_pattern,
-            'historical_transactions': hist_transactions,
-            'flagged_transactions': flagged,
-            'avg_transaction_amount': round(avg_amount, 2),
-            'max_transaction_amount': round(max_amount, 2),
-            'common_transaction_types': common_types,
-            'account_age': account_age,
-            'risk_factors': risk_factors,
-            'recommendation': recommendations[risk_level],
-            'data_source': 'PaySim ML Dataset',
-            'model_confidence': round(random.uniform(0.85, 0.99), 2),
-            'last_activity': f'{random.randint(1, 24)} hours ago'
-        }
+        return [
+            _build_contact_profile(contact_id, is_fraud_pattern, fraud_probability, *stats[i], history=histories[i])
+            for i, ((contact_id, _), (is_fraud_pattern, fraud_probability)) in enumerate(zip(contacts, patterns))
+        ]
         
     except Exception as e:
-        logger.error(f"Error generating profile: {e}")
-        return None
+        logger.error(f"Error generating batch profiles: {e}")
+        return []
+
+
+# Contact profiles cached by (contact_id, risk_bias) and refreshed in the
+# background before they expire (FRAUD_PROFILE_CACHE=0 disables). The
+# dashboard's contacts (src/data/contacts.js) are loaded at startup for each
+# bias in FRAUD_PROFILE_WARM_BIASES ('none' = no bias) and kept warm.
+profile_cache = None
+if os.environ.get('FRAUD_PROFILE_CACHE', '1') != '0':
+    profile_cache = ProfileCache(
+        generate_contact_profiles_batch,
+        ttl=float(os.environ.get('FRAUD_PROFILE_CACHE_TTL', '300')),
+        max_entries=int(os.environ.get('FRAUD_PROFILE_CACHE_SIZE', '10000'))
+    )
+    atexit.register(profile_cache.close)
+    warm_biases = [
+        None if bias.strip() == 'none' else bias.strip()
+        for bias in os.environ.get('FRAUD_PROFILE_WARM_BIASES', 'none').split(',') if bias.strip()
+    ]
+    startup.phase('profile_cache', lambda: profile_cache.warm(
+        [(contact_id, bias) for contact_id in load_contact_ids() for bias in warm_biases]
+    ))
+
+
+def profile_key(contact_id, risk_bias):
+    return str(contact_id), None if risk_bias is None else str(risk_bias)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -211,10 +520,32 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'model_loaded': fraud_detector.is_loaded,
+        'ready': startup.ready.is_set() and fraud_detector.is_loaded,
         'timestamp': datetime.now().isoformat()
     })
 
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({
+        'status': 'alive',
+        'uptime_seconds': startup.status()['uptime_seconds']
+    })
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: model loaded and warmed up; includes startup timings by phase"""
+    ready = startup.ready.is_set() and fraud_detector.is_loaded
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'model_loaded': fraud_detector.is_loaded,
+        'startup': startup.status(),
+        'model_load_ms': fraud_detector.load_timings
+    }), 200 if ready else 503
+
+
 @app.route('/api/model/info', methods=['GET'])
 def model_info():
     """Get model information"""
@@ -237,8 +568,19 @@ def predict_fraud():
         "oldbalanceDest": 0.00,
         "newbalanceDest": 1000.00
     }
+    
+    With early exit or the cascade enabled, fraud_probability may be an
+    estimate inside the correct risk level (probability_exact: false);
+    pass ?exact=1 for the full-forest value.
+    
+    risk_factors and top_features come from the forest's tree-path feature
+    contributions; ?explain=0 skips them and returns heuristic risk factors.
+    
+    prediction.scorer is 'model', or 'rules' with a degraded_reason when the
+    model is loading/missing or the request was shed under load.
     """
     try:
+        fmt, _ = negotiate(request)
         transaction = request.get_json()
         
         if not transaction:
@@ -258,22 +600,26 @@ def predict_fraud():
             }), 400
         
         # Get prediction
-        result = fraud_detector.predict(transaction)
-        
-        # Log the prediction
-        logger.info(
-            f"Prediction: type={transaction.get('type')}, "
-            f"amount={transaction.get('amount')}, "
-            f"is_fraud={result['is_fraud']}, "
-            f"probability={result['fraud_probability']}"
+        with admit() as fallback:
+            result = fraud_detector.predict(transaction, exact=wants_exact_probability(),
+                                            explain=wants_explanation(), fallback=fallback)
+        
+        # Full record goes to the audit log; only format a line if debugging
+        audit('/api/predict', [transaction], [result])
+        logger.debug(
+            "Prediction: type=%s, amount=%s, is_fraud=%s, probability=%s",
+            transaction.get('type'), transaction.get('amount'),
+            result['is_fraud'], result['fraud_probability']
         )
         
-        return jsonify({
+        return encode_response({
             'status': 'success',
             'transaction_id': transaction.get('transaction_id', 'N/A'),
             'prediction': result
-        })
+        }, fmt)
         
+    except NotAcceptable as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 406
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return jsonify({
@@ -282,6 +628,21 @@ def predict_fraud():
         }), 500
 
 
+def _batch_response(results, fmt, layout):
+    """Encode batch prediction results in the negotiated format and layout"""
+    # Count fraud detected
+    fraud_count = sum(1 for r in results if r['is_fraud'])
+    
+    logger.info(f"Batch prediction: {len(results)} transactions, {fraud_count} fraud detected")
+    
+    return encode_response({
+        'status': 'success',
+        'total': len(results),
+        'fraud_detected': fraud_count,
+        'predictions': columnar_predictions(results) if layout == 'columnar' else results
+    }, fmt)
+
+
 @app.route('/api/predict/batch', methods=['POST'])
 def predict_batch():
     """
@@ -295,8 +656,26 @@ def predict_batch():
             ...
         ]
     }
+    
+    The body may instead be columnar binary (Content-Type
+    application/vnd.apache.arrow.stream or application/x-npz, see
+    columnar_input.py), which is scored without per-row objects.
+    
+    Responses are JSON or msgpack (Accept: application/msgpack). With
+    ?layout=columnar, predictions come back as parallel arrays plus shared
+    lookup tables instead of one object per transaction.
     """
     try:
+        fmt, layout = negotiate(request)
+        
+        if request.mimetype in COLUMNAR_MIMETYPES:
+            columns = decode_columnar(request.get_data(), request.mimetype)
+            with admit() as fallback:
+                results = fraud_detector.predict_columns(columns, exact=wants_exact_probability(),
+                                                         explain=wants_explanation(), fallback=fallback)
+            audit('/api/predict/batch', columns, results)
+            return _batch_response(results, fmt, layout)
+        
         data = request.get_json()
         
         if not data or 'transactions' not in data:
@@ -313,20 +692,20 @@ def predict_batch():
                 'status': 'error'
             }), 400
         
-        results = fraud_detector.predict_batch(transactions)
-        
-        # Count fraud detected
-        fraud_count = sum(1 for r in results if r['is_fraud'])
-        
-        logger.info(f"Batch prediction: {len(transactions)} transactions, {fraud_count} fraud detected")
+        with admit() as fallback:
+            results = fraud_detector.predict_batch(transactions, exact=wants_exact_probability(),
+                                                   explain=wants_explanation(), fallback=fallback)
+        audit('/api/predict/batch', transactions, results)
+        return _batch_response(results, fmt, layout)
         
+    except ColumnarInputError as e:
         return jsonify({
-            'status': 'success',
-            'total': len(transactions),
-            'fraud_detected': fraud_count,
-            'predictions': results
-        })
-        
+            'error': str(e),
+            'column_errors': e.errors,
+            'status': 'error'
+        }), 400
+    except NotAcceptable as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 406
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         return jsonify({
@@ -335,6 +714,38 @@ def predict_batch():
         }), 500
 
 
+# Frontend transaction types accepted by /api/analyze
+ANALYZE_TYPES = {
+    'TRANSFER': 'TRANSFER',
+    'PAYMENT': 'PAYMENT',
+    'SEND': 'TRANSFER',
+    'PAY': 'PAYMENT',
+    'CASH_OUT': 'CASH_OUT',
+    'WITHDRAW': 'CASH_OUT',
+    'DEPOSIT': 'CASH_IN',
+    'CASH_IN': 'CASH_IN'
+}
+
+
+def analyze_request_transaction(data):
+    """Map the simplified /api/analyze fields to a model transaction"""
+    amount = float(data.get('amount', 0))
+    sender_balance = float(data.get('sender_balance', 0))
+    recipient_balance = float(data.get('recipient_balance', 0))
+    trans_type = data.get('transaction_type', 'transfer').upper()
+    
+    return {
+        'type': ANALYZE_TYPES.get(trans_type, 'TRANSFER'),
+        'amount': amount,
+        'nameOrig': data.get('sender_id', 'C0000000000'),
+        'oldbalanceOrg': sender_balance,
+        'newbalanceOrig': max(0, sender_balance - amount),
+        'nameDest': data.get('recipient_id', 'C0000000000'),
+        'oldbalanceDest': recipient_balance,
+        'newbalanceDest': recipient_balance + amount
+    }
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_transaction():
     """
@@ -350,6 +761,7 @@ def analyze_transaction():
     }
     """
     try:
+        fmt, _ = negotiate(request)
         data = request.get_json()
         
         if not data:
@@ -358,52 +770,30 @@ def analyze_transaction():
                 'status': 'error'
             }), 400
         
-        # Map simplified fields to model format
-        amount = float(data.get('amount', 0))
-        sender_balance = float(data.get('sender_balance', 0))
-        recipient_balance = float(data.get('recipient_balance', 0))
-        trans_type = data.get('transaction_type', 'transfer').upper()
-        
-        # Map transaction types
-        type_mapping = {
-            'TRANSFER': 'TRANSFER',
-            'PAYMENT': 'PAYMENT',
-            'SEND': 'TRANSFER',
-            'PAY': 'PAYMENT',
-            'CASH_OUT': 'CASH_OUT',
-            'WITHDRAW': 'CASH_OUT',
-            'DEPOSIT': 'CASH_IN',
-            'CASH_IN': 'CASH_IN'
-        }
-        
-        mapped_type = type_mapping.get(trans_type, 'TRANSFER')
-        
-        # Create transaction object
-        transaction = {
-            'type': mapped_type,
-            'amount': amount,
-            'nameOrig': data.get('sender_id', 'C0000000000'),
-            'oldbalanceOrg': sender_balance,
-            'newbalanceOrig': max(0, sender_balance - amount),
-            'nameDest': data.get('recipient_id', 'C0000000000'),
-            'oldbalanceDest': recipient_balance,
-            'newbalanceDest': recipient_balance + amount
-        }
+        transaction = analyze_request_transaction(data)
         
-        result = fraud_detector.predict(transaction)
+        with admit() as fallback:
+            result = fraud_detector.predict(transaction, exact=wants_exact_probability(),
+                                            explain=wants_explanation(), fallback=fallback)
+        audit('/api/analyze', [transaction], [result])
         
         # Return simplified response for frontend
-        return jsonify({
+        return encode_response({
             'status': 'success',
             'is_fraud': result['is_fraud'],
             'fraud_probability': result['fraud_probability'],
             'risk_level': result['risk_level'],
             'risk_factors': result['risk_factors'],
+            'top_features': result.get('top_features', []),
             'recommendation': result['recommendation'],
             'should_block': result['is_fraud'] or result['risk_level'] == 'critical',
-            'requires_review': result['risk_level'] in ['high', 'critical']
-        })
+            'requires_review': result['risk_level'] in ['high', 'critical'],
+            'scorer': result.get('scorer'),
+            'degraded_reason': result.get('degraded_reason')
+        }, fmt)
         
+    except NotAcceptable as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 406
     except Exception as e:
         logger.error(f"Analysis error: {e}")
         return jsonify({
@@ -412,6 +802,128 @@ def analyze_transaction():
         }), 500
 
 
+# Largest amount grid /api/analyze/sweep scores in one request
+SWEEP_MAX_POINTS = int(os.environ.get('FRAUD_SWEEP_MAX_POINTS', '1000'))
+SWEEP_MAX_AMOUNT = float(os.environ.get('FRAUD_SWEEP_MAX_AMOUNT', '1e12'))
+RISK_BANDS = ['low', 'medium', 'high', 'critical']
+
+
+def sweep_amount_grid(data):
+    """
+    Amount grid for /api/analyze/sweep: min_amount (default 1) to max_amount
+    (default sender_balance), points (default 100) amounts spaced linearly or
+    with scale 'log', rounded to cents
+    """
+    try:
+        min_amount = float(data.get('min_amount', 1))
+        max_amount = float(data.get('max_amount', data.get('sender_balance', 0)))
+        balances = [float(data.get(name, 0)) for name in ('sender_balance', 'recipient_balance')]
+        points = int(data.get('points', 100))
+    except (TypeError, OverflowError):
+        # e.g. a list or null amount, or points sent as Infinity
+        raise ValueError('min_amount, max_amount, balances and points must be numbers')
+    scale = str(data.get('scale', 'linear')).lower()
+    
+    values = np.array([min_amount, max_amount] + balances)
+    if not (np.isfinite(values).all() and np.abs(values).max() <= SWEEP_MAX_AMOUNT):
+        raise ValueError(f'Amounts and balances must be finite and at most {SWEEP_MAX_AMOUNT:,.0f}')
+    if not 0 < min_amount < max_amount:
+        raise ValueError('Expected 0 < min_amount < max_amount (max_amount defaults to sender_balance)')
+    if not 2 <= points <= SWEEP_MAX_POINTS:
+        raise ValueError(f'points must be between 2 and {SWEEP_MAX_POINTS}')
+    if scale not in ('linear', 'log'):
+        raise ValueError("scale must be 'linear' or 'log'")
+    
+    space = np.geomspace if scale == 'log' else np.linspace
+    return np.unique(np.round(space(min_amount, max_amount, points), 2))
+
+
+def band_limits(amounts, risk_levels):
+    """
+    Per risk band, the largest amount up to which every swept amount stays
+    at or below that band (None if the smallest already exceeds it), and
+    the first amount that doesn't
+    """
+    ranks = np.array([RISK_BANDS.index(level) for level in risk_levels])
+    limits = {}
+    for rank, band in enumerate(RISK_BANDS):
+        above = np.flatnonzero(ranks > rank)
+        first = above[0] if len(above) else len(amounts)
+        limits[band] = {
+            'max_amount': float(amounts[first - 1]) if first > 0 else None,
+            'next_amount': float(amounts[first]) if first < len(amounts) else None
+        }
+    return limits
+
+
+@app.route('/api/analyze/sweep', methods=['POST'])
+def analyze_sweep():
+    """
+    Risk curve of a transaction over a range of amounts, e.g. to show how
+    large a transfer can be before it is flagged
+    
+    Request body: the /api/analyze fields (amount is ignored) plus
+    {
+        "min_amount": 1.00,
+        "max_amount": 20000.00,
+        "points": 100,
+        "scale": "linear"
+    }
+    
+    Every amount is engineered into one feature matrix and scored in a
+    single batched pass. Nothing is recorded: sender velocity is read but
+    not updated, and the sweep is not audited.
+    
+    bands.<level>.max_amount is the largest amount below which the whole
+    curve stays at or under that risk level; max_safe_amount is the one
+    for 'medium', i.e. neither blocked nor sent to review.
+    """
+    try:
+        fmt, _ = negotiate(request)
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'error': 'No data provided',
+                'status': 'error'
+            }), 400
+        
+        try:
+            amounts = sweep_amount_grid(data)
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        with admit() as fallback:
+            sweep = fraud_detector.sweep_amounts(analyze_request_transaction(data), amounts,
+                                                 exact=wants_exact_probability(), fallback=fallback)
+        bands = band_limits(amounts, sweep['risk_level'])
+        
+        return encode_response({
+            'status': 'success',
+            'points': len(amounts),
+            'amounts': amounts.tolist(),
+            'fraud_probability': np.round(sweep['fraud_probability'], 4).tolist(),
+            'risk_level': sweep['risk_level'].tolist(),
+            'bands': bands,
+            'max_safe_amount': bands['medium']['max_amount'],
+            'probability_exact': bool(sweep['probability_exact'].all()),
+            'scorer': sweep['scorer'],
+            'degraded_reason': sweep.get('degraded_reason')
+        }, fmt)
+    
+    except NotAcceptable as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 406
+    except Exception as e:
+        logger.error(f"Sweep error: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+
 @app.route('/api/dataset/stats', methods=['GET'])
 def dataset_stats():
     """Get statistics from the imported PaySim dataset"""
@@ -429,6 +941,159 @@ def dataset_stats():
         }), 500
 
 
+@app.route('/api/db/stats', methods=['GET'])
+def db_stats():
+    """Query timings and connection pool state for the dataset database"""
+    return jsonify({
+        'status': 'success',
+        'database': fraud_db.query_stats()
+    })
+
+
+@app.route('/api/audit/stats', methods=['GET'])
+def audit_stats():
+    """Queue depth, drops and write throughput of the prediction audit log"""
+    if not audit_sink:
+        return jsonify({
+            'status': 'error',
+            'error': 'Audit log disabled (FRAUD_AUDIT_LOG=0)'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'audit': audit_sink.stats()
+    })
+
+
+@app.route('/api/socket/stats', methods=['GET'])
+def socket_stats():
+    """Connections, frames and rows scored through the Unix socket sidecar"""
+    if not scoring_socket:
+        return jsonify({
+            'status': 'error',
+            'error': 'Socket sidecar disabled (set FRAUD_SOCKET_PATH)'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'socket': scoring_socket.report()
+    })
+
+
+@app.route('/api/contacts/profiles/cache', methods=['GET'])
+def profile_cache_stats():
+    """Hit rates, refreshes and size of the contact profile cache"""
+    if not profile_cache:
+        return jsonify({
+            'status': 'error',
+            'error': 'Profile cache disabled (FRAUD_PROFILE_CACHE=0)'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'cache': profile_cache.stats()
+    })
+
+
+@app.route('/api/admission/stats', methods=['GET'])
+def admission_stats():
+    """In-flight and queued requests, shed counts per route and fallback-scored rows"""
+    return jsonify({
+        'status': 'success',
+        'admission': admission.stats(),
+        'fallback_rows': dict(fraud_detector.fallback_stats)
+    })
+
+
+@app.route('/api/shadow/report', methods=['GET'])
+def shadow_report():
+    """Agreement, probability deltas and latency of shadow candidate models"""
+    if not shadow_scorer:
+        return jsonify({
+            'status': 'error',
+            'error': 'Shadow scoring disabled (set FRAUD_SHADOW_MODEL_DIRS)'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'primary_model_dir': fraud_detector.model_dir,
+        'shadow': shadow_scorer.report()
+    })
+
+
+@app.route('/api/drift', methods=['GET'])
+def drift_report():
+    """PSI and KS drift of each model feature and the output probability against training"""
+    if not drift_monitor:
+        return jsonify({
+            'status': 'error',
+            'error': 'Drift monitoring disabled (no drift reference or FRAUD_DRIFT_MONITOR=0)'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'drift': drift_monitor.report()
+    })
+
+
+@app.route('/api/drift/reset', methods=['POST'])
+def drift_reset():
+    """Start a fresh drift window, e.g. after a deliberate change in traffic"""
+    if not drift_monitor:
+        return jsonify({
+            'status': 'error',
+            'error': 'Drift monitoring disabled (no drift reference or FRAUD_DRIFT_MONITOR=0)'
+        }), 404
+    drift_monitor.reset()
+    return jsonify({'status': 'success'})
+
+
+@app.route('/api/accounts/store', methods=['GET'])
+def account_store_info():
+    """Size of the precomputed per-account aggregate store"""
+    if not account_store:
+        return jsonify({
+            'status': 'error',
+            'error': 'Account store not built. Run account_store.py first.'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'store': account_store.get_info()
+    })
+
+
+@app.route('/api/graph/profile', methods=['POST'])
+def graph_profile():
+    """
+    Get the transaction-graph profile of an account
+    
+    Request body:
+    {
+        "account_id": "C1234567890"
+    }
+    """
+    if account_graph is None:
+        return jsonify({
+            'status': 'error',
+            'error': 'Graph index not built. Run graph_index.py first.'
+        }), 404
+    
+    data = request.get_json(silent=True) or {}
+    account_id = data.get('account_id')
+    if not account_id:
+        return jsonify({
+            'error': 'No account_id provided',
+            'status': 'error'
+        }), 400
+    
+    profile = account_graph.account_profile(account_id)
+    if profile is None:
+        return jsonify({
+            'status': 'error',
+            'error': f'Account {account_id} not found in transaction graph'
+        }), 404
+    
+    return jsonify({
+        'status': 'success',
+        'profile': profile
+    })
+
+
 @app.route('/api/contact/profile', methods=['POST'])
 def get_contact_fraud_profile():
     """
@@ -445,7 +1110,10 @@ def get_contact_fraud_profile():
         contact_id = data.get('contact_id', 'unknown')
         risk_bias = data.get('risk_bias')
         
-        profile = generate_contact_profile_from_dataset(contact_id, risk_bias)
+        if profile_cache:
+            profile = profile_cache.get(profile_key(contact_id, risk_bias))
+        else:
+            profile = generate_contact_profile_from_dataset(contact_id, risk_bias)
         
         if profile:
             logger.info(f"Generated profile for {contact_id}: risk_level={profile['risk_level']}")
@@ -485,13 +1153,14 @@ def get_multiple_contact_profiles():
         data = request.get_json()
         contacts = data.get('contacts', [])
         
-        profiles = []
-        for contact in contacts:
-            contact_id = contact.get('id', f'contact-{len(profiles)}')
-            risk_bias = contact.get('risk_bias')
-            profile = generate_contact_profile_from_dataset(contact_id, risk_bias)
-            if profile:
-                profiles.append(profile)
+        keys = [
+            profile_key(contact.get('id', f'contact-{i}'), contact.get('risk_bias'))
+            for i, contact in enumerate(contacts)
+        ]
+        if profile_cache:
+            profiles = [profile for profile in profile_cache.get_many(keys) if profile is not None]
+        else:
+            profiles = generate_contact_profiles_batch(keys)
         
         logger.info(f"Generated {len(profiles)} contact profiles from dataset")
         
@@ -529,7 +1198,13 @@ if __name__ == '__main__':
     print("\n" + "=" * 60)
     print("🛡️  FRAUD DETECTION API SERVER")
     print("=" * 60)
-    print(f"\nModel Status: {'✅ Loaded' if fraud_detector.is_loaded else '❌ Not Loaded'}")
+    if fraud_detector.is_loaded:
+        print(f"\nModel Status: ✅ Loaded")
+    elif not startup.ready.is_set() and startup.error is None:
+        print(f"\nModel Status: ⏳ Loading in background")
+    else:
+        print(f"\nModel Status: ❌ Not Loaded")
+    print(f"Startup phases (ms): {startup.phases}")
     
     # Show dataset stats
     stats = get_dataset_statistics()
@@ -538,15 +1213,31 @@ if __name__ == '__main__':
         print(f"   Total Records: {stats['total_records']:,}")
         print(f"   Fraud Cases: {stats['fraud_count']:,} ({stats['fraud_rate']:.2f}%)")
     
+    if scoring_socket:
+        print(f"\n🔌 Scoring socket: {scoring_socket.path}")
+    
     print("\nEndpoints:")
     print("  GET  /api/health            - Health check")
+    print("  GET  /api/health/live       - Liveness probe")
+    print("  GET  /api/health/ready      - Readiness probe with startup timings")
     print("  GET  /api/model/info        - Model information")
     print("  GET  /api/dataset/stats     - Dataset statistics")
+    print("  GET  /api/db/stats          - Dataset query timings")
+    print("  GET  /api/accounts/store    - Per-account aggregate store info")
+    print("  GET  /api/audit/stats       - Prediction audit log queue and drops")
+    print("  GET  /api/shadow/report     - Shadow candidate model comparison")
+    print("  GET  /api/admission/stats   - Load shedding and fallback scorer counts")
+    print("  GET  /api/drift             - Feature and score drift against training")
+    print("  GET  /api/socket/stats      - Unix socket sidecar traffic")
+    print("  POST /api/drift/reset       - Start a new drift window")
     print("  POST /api/predict           - Predict single transaction")
     print("  POST /api/predict/batch     - Predict multiple transactions")
     print("  POST /api/analyze           - Analyze transaction (simplified)")
+    print("  POST /api/analyze/sweep     - Risk curve and max safe amount over an amount range")
+    print("  POST /api/graph/profile     - Transaction-graph profile of an account")
     print("  POST /api/contact/profile   - Get contact fraud profile from dataset")
     print("  POST /api/contacts/profiles - Get multiple contact profiles")
+    print("  GET  /api/contacts/profiles/cache - Contact profile cache hit rates")
     print("\n" + "=" * 60)
     
     app.run(host='0.0.0.0', port=5001, debug=True)
@@ -0,0 +1,230 @@
+"""
+Fraud Training Data Access Layer
+Pooled read-only SQLite connections with tuned pragmas for the API server
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Default location of the imported PaySim dataset
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'securebank.db')
+
+# Every SQL statement the API runs against the dataset. Keeping them in one
+# place lets sqlite3's per-connection statement cache reuse the compiled form.
+QUERIES = {
+    'dataset_counts': """
+        SELECT COUNT(*), SUM(CASE WHEN is_fraud = 1 THEN 1 ELSE 0 END)
+        FROM fraud_training_data
+    """,
+    'dataset_amounts': """
+        SELECT
+            AVG(CASE WHEN is_fraud = 1 THEN amount ELSE NULL END) as avg_fraud_amount,
+            AVG(CASE WHEN is_fraud = 0 THEN amount ELSE NULL END) as avg_legit_amount,
+            MAX(amount) as max_amount
+        FROM fraud_training_data
+    """,
+    'profile_samples': """
+        SELECT type, amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest
+        FROM fraud_training_data
+        WHERE is_fraud = ?
+        ORDER BY RANDOM() LIMIT ?
+    """,
+    'account_transactions': """
+        SELECT step, type, amount, nameOrig, nameDest, is_fraud
+        FROM fraud_training_data
+    """,
+    'traffic_sample': """
+        SELECT step, type, amount, nameOrig, oldbalanceOrg, newbalanceOrig,
+               nameDest, oldbalanceDest, newbalanceDest, is_fraud
+        FROM fraud_training_data
+        ORDER BY RANDOM() LIMIT ?
+    """,
+}
+
+# Pragmas applied to every pooled connection
+READ_PRAGMAS = {
+    'query_only': 'ON',
+    'mmap_size': 256 * 1024 * 1024,   # Map up to 256MB of the file
+    'cache_size': -64 * 1024,         # 64MB page cache (negative = KiB)
+    'temp_store': 'MEMORY',           # ORDER BY RANDOM() sorts stay in RAM
+}
+
+
+class DatabaseUnavailable(Exception):
+    """Raised when the dataset database file does not exist"""
+
+
+class FraudDatabase:
+    """Read-only connection pool over the fraud training database"""
+
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 8,
+                 pragmas: Optional[Dict] = None, recheck_interval: float = 30.0):
+        """
+        Args:
+            db_path: Path to the SQLite database. Defaults to instance/securebank.db
+            pool_size: Maximum number of idle connections kept for reuse
+            pragmas: Overrides for READ_PRAGMAS
+            recheck_interval: Seconds between existence checks while the file is missing
+        """
+        self.db_path = db_path or os.environ.get('FRAUD_DB_PATH', DB_PATH)
+        self.pool_size = pool_size
+        self.pragmas = {**READ_PRAGMAS, **(pragmas or {})}
+        self.recheck_interval = recheck_interval
+
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._available = None
+        self._last_check = 0.0
+        self._opened = 0
+        self.journal_mode = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Whether the database file exists (cached once found)"""
+        if self._available:
+            return True
+        now = time.monotonic()
+        if self._available is None or now - self._last_check >= self.recheck_interval:
+            self._last_check = now
+            self._available = os.path.exists(self.db_path)
+            if self._available:
+                self._check_journal_mode()
+        return self._available
+
+    def _check_journal_mode(self):
+        """
+        Read the file's journal mode. Switching it is left to whoever writes
+        the file (import_paysim sets WAL), this layer never modifies it.
+        """
+        try:
+            conn = self._connect()
+        except sqlite3.Error:
+            return
+        self.journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        if self.journal_mode != 'wal':
+            print(f"⚠️  {self.db_path} uses journal_mode={self.journal_mode}; "
+                  f"readers may block while it is written (import_paysim switches it to WAL)")
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new read-only connection with tuned pragmas"""
+        conn = sqlite3.connect(
+            f'file:{self.db_path}?mode=ro',
+            uri=True,
+            check_same_thread=False,
+            cached_statements=max(64, 2 * len(QUERIES))
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name}={value}')
+        self._opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for the duration of the block"""
+        if not self.is_available():
+            raise DatabaseUnavailable(f"Database not found: {self.db_path}")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError:
+            # Don't return a connection in an unknown state to the pool
+            broken = True
+            conn.close()
+            raise
+        finally:
+            # Also runs when the block is left by any other exception, or by
+            # GeneratorExit when an iterate() caller stops early
+            if not broken:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+
+    def _record(self, name: str, elapsed: float, rows: int):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, {'calls': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['calls'] += 1
+            stats['rows'] += rows
+            stats['total_ms'] += elapsed * 1000
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+
+    def fetchall(self, name: str, params: Sequence = ()) -> List[tuple]:
+        """Run a named query and return all rows"""
+        start = time.perf_counter()
+        with self.connection() as conn:
+            rows = conn.execute(QUERIES[name], params).fetchall()
+        self._record(name, time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchone(self, name: str, params: Sequence = ()) -> Optional[tuple]:
+        """Run a named query and return its first row"""
+        rows = self.fetchall(name, params)
+        return rows[0] if rows else None
+
+    def iterate(self, name: str, params: Sequence = (), batch_size: int = 100000) -> Iterator[List[tuple]]:
+        """
+        Stream a named query in batches of rows (for offline scans)
+
+        The connection goes back to the pool when the scan finishes or when
+        the caller stops early (closes or drops the generator).
+        """
+        start = time.perf_counter()
+        total = 0
+        with self.connection() as conn:
+            cursor = conn.execute(QUERIES[name], params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    yield rows
+            finally:
+                # Finalize the statement so the pooled connection holds no read snapshot
+                cursor.close()
+                self._record(name, time.perf_counter() - start, total)
+
+    def query_stats(self) -> Dict:
+        """Per-query timing summary plus pool state"""
+        with self._stats_lock:
+            queries = {
+                name: {
+                    **s,
+                    'total_ms': round(s['total_ms'], 3),
+                    'max_ms': round(s['max_ms'], 3),
+                    'avg_ms': round(s['total_ms'] / s['calls'], 3) if s['calls'] else 0.0
+                }
+                for name, s in self._stats.items()
+            }
+        return {
+            'db_path': self.db_path,
+            'available': bool(self._available),
+            'journal_mode': self.journal_mode,
+            'pool': {
+                'idle': self._idle.qsize(),
+                'max_idle': self.pool_size,
+                'opened': self._opened
+            },
+            'queries': queries
+        }
+
+    def close(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
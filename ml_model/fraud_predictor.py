@@ -7,102 +7,257 @@ import numpy as np
 import pandas as pd
 import joblib
 import os
+import time
 from typing import Dict, Union, List, Optional
 
+from velocity import VelocityStore, VELOCITY_FEATURES, current_step
+from graph_index import AccountGraph, GRAPH_FEATURES
+from cascade import load_screening_model, screen
+from forest_eval import EarlyExitForest, supports_early_exit
+from binned_forest import BinnedForest, numba
+from compact_forest import COMPACT_MODEL_PATH, CompactForest, load_compact_model
+from contributions import PathContributions, describe_contribution
+from model_backends import DEFAULT_BACKEND, backend_path
+from rule_scorer import HIGH_RISK_TYPES, LARGE_AMOUNT, RuleScorer
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Numeric transaction fields and their defaults when a client omits them
+NUMERIC_FIELDS = {
+    'step': 1,
+    'amount': 0.0,
+    'oldbalanceOrg': 0.0,
+    'newbalanceOrig': 0.0,
+    'oldbalanceDest': 0.0,
+    'newbalanceDest': 0.0
+}
+
+# Placeholder account ID sent by clients that don't know the real account
+ANONYMOUS_ACCOUNT = 'C0000000000'
+
+
+def risk_level_array(fraud_probability: np.ndarray) -> np.ndarray:
+    """Map fraud probabilities to risk levels (<0.3 low, <0.5 medium, <0.8 high, else critical)"""
+    return np.select(
+        [fraud_probability < 0.3, fraud_probability < 0.5, fraud_probability < 0.8],
+        ['low', 'medium', 'high'],
+        'critical'
+    )
+
 
 class FraudDetector:
     """Real-time fraud detection using trained ML model"""
     
-    def __init__(self, model_dir: Optional[str] = None):
+    def __init__(self, model_dir: Optional[str] = None, velocity_store: Optional[VelocityStore] = None,
+                 graph_index: Optional[AccountGraph] = None, cascade: bool = False,
+                 early_exit: bool = False, explain: bool = True, top_k: int = 3, load: bool = True,
+                 backend: Optional[str] = None, binned: bool = False, compact: bool = False):
         """
         Initialize the fraud detector by loading trained model and preprocessors
         
         Args:
             model_dir: Directory containing model files. Defaults to script directory.
+            velocity_store: Per-account velocity state. Defaults to a private store.
+            graph_index: Sender-recipient graph (graph_index.py) for counterparty features
+            cascade: Screen rows with the cheap first-stage model (cascade.py) and
+                only run the full forest on the uncertain band
+            early_exit: Stop evaluating trees once a row's risk level and decision
+                are fixed (forest_eval.py); exact probabilities only on request
+            explain: Derive risk factors from tree-path feature contributions
+                (contributions.py) instead of fixed heuristics
+            top_k: Features reported per prediction when explaining
+            load: Load the model now. Pass False to call load() later, e.g. from
+                a background thread while the server is already accepting connections
+            backend: Serve another backend trained alongside the default model
+                (model_backends.py, saved under backends/). Defaults to the
+                backend selected at training time.
+            binned: Score the full forest over per-row bin codes of the split
+                thresholds (binned_forest.py, needs numba). Same probabilities
+                as the model; used in place of early exit when both are set.
+            compact: Serve the compressed forest artifact (compact_forest.py)
+                saved with the default backend instead of the full model; its
+                probabilities differ by at most the leaf quantization step.
+                Early exit, binned inference and contributions need the full
+                forest and are skipped.
         """
         self.model_dir = model_dir or SCRIPT_DIR
+        self.velocity = velocity_store or VelocityStore()
+        self.graph = graph_index
+        self.backend = backend
         self.model = None
         self.scaler = None
         self.label_encoder = None
         self.feature_columns = None
+        self.screening = None
         self.is_loaded = False
+        self.cascade_stats = {'rows': 0, 'forest_rows': 0}
+        self.early_exit = None
+        self.early_exit_stats = {'rows': 0, 'trees_evaluated': 0}
+        self.binned = None
+        self.contributions = None
+        self.top_k = top_k
+        self.cascade = False
+        self.load_timings = {}
+        # Optional shadow.ShadowScorer that receives each scored feature frame
+        self.shadow = None
+        # Optional drift.DriftMonitor that records the scored feature stream
+        self.drift = None
+        # Rule-only scorer for when the model is missing or load is shed
+        self.rules = RuleScorer()
+        self.fallback_stats = {}
+        self._options = {'cascade': cascade, 'early_exit': early_exit, 'explain': explain, 'binned': binned,
+                         'compact': compact}
+        
+        if load:
+            self.load()
+    
+    def load(self) -> Dict[str, float]:
+        """
+        Load the model and build the optional scoring accelerators
+        
+        is_loaded flips only once everything is in place, so requests served
+        concurrently never see a half-built detector.
         
-        self._load_model()
+        Returns:
+            Milliseconds spent per loading phase
+        """
+        timings = {}
+        
+        def timed(phase, fn):
+            start = time.perf_counter()
+            result = fn()
+            timings[phase] = round((time.perf_counter() - start) * 1000, 1)
+            return result
+        
+        loaded = timed('model_files', self._load_model)
+        if loaded:
+            self.cascade = self._options['cascade'] and self.screening is not None
+            if self._options['cascade'] and not self.cascade:
+                print("⚠️  Cascade requested but no screening model calibrated for this backend; scoring with the full model.")
+            if self._options['early_exit']:
+                if supports_early_exit(self.model):
+                    self.early_exit = timed('early_exit', lambda: EarlyExitForest(self.model))
+                else:
+                    print(f"⚠️  Early exit needs a tree forest; {type(self.model).__name__} is scored in full.")
+            if self._options['binned']:
+                if not supports_early_exit(self.model):
+                    print(f"⚠️  Binned inference needs a tree forest; {type(self.model).__name__} is scored as is.")
+                elif numba is None:
+                    print("⚠️  Binned inference needs numba (pip install numba); scoring with the standard forest.")
+                else:
+                    self.binned = timed('binned', lambda: BinnedForest(self.model))
+            if self._options['explain'] and supports_early_exit(self.model):
+                self.contributions = timed('contributions', lambda: PathContributions(
+                    self.model, self.feature_columns, walker=self.early_exit
+                ))
+        self.load_timings = timings
+        self.is_loaded = loaded
+        return timings
+    
+    def reset_stats(self):
+        """Zero the cascade/early-exit counters (e.g. after warm-up traffic)"""
+        self.cascade_stats = {'rows': 0, 'forest_rows': 0}
+        self.early_exit_stats = {'rows': 0, 'trees_evaluated': 0}
     
-    def _load_model(self):
-        """Load the trained model and preprocessing objects"""
+    def _load_model(self) -> bool:
+        """Load the trained model and preprocessing objects; returns whether it succeeded"""
         try:
             model_path = os.path.join(self.model_dir, 'fraud_detection_model.joblib')
             scaler_path = os.path.join(self.model_dir, 'scaler.joblib')
             encoder_path = os.path.join(self.model_dir, 'label_encoder.joblib')
             features_path = os.path.join(self.model_dir, 'feature_columns.joblib')
+            metadata_path = os.path.join(self.model_dir, 'model_metadata.joblib')
             
-            self.model = joblib.load(model_path)
+            metadata = joblib.load(metadata_path) if os.path.exists(metadata_path) else {}
+            default_backend = metadata.get('backend', DEFAULT_BACKEND)
+            if self.backend is None:
+                self.backend = default_backend
+            elif self.backend != default_backend:
+                model_path = backend_path(self.model_dir, self.backend)
+            compact_path = os.path.join(self.model_dir, os.path.basename(COMPACT_MODEL_PATH))
+            if self._options['compact'] and self.backend == default_backend and os.path.exists(compact_path):
+                self.model = load_compact_model(compact_path)
+            else:
+                if self._options['compact']:
+                    print("⚠️  No compact model for this backend (run compact_forest.py); loading the full model.")
+                self.model = joblib.load(model_path)
             self.scaler = joblib.load(scaler_path)
             self.label_encoder = joblib.load(encoder_path)
             self.feature_columns = joblib.load(features_path)
-            self.is_loaded = True
+            # Cascade margins are calibrated against the default backend only
+            self.screening = load_screening_model(self.model_dir) if self.backend == default_backend else None
             
             print(f"✅ Fraud detection model loaded successfully")
-            print(f"   Model type: {type(self.model).__name__}")
+            print(f"   Model type: {type(self.model).__name__} ({self.backend})")
             print(f"   Features: {len(self.feature_columns)}")
+            return True
             
         except FileNotFoundError as e:
             print(f"⚠️  Model files not found. Please run train_fraud_model.py first.")
             print(f"   Missing: {e.filename}")
-            self.is_loaded = False
+            return False
         except Exception as e:
             print(f"❌ Error loading model: {e}")
-            self.is_loaded = False
+            return False
     
-    def _engineer_features(self, transaction: Dict) -> pd.DataFrame:
+    def _transactions_to_columns(self, transactions: List[Dict]) -> Dict[str, np.ndarray]:
+        """Turn transaction dictionaries into the column arrays used by the feature pipeline"""
+        columns = {
+            name: np.array([float(t.get(name, default)) for t in transactions], dtype=np.float64)
+            for name, default in NUMERIC_FIELDS.items()
+        }
+        columns['type'] = np.array([str(t.get('type', 'TRANSFER')) for t in transactions], dtype=str)
+        columns['nameOrig'] = np.array([str(t.get('nameOrig', ANONYMOUS_ACCOUNT)) for t in transactions], dtype=str)
+        columns['nameDest'] = np.array([str(t.get('nameDest', ANONYMOUS_ACCOUNT)) for t in transactions], dtype=str)
+        
+        # Velocity windows fall back to the wall-clock hour when no step is given
+        now = current_step()
+        columns['velocityStep'] = np.array([float(t['step']) if 'step' in t else now for t in transactions])
+        return columns
+    
+    def _engineer_feature_frame(self, columns: Dict[str, np.ndarray], record: bool = True) -> pd.DataFrame:
         """
-        Apply the same feature engineering as training
+        Apply the same feature engineering as training to whole columns at once
         
         Args:
-            transaction: Dictionary containing transaction details
+            columns: 1-D arrays keyed by transaction field. 'amount' is required;
+                the other NUMERIC_FIELDS, 'type', 'nameOrig' and 'nameDest' are optional.
+            record: Record the transactions in the senders' velocity windows;
+                False only reads them (hypothetical transactions)
             
         Returns:
-            DataFrame with engineered features
+            DataFrame with the model's feature columns first, followed by the
+            velocity and graph features the model wasn't trained on
         """
-        # Extract basic fields with defaults
-        step = transaction.get('step', 1)
-        trans_type = transaction.get('type', 'TRANSFER')
-        amount = float(transaction.get('amount', 0))
-        name_orig = transaction.get('nameOrig', 'C0000000000')
-        old_balance_org = float(transaction.get('oldbalanceOrg', 0))
-        new_balance_orig = float(transaction.get('newbalanceOrig', 0))
-        name_dest = transaction.get('nameDest', 'C0000000000')
-        old_balance_dest = float(transaction.get('oldbalanceDest', 0))
-        new_balance_dest = float(transaction.get('newbalanceDest', 0))
-        
-        # Encode transaction type
-        try:
-            type_encoded = self.label_encoder.transform([trans_type])[0]
-        except ValueError:
-            # Unknown type, use most common (PAYMENT = 0 typically)
-            type_encoded = 0
+        n = len(columns['amount'])
+        
+        def numeric(name):
+            if name in columns:
+                return np.asarray(columns[name], dtype=np.float64)
+            return np.full(n, NUMERIC_FIELDS[name], dtype=np.float64)
+        
+        step = numeric('step')
+        amount = numeric('amount')
+        old_balance_org = numeric('oldbalanceOrg')
+        new_balance_orig = numeric('newbalanceOrig')
+        old_balance_dest = numeric('oldbalanceDest')
+        new_balance_dest = numeric('newbalanceDest')
+        
+        # Encode transaction type; unknown types map to code 0 like LabelEncoder failures did
+        types = np.asarray(columns['type'], dtype=str) if 'type' in columns else np.full(n, 'TRANSFER')
+        classes = self.label_encoder.classes_
+        codes = np.searchsorted(classes, types).clip(0, len(classes) - 1)
+        type_encoded = np.where(classes[codes] == types, codes, 0)
+        
+        if 'nameDest' in columns:
+            is_merchant = np.char.startswith(np.asarray(columns['nameDest'], dtype=str), 'M').astype(int)
+        else:
+            is_merchant = np.zeros(n, dtype=int)
         
         # Engineer features (same as training)
         orig_balance_diff = old_balance_org - new_balance_orig
         dest_balance_diff = new_balance_dest - old_balance_dest
-        orig_balance_error = orig_balance_diff - amount
-        dest_balance_error = dest_balance_diff - amount
-        amount_to_orig_balance = amount / (old_balance_org + 1)
-        amount_to_dest_balance = amount / (old_balance_dest + 1)
-        orig_zero_balance = 1 if old_balance_org == 0 else 0
-        dest_zero_balance = 1 if old_balance_dest == 0 else 0
-        new_orig_zero_balance = 1 if new_balance_orig == 0 else 0
-        complete_transfer = 1 if (old_balance_org > 0 and new_balance_orig == 0) else 0
-        is_merchant = 1 if name_dest.startswith('M') else 0
-        is_large_transaction = 1 if amount > 200000 else 0  # 95th percentile threshold
-        hour_of_day = step % 24
-        day_of_month = (step // 24) % 30
-        
-        # Create feature dictionary
         features = {
             'step': step,
             'amount': amount,
@@ -113,23 +268,170 @@ class FraudDetector:
             'typeEncoded': type_encoded,
             'origBalanceDiff': orig_balance_diff,
             'destBalanceDiff': dest_balance_diff,
-            'origBalanceError': orig_balance_error,
-            'destBalanceError': dest_balance_error,
-            'amountToOrigBalance': amount_to_orig_balance,
-            'amountToDestBalance': amount_to_dest_balance,
-            'origZeroBalance': orig_zero_balance,
-            'destZeroBalance': dest_zero_balance,
-            'newOrigZeroBalance': new_orig_zero_balance,
-            'completeTransfer': complete_transfer,
+            'origBalanceError': orig_balance_diff - amount,
+            'destBalanceError': dest_balance_diff - amount,
+            'amountToOrigBalance': amount / (old_balance_org + 1),
+            'amountToDestBalance': amount / (old_balance_dest + 1),
+            'origZeroBalance': (old_balance_org == 0).astype(int),
+            'destZeroBalance': (old_balance_dest == 0).astype(int),
+            'newOrigZeroBalance': (new_balance_orig == 0).astype(int),
+            'completeTransfer': ((old_balance_org > 0) & (new_balance_orig == 0)).astype(int),
             'isMerchant': is_merchant,
-            'isLargeTransaction': is_large_transaction,
-            'hourOfDay': hour_of_day,
-            'dayOfMonth': day_of_month
+            'isLargeTransaction': (amount > 200000).astype(int),  # 95th percentile threshold
+            'hourOfDay': step % 24,
+            'dayOfMonth': (step // 24) % 30,
+            **self._account_features(columns, amount, record)
         }
         
-        return pd.DataFrame([features])[self.feature_columns]
+        # Model features first; velocity and graph features are kept even if the model wasn't trained on them
+        extra_columns = [c for c in VELOCITY_FEATURES + GRAPH_FEATURES if c not in self.feature_columns]
+        return pd.DataFrame(features)[self.feature_columns + extra_columns]
+    
+    def _engineer_features(self, transaction: Dict) -> pd.DataFrame:
+        """
+        Apply the same feature engineering as training
+        
+        Args:
+            transaction: Dictionary containing transaction details
+            
+        Returns:
+            DataFrame with engineered features
+        """
+        return self._engineer_feature_frame(self._transactions_to_columns([transaction]))
+    
+    def _account_features(self, columns: Dict[str, np.ndarray], amount: np.ndarray,
+                          record: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Stateful per-account features: sender velocity prior to each transaction
+        and counterparty graph features (zero when the IDs or the graph are missing)
+        """
+        n = len(amount)
+        values = {name: np.zeros(n) for name in VELOCITY_FEATURES + GRAPH_FEATURES}
+        name_orig = columns.get('nameOrig')
+        name_dest = columns.get('nameDest')
+        if name_orig is None:
+            return values
+        if name_dest is None:
+            name_dest = np.full(n, ANONYMOUS_ACCOUNT)
+        
+        if 'velocityStep' in columns:
+            velocity_steps = columns['velocityStep']
+        elif 'step' in columns:
+            velocity_steps = columns['step']
+        else:
+            velocity_steps = np.full(n, current_step())
+        
+        lookups = {}
+        for i in range(n):
+            # Clients without a real sender ID would otherwise share one velocity window
+            if name_orig[i] == ANONYMOUS_ACCOUNT:
+                continue
+            if record:
+                velocity = self.velocity.observe(name_orig[i], int(velocity_steps[i]), float(amount[i]), name_dest[i])
+            else:
+                # Nothing is recorded, so rows of the same sender and hour share one lookup
+                key = (name_orig[i], int(velocity_steps[i]))
+                velocity = lookups.get(key)
+                if velocity is None:
+                    velocity = lookups[key] = self.velocity.lookup(*key)
+            for name, value in velocity.items():
+                values[name][i] = value
+        
+        if self.graph is not None:
+            for i in range(n):
+                for name, value in self.graph.transaction_features(name_orig[i], name_dest[i]).items():
+                    values[name][i] = value
+        return values
+    
+    def _forest_proba(self, X_scaled: np.ndarray, exact: bool):
+        """
+        Full-model fraud probabilities
+        
+        Returns:
+            (fraud_probability, is_exact) arrays; rows are inexact only when
+            early exit stopped before the last tree
+        """
+        if self.binned is not None:
+            return self.binned.predict_proba(X_scaled), np.ones(len(X_scaled), dtype=bool)
+        if self.early_exit is not None:
+            fraud_probability, trees = self.early_exit.predict_proba(X_scaled, exact=exact)
+            self.early_exit_stats['rows'] += len(trees)
+            self.early_exit_stats['trees_evaluated'] += int(trees.sum())
+            return fraud_probability, trees == self.early_exit.n_trees
+        return self.model.predict_proba(X_scaled)[:, 1], np.ones(len(X_scaled), dtype=bool)
+    
+    def _score(self, X_scaled: np.ndarray, exact: bool = False):
+        """
+        Score a scaled feature matrix
+        
+        Returns:
+            (fraud_probability, is_fraud, is_exact) arrays. is_exact is False
+            where the probability is a band-preserving estimate (cascade
+            short-circuit or early exit).
+        """
+        if self.cascade and not exact:
+            fraud_probability, forest_mask = screen(
+                self.screening['model'], self.screening['low_margin'], self.screening['high_margin'],
+                X_scaled
+            )
+            is_exact = np.zeros(len(X_scaled), dtype=bool)
+            if forest_mask.any():
+                fraud_probability[forest_mask], is_exact[forest_mask] = self._forest_proba(
+                    X_scaled[forest_mask], exact
+                )
+            self.cascade_stats['rows'] += len(X_scaled)
+            self.cascade_stats['forest_rows'] += int(forest_mask.sum())
+        else:
+            fraud_probability, is_exact = self._forest_proba(X_scaled, exact)
+        # Same decision as model.predict (argmax, ties go to non-fraud)
+        return fraud_probability, fraud_probability > 0.5, is_exact
+    
+    def score_frame(self, X: pd.DataFrame, exact: bool = False):
+        """
+        Score an already engineered feature frame, e.g. one handed over by
+        another detector, using this model's own feature columns and scaler
+        
+        Returns:
+            (fraud_probability, is_fraud) arrays
+        """
+        fraud_probability, is_fraud, _ = self._score(self.scaler.transform(X[self.feature_columns]), exact=exact)
+        return fraud_probability, is_fraud
+    
+    def predict_rules(self, columns: Dict[str, np.ndarray], reason: str) -> List[Dict]:
+        """
+        Score a batch with the rule-only fallback (rule_scorer.py)
+        
+        Args:
+            reason: Why the model wasn't used, reported as degraded_reason
+                (e.g. 'model_not_loaded', 'queue_full', 'deadline')
+        """
+        # Columnar input may omit everything but amount; fill the rest as
+        # _engineer_feature_frame does
+        n = len(columns['amount'])
+        columns = {
+            **{name: np.full(n, default, dtype=np.float64) for name, default in NUMERIC_FIELDS.items()},
+            'type': np.full(n, 'TRANSFER'),
+            **columns
+        }
+        fraud_probability, risk_factors = self.rules.score(columns)
+        is_fraud = fraud_probability > 0.5
+        risk_levels = risk_level_array(fraud_probability)
+        self.fallback_stats[reason] = self.fallback_stats.get(reason, 0) + len(fraud_probability)
+        return [
+            {
+                'is_fraud': bool(is_fraud[i]),
+                'fraud_probability': round(float(fraud_probability[i]), 4),
+                'risk_level': str(risk_levels[i]),
+                'risk_factors': risk_factors[i],
+                'recommendation': self._get_recommendation(risk_levels[i], is_fraud[i]),
+                'scorer': 'rules',
+                'degraded_reason': reason
+            }
+            for i in range(len(fraud_probability))
+        ]
     
-    def predict(self, transaction: Dict) -> Dict:
+    def predict(self, transaction: Dict, exact: bool = False, explain: bool = True,
+                fallback: Optional[str] = None) -> Dict:
         """
         Predict if a transaction is fraudulent
         
@@ -144,6 +446,13 @@ class FraudDetector:
                 - oldbalanceDest: float (recipient's balance before)
                 - newbalanceDest: float (recipient's balance after)
                 - step: int (optional, time step)
+            exact: Always compute the full-forest probability, even in
+                cascade or early-exit mode
+            explain: Compute feature contributions for this call (if enabled);
+                False falls back to the heuristic risk factors
+            fallback: Score with the rule-only fallback instead of the model,
+                giving the reason (e.g. the server is shedding load). The
+                fallback is also used whenever the model isn't loaded.
                 
         Returns:
             Dictionary with:
@@ -151,48 +460,16 @@ class FraudDetector:
                 - fraud_probability: float (0-1)
                 - risk_level: str ('low', 'medium', 'high', 'critical')
                 - risk_factors: list of contributing factors
+                - probability_exact: False only when fraud_probability is an
+                  estimate within the correct risk level (cascade/early exit)
+                - top_features: features that pushed the probability up most,
+                  with their contributions (when explaining)
+                - scorer: 'model', or 'rules' for the fallback, which also
+                  reports degraded_reason
         """
-        if not self.is_loaded:
-            return {
-                'is_fraud': False,
-                'fraud_probability': 0.0,
-                'risk_level': 'unknown',
-                'risk_factors': ['Model not loaded'],
-                'error': 'Model not loaded. Please train the model first.'
-            }
-        
         try:
-            # Engineer features
-            X = self._engineer_features(transaction)
-            
-            # Scale features
-            X_scaled = self.scaler.transform(X)
-            
-            # Get prediction and probability
-            prediction = self.model.predict(X_scaled)[0]
-            probabilities = self.model.predict_proba(X_scaled)[0]
-            fraud_probability = probabilities[1]
-            
-            # Determine risk level
-            if fraud_probability < 0.3:
-                risk_level = 'low'
-            elif fraud_probability < 0.5:
-                risk_level = 'medium'
-            elif fraud_probability < 0.8:
-                risk_level = 'high'
-            else:
-                risk_level = 'critical'
-            
-            # Identify risk factors
-            risk_factors = self._identify_risk_factors(transaction, X)
-            
-            return {
-                'is_fraud': bool(prediction),
-                'fraud_probability': round(float(fraud_probability), 4),
-                'risk_level': risk_level,
-                'risk_factors': risk_factors,
-                'recommendation': self._get_recommendation(risk_level, prediction)
-            }
+            return self.predict_columns(self._transactions_to_columns([transaction]), exact=exact,
+                                        explain=explain, fallback=fallback)[0]
             
         except Exception as e:
             return {
@@ -203,40 +480,121 @@ class FraudDetector:
                 'error': f'Prediction error: {e}'
             }
     
-    def _identify_risk_factors(self, transaction: Dict, features: pd.DataFrame) -> List[str]:
-        """Identify factors contributing to fraud risk"""
-        risk_factors = []
+    def predict_columns(self, columns: Dict[str, np.ndarray], exact: bool = False,
+                        explain: bool = True, fallback: Optional[str] = None) -> List[Dict]:
+        """
+        Predict fraud for a batch given as column arrays (see _engineer_feature_frame)
+        
+        Features are engineered and scored for the whole batch in one pass.
         
-        trans_type = transaction.get('type', '')
-        amount = float(transaction.get('amount', 0))
-        old_balance_org = float(transaction.get('oldbalanceOrg', 0))
-        new_balance_orig = float(transaction.get('newbalanceOrig', 0))
+        Returns:
+            List of prediction results, one per row
+        """
+        n = len(columns['amount'])
+        if n == 0:
+            return []
+        if fallback or not self.is_loaded:
+            return self.predict_rules(columns, fallback or 'model_not_loaded')
         
-        # High-risk transaction types
-        if trans_type in ['TRANSFER', 'CASH_OUT']:
-            risk_factors.append(f"High-risk transaction type: {trans_type}")
+        X = self._engineer_feature_frame(columns)
+        model_features = X[self.feature_columns]
+        X_scaled = self.scaler.transform(model_features)
+        fraud_probability, is_fraud, is_exact = self._score(X_scaled, exact=exact)
+        risk_levels = risk_level_array(fraud_probability)
+        if self.shadow is not None:
+            self.shadow.submit(X, fraud_probability)
+        if self.drift is not None:
+            self.drift.update(model_features.to_numpy(dtype=np.float64), fraud_probability)
         
-        # Complete account drain
-        if old_balance_org > 0 and new_balance_orig == 0:
-            risk_factors.append("Complete account drain detected")
+        top_features = None
+        if explain and self.contributions is not None:
+            top_features = self.contributions.top_features(
+                self.contributions.explain(X_scaled), model_features.to_numpy(), k=self.top_k
+            )
+        risk_factors = self._identify_risk_factors(X, top_features, risk_levels)
         
-        # Large transaction
-        if amount > 200000:
-            risk_factors.append(f"Large transaction amount: ${amount:,.2f}")
+        results = [
+            {
+                'is_fraud': bool(is_fraud[i]),
+                'fraud_probability': round(float(fraud_probability[i]), 4),
+                'risk_level': str(risk_levels[i]),
+                'risk_factors': risk_factors[i],
+                'recommendation': self._get_recommendation(risk_levels[i], is_fraud[i]),
+                'scorer': 'model'
+            }
+            for i in range(n)
+        ]
+        for i in np.flatnonzero(~is_exact):
+            results[i]['probability_exact'] = False
+        if top_features is not None:
+            for result, top in zip(results, top_features):
+                result['top_features'] = top
+        return results
+    
+    def _identify_risk_factors(self, features: pd.DataFrame,
+                               top_features: Optional[List[List[Dict]]] = None,
+                               risk_levels: Optional[np.ndarray] = None) -> List[List[str]]:
+        """
+        Identify factors contributing to fraud risk for each row of a feature frame
         
-        # Amount exceeds balance
-        if amount > old_balance_org and old_balance_org > 0:
-            risk_factors.append("Transaction amount exceeds available balance")
+        With top_features (from PathContributions), the model-feature heuristics
+        are replaced by what the forest actually used; account velocity and
+        graph checks are kept either way. Contributions are measured from the
+        forest's ~0.5 base rate, so even clearly legitimate rows have features
+        that "raised" risk; they are only reported for rows at medium risk or
+        above (per risk_levels).
+        """
+        types = self.label_encoder.classes_[features['typeEncoded'].to_numpy().astype(int)]
+        amount = features['amount'].to_numpy()
+        old_balance_org = features['oldbalanceOrg'].to_numpy()
+        new_balance_orig = features['newbalanceOrig'].to_numpy()
+        high_risk_type = np.isin(types, HIGH_RISK_TYPES)
+        tx_count_24h = features['origTxCount24h'].to_numpy()
+        distinct_dest_24h = features['origDistinctDest24h'].to_numpy()
         
-        # Suspicious balance patterns
-        if features['origBalanceError'].values[0] != 0:
-            risk_factors.append("Balance calculation discrepancy detected")
+        feature_checks = [
+            # High-risk transaction types
+            (high_risk_type, lambda i: f"High-risk transaction type: {types[i]}"),
+            # Complete account drain
+            ((old_balance_org > 0) & (new_balance_orig == 0), "Complete account drain detected"),
+            # Large transaction
+            (amount > LARGE_AMOUNT, lambda i: f"Large transaction amount: ${amount[i]:,.2f}"),
+            # Amount exceeds balance
+            ((amount > old_balance_org) & (old_balance_org > 0), "Transaction amount exceeds available balance"),
+            # Suspicious balance patterns
+            (features['origBalanceError'].to_numpy() != 0, "Balance calculation discrepancy detected"),
+            # Zero origin balance for large transfer
+            ((old_balance_org == 0) & (amount > 0) & high_risk_type, "Transfer from zero-balance account"),
+        ]
+        account_checks = [
+            # Bursts of activity from the same sender
+            (tx_count_24h >= 5,
+             lambda i: f"High sender velocity: {int(tx_count_24h[i])} transactions in the last 24h"),
+            (distinct_dest_24h >= 5,
+             lambda i: f"Funds sent to ~{distinct_dest_24h[i]:.0f} distinct recipients in the last 24h"),
+            # Counterparty graph
+            (features['destFraudNeighbor'].to_numpy() != 0,
+             "Recipient has transacted with accounts involved in confirmed fraud"),
+            ((features['destCashOutChain'].to_numpy() != 0) & (types == 'TRANSFER'),
+             "Recipient cashes out incoming transfers (TRANSFER→CASH_OUT mule pattern)"),
+        ]
         
-        # Zero origin balance for large transfer
-        if old_balance_org == 0 and amount > 0 and trans_type in ['TRANSFER', 'CASH_OUT']:
-            risk_factors.append("Transfer from zero-balance account")
+        if top_features is None:
+            risk_factors = [[] for _ in range(len(features))]
+            checks = feature_checks + account_checks
+        else:
+            classes = self.label_encoder.classes_
+            explained = risk_levels != 'low' if risk_levels is not None else np.ones(len(features), dtype=bool)
+            risk_factors = [
+                [describe_contribution(item, classes) for item in top] if explained[i] else []
+                for i, top in enumerate(top_features)
+            ]
+            checks = account_checks
+        for mask, factor in checks:
+            for i in np.flatnonzero(mask):
+                risk_factors[i].append(factor(i) if callable(factor) else factor)
         
-        return risk_factors if risk_factors else ["No specific risk factors identified"]
+        return [factors if factors else ["No specific risk factors identified"] for factors in risk_factors]
     
     def _get_recommendation(self, risk_level: str, is_fraud: bool) -> str:
         """Get action recommendation based on risk assessment"""
@@ -249,17 +607,78 @@ class FraudDetector:
         else:
             return "APPROVE: Low risk transaction. Safe to process."
     
-    def predict_batch(self, transactions: List[Dict]) -> List[Dict]:
+    def predict_batch(self, transactions: List[Dict], exact: bool = False,
+                      explain: bool = True, fallback: Optional[str] = None) -> List[Dict]:
         """
         Predict fraud for multiple transactions
         
         Args:
             transactions: List of transaction dictionaries
+            exact: Always compute full-forest probabilities (see predict)
+            explain: Compute feature contributions (see predict)
+            fallback: Score with the rule-only fallback (see predict)
             
         Returns:
             List of prediction results
         """
-        return [self.predict(t) for t in transactions]
+        if not transactions:
+            return []
+        try:
+            columns = self._transactions_to_columns(transactions)
+        except (TypeError, ValueError):
+            # Malformed rows: score one by one so only those rows report errors
+            return [self.predict(t, exact=exact, explain=explain, fallback=fallback) for t in transactions]
+        return self.predict_columns(columns, exact=exact, explain=explain, fallback=fallback)
+    
+    def sweep_amounts(self, transaction: Dict, amounts: np.ndarray, exact: bool = False,
+                      fallback: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Score one transaction at every amount of a grid in a single batched pass
+        
+        Balances after each amount follow /api/analyze: the sender's new
+        balance is max(0, oldbalanceOrg - amount) and the recipient's is
+        oldbalanceDest + amount. The rows are hypothetical, so velocity
+        windows are read but not updated, and shadow models, the drift
+        monitor and feature contributions are skipped.
+        
+        Args:
+            transaction: Transaction dictionary (see predict); its amount and
+                new balances are ignored
+            amounts: 1-D grid of amounts
+            exact: Always compute full-forest probabilities (see predict)
+            fallback: Score with the rule-only fallback (see predict)
+        
+        Returns:
+            Dictionary of per-amount arrays: fraud_probability, risk_level,
+            is_fraud and probability_exact, plus scorer ('model' or 'rules')
+            and degraded_reason (see predict_rules)
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        columns = {name: np.repeat(values, len(amounts))
+                   for name, values in self._transactions_to_columns([transaction]).items()}
+        columns['amount'] = amounts
+        columns['newbalanceOrig'] = np.maximum(0.0, columns['oldbalanceOrg'] - amounts)
+        columns['newbalanceDest'] = columns['oldbalanceDest'] + amounts
+        
+        if fallback or not self.is_loaded:
+            reason = fallback or 'model_not_loaded'
+            fraud_probability, _ = self.rules.score(columns)
+            self.fallback_stats[reason] = self.fallback_stats.get(reason, 0) + len(amounts)
+            is_exact, scorer = np.ones(len(amounts), dtype=bool), 'rules'
+        else:
+            reason = None
+            X = self._engineer_feature_frame(columns, record=False)
+            fraud_probability, _, is_exact = self._score(self.scaler.transform(X[self.feature_columns]),
+                                                         exact=exact)
+            scorer = 'model'
+        return {
+            'fraud_probability': fraud_probability,
+            'risk_level': risk_level_array(fraud_probability),
+            'is_fraud': fraud_probability > 0.5,
+            'probability_exact': is_exact,
+            'scorer': scorer,
+            'degraded_reason': reason
+        }
     
     def get_model_info(self) -> Dict:
         """Get information about the loaded model"""
@@ -269,9 +688,43 @@ class FraudDetector:
         return {
             'status': 'loaded',
             'model_type': type(self.model).__name__,
+            'backend': self.backend,
             'n_features': len(self.feature_columns),
             'feature_columns': self.feature_columns,
-            'transaction_types': list(self.label_encoder.classes_) if self.label_encoder else []
+            'transaction_types': list(self.label_encoder.classes_) if self.label_encoder else [],
+            'velocity': self.velocity.get_info(),
+            'graph': self.graph.get_info() if self.graph is not None else None,
+            'cascade': self._cascade_info(),
+            'early_exit': self._early_exit_info(),
+            'binned': {
+                'code_dtype': np.dtype(self.binned.code_dtype).name,
+                'thresholds': int(sum(len(table) for table in self.binned.tables))
+            } if self.binned else None,
+            'compact': self.model.info() if isinstance(self.model, CompactForest) else None,
+            'contributions': {'enabled': True, 'top_k': self.top_k} if self.contributions else None
+        }
+    
+    def _early_exit_info(self) -> Optional[Dict]:
+        if self.early_exit is None:
+            return None
+        rows = self.early_exit_stats['rows']
+        return {
+            'n_trees': self.early_exit.n_trees,
+            'rows_scored': rows,
+            'avg_trees_evaluated': round(self.early_exit_stats['trees_evaluated'] / rows, 2) if rows else None
+        }
+    
+    def _cascade_info(self) -> Optional[Dict]:
+        if self.screening is None:
+            return None
+        rows = self.cascade_stats['rows']
+        return {
+            'enabled': self.cascade,
+            'screening_model': type(self.screening['model']).__name__,
+            'low_margin': self.screening['low_margin'],
+            'high_margin': self.screening['high_margin'],
+            'rows_scored': rows,
+            'short_circuit_fraction': round(1 - self.cascade_stats['forest_rows'] / rows, 4) if rows else None
         }
 
 
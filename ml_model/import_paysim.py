@@ -0,0 +1,233 @@
+"""
+PaySim Bulk Importer
+Load the PaySim CSV into the fraud_training_data table of instance/securebank.db:
+the CSV is streamed in chunks, each chunk is bulk-inserted in one transaction,
+and the indexes the API queries need are built once after the load
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from fraud_db import DB_PATH
+from account_store import CSV_PATH
+
+TABLE = 'fraud_training_data'
+
+# CSV header -> table column
+CSV_COLUMNS = {
+    'step': 'step',
+    'type': 'type',
+    'amount': 'amount',
+    'nameOrig': 'nameOrig',
+    'oldbalanceOrg': 'oldbalanceOrg',
+    'newbalanceOrig': 'newbalanceOrig',
+    'nameDest': 'nameDest',
+    'oldbalanceDest': 'oldbalanceDest',
+    'newbalanceDest': 'newbalanceDest',
+    'isFraud': 'is_fraud',
+    'isFlaggedFraud': 'is_flagged_fraud',
+}
+CSV_DTYPES = {
+    'step': np.int64, 'type': str, 'amount': np.float64, 'nameOrig': str,
+    'oldbalanceOrg': np.float64, 'newbalanceOrig': np.float64, 'nameDest': str,
+    'oldbalanceDest': np.float64, 'newbalanceDest': np.float64,
+    'isFraud': np.int64, 'isFlaggedFraud': np.int64,
+}
+
+CREATE_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE} (
+        id INTEGER PRIMARY KEY,
+        step INTEGER,
+        type TEXT,
+        amount REAL,
+        nameOrig TEXT,
+        oldbalanceOrg REAL,
+        newbalanceOrig REAL,
+        nameDest TEXT,
+        oldbalanceDest REAL,
+        newbalanceDest REAL,
+        is_fraud INTEGER,
+        is_flagged_fraud INTEGER
+    )
+"""
+
+# Rows already imported per source file, updated in the same transaction as
+# each chunk so an interrupted import resumes exactly where it stopped
+CREATE_PROGRESS = """
+    CREATE TABLE IF NOT EXISTS import_progress (
+        source TEXT PRIMARY KEY,
+        rows INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+"""
+
+INSERT = (
+    f"INSERT INTO {TABLE} (id, {', '.join(CSV_COLUMNS.values())}) "
+    f"VALUES ({', '.join('?' * (len(CSV_COLUMNS) + 1))})"
+)
+
+INDEXES = {
+    'idx_fraud_training_data_is_fraud': 'is_fraud',
+    'idx_fraud_training_data_type': 'type',
+    'idx_fraud_training_data_name_orig': 'nameOrig',
+    'idx_fraud_training_data_name_dest': 'nameDest',
+}
+
+# Pragmas for the duration of the load. WAL with synchronous=OFF never
+# corrupts the file if the process dies, it only loses the last commits,
+# which import_progress then re-imports.
+LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -256 * 1024,        # 256MB page cache (negative = KiB)
+    'temp_store': 'MEMORY',           # Index sorts stay in RAM
+    'wal_autocheckpoint': 0,          # Checkpoint once at the end instead
+}
+
+
+def iter_csv_chunks(csv_path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """Stream the CSV, skipping rows a previous import already loaded"""
+    skip = range(1, skip_rows + 1) if skip_rows else None
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=CSV_DTYPES,
+                             usecols=list(CSV_COLUMNS), skiprows=skip):
+        yield chunk[list(CSV_COLUMNS)]
+
+
+def _db_size(db_path: str) -> int:
+    return sum(os.path.getsize(p) for p in (db_path, db_path + '-wal') if os.path.exists(p))
+
+
+def _source_key(csv_path: str) -> str:
+    return os.path.abspath(csv_path)
+
+
+def import_csv(csv_path: str, db_path: str = DB_PATH, chunk_size: int = 200000,
+               append: bool = False, replace: bool = False, build_indexes: bool = True) -> dict:
+    """
+    Bulk-load a PaySim CSV into fraud_training_data
+
+    Args:
+        append: Add to an existing table. Rows of this CSV imported before are
+            skipped, so re-running resumes an interrupted import or picks up
+            rows appended to the file since
+        replace: Drop the existing table (and import progress) first
+        build_indexes: Create the query indexes after loading
+
+    Returns:
+        Row counts, timings and the final database size
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for name, value in LOAD_PRAGMAS.items():
+            conn.execute(f'PRAGMA {name}={value}')
+
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE,)
+        ).fetchone() is not None
+        if exists and not (append or replace):
+            raise ValueError(f"{TABLE} already exists in {db_path}; pass --append or --replace")
+        if replace:
+            conn.execute(f'DROP TABLE IF EXISTS {TABLE}')
+            conn.execute('DROP TABLE IF EXISTS import_progress')
+        conn.execute(CREATE_TABLE)
+        conn.execute(CREATE_PROGRESS)
+
+        source = _source_key(csv_path)
+        row = conn.execute('SELECT rows FROM import_progress WHERE source = ?', (source,)).fetchone()
+        skip_rows = row[0] if row else 0
+        next_id = (conn.execute(f'SELECT MAX(id) FROM {TABLE}').fetchone()[0] or 0) + 1
+        existing_rows = conn.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0]
+
+        # Maintaining indexes row by row is far slower than building them once
+        for index in INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS {index}')
+
+        imported = 0
+        start = time.perf_counter()
+        for chunk in iter_csv_chunks(csv_path, chunk_size, skip_rows):
+            ids = np.arange(next_id, next_id + len(chunk))
+            rows = zip(ids.tolist(), *(chunk[c].tolist() for c in CSV_COLUMNS))
+            conn.execute('BEGIN')
+            conn.executemany(INSERT, rows)
+            conn.execute(
+                'INSERT INTO import_progress (source, rows, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(source) DO UPDATE SET rows = excluded.rows, updated_at = excluded.updated_at',
+                (source, skip_rows + imported + len(chunk), time.time())
+            )
+            conn.execute('COMMIT')
+            next_id += len(chunk)
+            imported += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"   Imported {imported:,} rows ({imported / elapsed:,.0f} rows/sec)", end='\r')
+        print()
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if build_indexes:
+            for index, column in INDEXES.items():
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {TABLE} ({column})')
+            conn.execute('ANALYZE')
+        index_seconds = time.perf_counter() - start
+
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    finally:
+        conn.close()
+
+    return {
+        'skipped_rows': skip_rows,
+        'imported_rows': imported,
+        'total_rows': existing_rows + imported,
+        'load_seconds': round(load_seconds, 1),
+        'rows_per_second': round(imported / load_seconds) if load_seconds else 0,
+        'index_seconds': round(index_seconds, 1),
+        'db_mb': round(_db_size(db_path) / 1e6, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import the PaySim CSV into the fraud training database')
+    parser.add_argument('csv', nargs='?', default=CSV_PATH, help='PaySim CSV to import')
+    parser.add_argument('--db', default=os.environ.get('FRAUD_DB_PATH', DB_PATH), help='SQLite database to fill')
+    parser.add_argument('--chunk-size', type=int, default=200000, help='Rows per insert transaction')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--append', action='store_true',
+                      help='Add to an existing table, resuming after rows already imported from this CSV')
+    mode.add_argument('--replace', action='store_true', help='Drop and rebuild the table')
+    parser.add_argument('--no-index', action='store_true', help='Skip building indexes after the load')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("IMPORTING PAYSIM DATASET")
+    print("=" * 60)
+    print(f"\nSource: {args.csv}")
+    print(f"Database: {args.db}")
+
+    if not os.path.exists(args.csv):
+        print(f"\n❌ CSV not found: {args.csv}")
+        return
+    try:
+        result = import_csv(args.csv, args.db, chunk_size=args.chunk_size, append=args.append,
+                            replace=args.replace, build_indexes=not args.no_index)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return
+
+    if result['skipped_rows']:
+        print(f"\nSkipped {result['skipped_rows']:,} rows imported earlier")
+    print(f"\nImported rows: {result['imported_rows']:,}")
+    print(f"Total rows: {result['total_rows']:,}")
+    print(f"Load time: {result['load_seconds']:.1f}s ({result['rows_per_second']:,} rows/sec)")
+    print(f"Index build: {result['index_seconds']:.1f}s")
+    print(f"Database size: {result['db_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Model Backends
+Model families the trainer can fit and the predictor can serve, plus the
+speed/accuracy leaderboard used to choose between them
+"""
+
+import io
+import os
+import time
+from typing import Callable, Dict, List
+
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score, roc_auc_score
+
+try:
+    from lightgbm import LGBMClassifier
+except ImportError:
+    LGBMClassifier = None
+
+try:
+    from xgboost import XGBClassifier
+except ImportError:
+    XGBClassifier = None
+
+DEFAULT_BACKEND = 'random_forest'
+# Non-default backends are saved here as <name>.joblib, sharing the default
+# model's scaler, label encoder and feature columns
+BACKENDS_DIR = 'backends'
+
+
+def _random_forest():
+    return RandomForestClassifier(
+        n_estimators=100,
+        max_depth=20,
+        min_samples_split=10,
+        min_samples_leaf=5,
+        class_weight='balanced',
+        random_state=42,
+        n_jobs=-1,
+        verbose=1
+    )
+
+
+def _extra_trees():
+    return ExtraTreesClassifier(
+        n_estimators=100,
+        max_depth=20,
+        min_samples_split=10,
+        min_samples_leaf=5,
+        class_weight='balanced',
+        random_state=42,
+        n_jobs=-1
+    )
+
+
+def _hist_gradient_boosting():
+    return HistGradientBoostingClassifier(
+        max_iter=200,
+        learning_rate=0.1,
+        max_leaf_nodes=31,
+        class_weight='balanced',
+        early_stopping=True,
+        random_state=42
+    )
+
+
+def _logistic_regression():
+    return LogisticRegression(max_iter=1000, class_weight='balanced')
+
+
+def _lightgbm():
+    return LGBMClassifier(n_estimators=200, num_leaves=31, class_weight='balanced',
+                          random_state=42, verbose=-1)
+
+
+def _xgboost():
+    return XGBClassifier(n_estimators=200, max_depth=6, tree_method='hist',
+                         eval_metric='auc', random_state=42, n_jobs=-1)
+
+
+# Backend name -> factory for an unfitted classifier with predict_proba
+BACKENDS: Dict[str, Callable] = {
+    'random_forest': _random_forest,
+    'extra_trees': _extra_trees,
+    'hist_gradient_boosting': _hist_gradient_boosting,
+    'logistic_regression': _logistic_regression,
+}
+if LGBMClassifier is not None:
+    BACKENDS['lightgbm'] = _lightgbm
+if XGBClassifier is not None:
+    BACKENDS['xgboost'] = _xgboost
+
+
+def build_model(name: str):
+    """Unfitted classifier for a backend name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def backend_path(model_dir: str, name: str) -> str:
+    """Artifact path of a non-default backend inside a model directory"""
+    return os.path.join(model_dir, BACKENDS_DIR, f'{name}.joblib')
+
+
+def artifact_bytes(model) -> int:
+    """Size of the model as joblib.dump would write it"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def _latency_us_per_row(model, X: np.ndarray, n: int = 200) -> Dict[str, float]:
+    start = time.perf_counter()
+    for i in range(min(n, len(X))):
+        model.predict_proba(X[i:i + 1])
+    single = (time.perf_counter() - start) / max(min(n, len(X)), 1) * 1e6
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = (time.perf_counter() - start) / max(len(X), 1) * 1e6
+    return {'single': round(single, 1), 'batch': round(batch, 2)}
+
+
+def evaluate_backend(name: str, model, train_seconds: float,
+                     X_test_scaled: np.ndarray, y_test: np.ndarray) -> Dict:
+    """One leaderboard row: accuracy, training time, per-row latency and artifact size"""
+    fraud_probability = model.predict_proba(X_test_scaled)[:, 1]
+    return {
+        'backend': name,
+        'model_type': type(model).__name__,
+        'roc_auc': round(float(roc_auc_score(y_test, fraud_probability)), 4),
+        'f1': round(float(f1_score(y_test, fraud_probability > 0.5)), 4),
+        'train_seconds': round(train_seconds, 1),
+        'latency_us_per_row': _latency_us_per_row(model, X_test_scaled),
+        'artifact_mb': round(artifact_bytes(model) / 1e6, 2)
+    }
+
+
+def print_leaderboard(rows: List[Dict], selected: str = None):
+    """Leaderboard sorted by ROC-AUC; the served backend is marked with *"""
+    print(f"\n  {'backend':<24} {'ROC-AUC':>8} {'F1':>7} {'train s':>8} "
+          f"{'1-row µs':>9} {'batch µs':>9} {'size MB':>8}")
+    for row in sorted(rows, key=lambda r: r['roc_auc'], reverse=True):
+        marker = '*' if row['backend'] == selected else ' '
+        latency = row['latency_us_per_row']
+        print(f"{marker} {row['backend']:<24} {row['roc_auc']:>8.4f} {row['f1']:>7.4f} "
+              f"{row['train_seconds']:>8.1f} {latency['single']:>9.1f} {latency['batch']:>9.2f} "
+              f"{row['artifact_mb']:>8.2f}")
@@ -0,0 +1,204 @@
+"""
+Contact Profile Cache
+Server-side cache of contact fraud profiles keyed by (contact_id, risk_bias).
+Entries are refreshed on a background thread before they expire and served
+stale while a refresh is pending, so steady-state profile requests never
+wait on the database.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTACTS_JS_PATH = os.path.join(SCRIPT_DIR, '..', 'src', 'data', 'contacts.js')
+
+Key = Tuple[str, Optional[str]]
+
+
+def load_contact_ids(path: str = CONTACTS_JS_PATH) -> List[str]:
+    """Contact ids of the dashboard's fixed contact list (src/data/contacts.js)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return re.findall(r"^\s*id:\s*'([^']+)'", f.read(), flags=re.MULTILINE)
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'last_access')
+
+    def __init__(self, value, now: float):
+        self.value = value
+        self.loaded_at = now
+        self.last_access = now
+
+
+class ProfileCache:
+    """
+    TTL and size bounded LRU cache with stale-while-revalidate
+
+    Entries older than refresh_at * ttl are reloaded by the refresher thread
+    if they were read since their last load (or are pinned); until the reload
+    lands the old profile is served. Past ttl an entry is still served, but
+    counted as stale and queued for an immediate refresh; past ttl + max_stale
+    it is dropped and the next request loads it synchronously.
+    """
+
+    def __init__(self, loader: Callable[[List[Key]], List[Optional[Dict]]], ttl: float = 300.0,
+                 max_entries: int = 10000, refresh_at: float = 0.8, max_stale: Optional[float] = None):
+        """
+        Args:
+            loader: Loads profiles for a list of keys in one go, returning one
+                profile (or None on failure) per key, in order
+            ttl: Seconds a profile counts as fresh
+            max_entries: Least recently used entries beyond this are evicted
+            refresh_at: Fraction of ttl after which entries are reloaded
+            max_stale: Seconds past ttl a profile may still be served (default ttl)
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh_at = refresh_at
+        self.max_stale = ttl if max_stale is None else max_stale
+        self._entries: 'OrderedDict[Key, _Entry]' = OrderedDict()
+        self._pinned = set()
+        self._urgent = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshed': 0,
+                       'refresh_failures': 0, 'evictions': 0, 'expired': 0, 'last_refresh_ms': 0.0}
+        self._thread = threading.Thread(target=self._run, name='profile-cache', daemon=True)
+        self._thread.start()
+
+    def get_many(self, keys: List[Key]) -> List[Optional[Dict]]:
+        """Profiles for keys, loading only the missing ones (in one loader call)"""
+        now = time.time()
+        results: List[Optional[Dict]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None or now - entry.loaded_at > self.ttl + self.max_stale:
+                    missing.append(i)
+                    continue
+                entry.last_access = now
+                self._entries.move_to_end(key)
+                results[i] = entry.value
+                if now - entry.loaded_at > self.ttl:
+                    self._stats['stale_hits'] += 1
+                    self._urgent.add(key)
+                else:
+                    self._stats['hits'] += 1
+            self._stats['misses'] += len(missing)
+        if self._urgent:
+            self._wake.set()
+
+        if missing:
+            # Duplicate keys in one request share a single load
+            unique = list(dict.fromkeys(keys[i] for i in missing))
+            loaded = dict(zip(unique, self._load(unique)))
+            for i in missing:
+                results[i] = loaded[keys[i]]
+        return results
+
+    def get(self, key: Key) -> Optional[Dict]:
+        return self.get_many([key])[0]
+
+    def warm(self, keys: Iterable[Key], pin: bool = True) -> int:
+        """
+        Load keys ahead of the first request
+
+        Args:
+            pin: Keep refreshing these keys even when nobody reads them
+
+        Returns:
+            Number of profiles loaded
+        """
+        keys = list(dict.fromkeys(keys))
+        if pin:
+            with self._lock:
+                self._pinned.update(keys)
+        return sum(profile is not None for profile in self._load(keys))
+
+    def _load(self, keys: List[Key]) -> List[Optional[Dict]]:
+        if not keys:
+            return []
+        profiles = self.loader(keys)
+        if len(profiles) != len(keys):
+            profiles = [None] * len(keys)
+        now = time.time()
+        with self._lock:
+            for key, profile in zip(keys, profiles):
+                if profile is None:
+                    continue
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry(profile, now)
+                else:
+                    entry.value, entry.loaded_at = profile, now
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._pinned.discard(evicted)
+                self._stats['evictions'] += 1
+        return profiles
+
+    def _due(self, now: float) -> List[Key]:
+        """Keys to reload now; drops entries too stale to serve"""
+        with self._lock:
+            due = [key for key in self._urgent if key in self._entries]
+            self._urgent.clear()
+            expired = []
+            for key, entry in self._entries.items():
+                age = now - entry.loaded_at
+                if age > self.ttl + self.max_stale and key not in self._pinned:
+                    expired.append(key)
+                elif age > self.refresh_at * self.ttl and (
+                        entry.last_access > entry.loaded_at or key in self._pinned):
+                    due.append(key)
+            for key in expired:
+                del self._entries[key]
+            self._stats['expired'] += len(expired)
+        return list(dict.fromkeys(due))
+
+    def _run(self):
+        # Check often enough that refresh_at * ttl is never overshot by much
+        interval = max(0.05, min(5.0, self.ttl * (1 - self.refresh_at) / 4))
+        while not self._closed:
+            self._wake.wait(interval)
+            self._wake.clear()
+            due = self._due(time.time())
+            if not due:
+                continue
+            start = time.perf_counter()
+            try:
+                loaded = sum(profile is not None for profile in self._load(due))
+            except Exception:
+                loaded = 0
+            with self._lock:
+                self._stats['refreshed'] += loaded
+                self._stats['refresh_failures'] += len(due) - loaded
+                self._stats['last_refresh_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries, pinned = len(self._entries), len(self._pinned)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        return {
+            **stats,
+            'entries': entries,
+            'pinned': pinned,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hit_rate': round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else None,
+            'fresh_hit_rate': round(stats['hits'] / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,114 @@
+"""
+Prediction Response Encoding
+Content negotiation for the prediction endpoints: fast JSON, msgpack and a
+compact columnar layout for batch results
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+from flask import Request, Response
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, msgpack responses are then unavailable
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+# Fixed code table for risk levels in the columnar layout
+RISK_LEVEL_CODES = ['low', 'medium', 'high', 'critical', 'unknown', 'error']
+# Which scorer produced each row (-1 for rows that errored)
+SCORER_CODES = ['model', 'rules']
+
+
+class NotAcceptable(Exception):
+    """Raised when the client asks for an encoding this server can't produce"""
+
+
+def negotiate(req: Request) -> Tuple[str, str]:
+    """
+    Pick the response format and batch layout for a request
+
+    Format comes from the Accept header (JSON unless msgpack is preferred);
+    layout is 'columnar' when requested with ?layout=columnar, else 'rows'.
+    """
+    best = req.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+    fmt = 'msgpack' if best in MSGPACK_MIMETYPES else 'json'
+    if fmt == 'msgpack' and msgpack is None:
+        raise NotAcceptable('msgpack responses require the msgpack package')
+    layout = 'columnar' if req.args.get('layout') == 'columnar' else 'rows'
+    return fmt, layout
+
+
+def columnar_predictions(results: List[Dict]) -> Dict:
+    """
+    Pack a list of prediction dicts into parallel arrays
+
+    Repeated strings (recommendations, risk factors) are stored once in
+    lookup tables and referenced by index.
+    """
+    recommendations, recommendation_index = [], {}
+    factors, factor_index = [], {}
+
+    def intern(value, table, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+
+    level_codes = {level: code for code, level in enumerate(RISK_LEVEL_CODES)}
+    scorer_codes = {scorer: code for code, scorer in enumerate(SCORER_CODES)}
+    columns = {
+        'fraud_probability': [],
+        'risk_level': [],
+        'is_fraud': [],
+        'recommendation': [],
+        'risk_factors': [],
+        'scorer': []
+    }
+    errors = {}
+    for i, result in enumerate(results):
+        columns['fraud_probability'].append(result['fraud_probability'])
+        columns['risk_level'].append(level_codes.get(result['risk_level'], level_codes['unknown']))
+        columns['is_fraud'].append(int(result['is_fraud']))
+        columns['recommendation'].append(
+            intern(result['recommendation'], recommendations, recommendation_index)
+            if 'recommendation' in result else -1
+        )
+        columns['risk_factors'].append([intern(f, factors, factor_index) for f in result['risk_factors']])
+        columns['scorer'].append(scorer_codes.get(result.get('scorer'), -1))
+        if 'error' in result:
+            errors[str(i)] = result['error']
+
+    return {
+        'layout': 'columnar',
+        'risk_level_codes': RISK_LEVEL_CODES,
+        'scorer_codes': SCORER_CODES,
+        'recommendation_table': recommendations,
+        'risk_factor_table': factors,
+        'columns': columns,
+        'errors': errors
+    }
+
+
+def encode_response(payload: Dict, fmt: str = 'json', status: int = 200) -> Response:
+    """Serialize a response payload in the negotiated format"""
+    if fmt == 'msgpack':
+        body = msgpack.packb(payload, use_bin_type=True)
+        mimetype = MSGPACK_MIMETYPE
+    elif orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        mimetype = JSON_MIMETYPE
+    else:
+        body = json.dumps(payload, separators=(',', ':'))
+        mimetype = JSON_MIMETYPE
+    return Response(body, status=status, mimetype=mimetype)
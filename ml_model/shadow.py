@@ -0,0 +1,179 @@
+"""
+Shadow Scoring
+Score live traffic with candidate models on a bounded background pool and
+compare them with the primary model, without touching the response path
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from fraud_predictor import FraudDetector, risk_level_array
+
+# Recent samples kept per candidate for percentiles
+WINDOW = 10000
+
+
+class _CandidateStats:
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.fraud_agree = 0
+        self.level_agree = 0
+        self.abs_delta_sum = 0.0
+        self.abs_delta_max = 0.0
+        self.deltas = deque(maxlen=WINDOW)
+        self.latencies_ms = deque(maxlen=WINDOW)
+        self.last_error = None
+
+
+class ShadowScorer:
+    """
+    Compare candidate FraudDetectors against the primary on the same feature frames
+
+    The primary hands over its engineered feature frame and probabilities
+    after scoring; candidates rescale and score that frame on a worker pool.
+    When max_pending batches are already queued or running, new work is
+    dropped (shed) instead of waiting, so the primary path never blocks.
+    """
+
+    def __init__(self, candidates: Dict[str, FraudDetector], max_workers: int = 2,
+                 max_pending: int = 8, sample_rate: float = 1.0):
+        """
+        Args:
+            candidates: Loaded candidate detectors by name
+            max_workers: Background threads scoring candidates
+            max_pending: Batches allowed in flight before shedding
+            sample_rate: Fraction of requests mirrored to the candidates
+        """
+        self.candidates = {name: d for name, d in candidates.items() if d.is_loaded}
+        self.max_pending = max_pending
+        self.sample_rate = sample_rate
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng()
+        self._stats = {name: _CandidateStats() for name in self.candidates}
+        self.submitted_rows = 0
+        self.shed_rows = 0
+        self.sampled_out_rows = 0
+
+    def submit(self, features: pd.DataFrame, primary_probability: np.ndarray) -> bool:
+        """
+        Queue one scored batch for shadow comparison without blocking
+
+        Returns:
+            False if the batch was sampled out or shed
+        """
+        n = len(features)
+        if not self.candidates:
+            return False
+        if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out_rows += n
+            return False
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.shed_rows += n
+            return False
+        with self._lock:
+            self.submitted_rows += n
+        self._executor.submit(self._run, features, np.array(primary_probability, copy=True))
+        return True
+
+    def _run(self, features: pd.DataFrame, primary_probability: np.ndarray):
+        try:
+            primary_fraud = primary_probability > 0.5
+            primary_levels = risk_level_array(primary_probability)
+            for name, detector in self.candidates.items():
+                stats = self._stats[name]
+                start = time.perf_counter()
+                try:
+                    probability, is_fraud = detector.score_frame(features, exact=True)
+                except Exception as e:
+                    with self._lock:
+                        stats.errors += 1
+                        stats.last_error = str(e)
+                    continue
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                delta = probability - primary_probability
+                abs_delta = np.abs(delta)
+                with self._lock:
+                    stats.rows += len(delta)
+                    stats.batches += 1
+                    stats.fraud_agree += int((is_fraud == primary_fraud).sum())
+                    stats.level_agree += int((risk_level_array(probability) == primary_levels).sum())
+                    stats.abs_delta_sum += float(abs_delta.sum())
+                    stats.abs_delta_max = max(stats.abs_delta_max, float(abs_delta.max()))
+                    stats.deltas.extend(delta.tolist())
+                    stats.latencies_ms.append(elapsed_ms / len(delta))
+        finally:
+            self._slots.release()
+
+    def report(self) -> Dict:
+        """Agreement, probability deltas and latency per candidate"""
+        with self._lock:
+            candidates = {}
+            for name, stats in self._stats.items():
+                detector = self.candidates[name]
+                deltas = np.array(stats.deltas)
+                latencies = np.array(stats.latencies_ms)
+                rows = stats.rows
+                candidates[name] = {
+                    'model_dir': detector.model_dir,
+                    'model_type': type(detector.model).__name__,
+                    'rows': rows,
+                    'batches': stats.batches,
+                    'errors': stats.errors,
+                    'last_error': stats.last_error,
+                    'is_fraud_agreement': round(stats.fraud_agree / rows, 4) if rows else None,
+                    'risk_level_agreement': round(stats.level_agree / rows, 4) if rows else None,
+                    'mean_abs_delta': round(stats.abs_delta_sum / rows, 4) if rows else None,
+                    'max_abs_delta': round(stats.abs_delta_max, 4),
+                    'mean_delta': round(float(deltas.mean()), 4) if len(deltas) else None,
+                    'abs_delta_p95': round(float(np.percentile(np.abs(deltas), 95)), 4) if len(deltas) else None,
+                    'latency_ms_per_row': {
+                        'p50': round(float(np.percentile(latencies, 50)), 4),
+                        'p95': round(float(np.percentile(latencies, 95)), 4)
+                    } if len(latencies) else None
+                }
+            return {
+                'candidates': candidates,
+                'submitted_rows': self.submitted_rows,
+                'shed_rows': self.shed_rows,
+                'sampled_out_rows': self.sampled_out_rows,
+                'max_pending': self.max_pending,
+                'sample_rate': self.sample_rate
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def load_candidates(model_dirs: List[str], primary: FraudDetector) -> Dict[str, FraudDetector]:
+    """
+    Load candidate detectors that share the primary's velocity state and graph
+
+    Forest candidates score through the flattened tree walk (always with
+    exact=True, so probabilities match predict_proba); it is much cheaper than
+    predict_proba's joblib dispatch and holds the GIL for less time.
+    """
+    candidates = {}
+    for model_dir in model_dirs:
+        detector = FraudDetector(
+            model_dir=model_dir, velocity_store=primary.velocity, graph_index=primary.graph,
+            early_exit=True, explain=False
+        )
+        if detector.is_loaded:
+            # Any fallback to predict_proba stays on the shadow worker thread
+            if hasattr(detector.model, 'n_jobs'):
+                detector.model.n_jobs = 1
+                detector.model.verbose = 0
+            candidates[model_dir] = detector
+    return candidates
@@ -0,0 +1,303 @@
+"""
+Local Scoring Socket Client
+Client for the Unix domain socket sidecar of the fraud API (socket_server.py),
+for services on the same host that want to skip HTTP, routing and JSON.
+Standard library only, so it can be vendored into the caller.
+
+Protocol (all integers little-endian):
+    frame    = u32 payload length, payload
+    request  = REQUEST_HEADER (version, flags, count, request id) + count TRANSACTION_RECORDs
+    response = RESPONSE_HEADER (version, status, count, request id) + count RESULT_RECORDs,
+               or a UTF-8 error message when status is STATUS_ERROR
+Requests on one connection may be pipelined; responses come back in order
+and echo the request id.
+
+Run directly to compare latency against the HTTP /api/analyze endpoint.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import select
+import socket
+import statistics
+import struct
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_SOCKET_PATH = os.environ.get('FRAUD_SOCKET_PATH', '/tmp/fraud_scoring.sock')
+
+PROTOCOL_VERSION = 1
+FLAG_EXACT = 0x01           # Full-forest probability even in cascade/early-exit mode
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+FRAME_LENGTH = struct.Struct('<I')
+REQUEST_HEADER = struct.Struct('<BBHI')
+RESPONSE_HEADER = struct.Struct('<BBHI')
+MAX_RECORDS = 0xFFFF
+
+# amount, oldbalanceOrg, newbalanceOrig, oldbalanceDest, newbalanceDest,
+# step (-1 = now), type code, nameOrig, nameDest (ASCII, NUL padded)
+TRANSACTION_RECORD = struct.Struct('<5di B3x 16s16s')
+ACCOUNT_ID_BYTES = 16
+# fraud_probability, risk level code, RESULT_* flags, degraded reason code
+RESULT_RECORD = struct.Struct('<dBBB5x')
+
+TRANSACTION_TYPES = ('CASH_IN', 'CASH_OUT', 'DEBIT', 'PAYMENT', 'TRANSFER')
+RISK_LEVELS = ('low', 'medium', 'high', 'critical', 'unknown', 'error')
+DEGRADED_REASONS = (None, 'model_not_loaded', 'queue_full', 'deadline')
+
+RESULT_IS_FRAUD = 0x01
+RESULT_SHOULD_BLOCK = 0x02
+RESULT_REQUIRES_REVIEW = 0x04
+RESULT_RULES = 0x08             # Scored by the rule-only fallback
+RESULT_INEXACT = 0x10           # Probability is an estimate within the right risk level
+
+MAX_FRAME_BYTES = REQUEST_HEADER.size + MAX_RECORDS * TRANSACTION_RECORD.size
+
+
+class ScoringError(Exception):
+    """Raised when the sidecar rejects a request"""
+
+
+def _account_id(value) -> bytes:
+    encoded = str(value).encode('ascii')
+    if len(encoded) > ACCOUNT_ID_BYTES:
+        raise ValueError(f"Account id longer than {ACCOUNT_ID_BYTES} bytes: {value!r}")
+    return encoded
+
+
+def encode_transaction(transaction: Dict) -> bytes:
+    """Pack a transaction dict (the /api/predict fields) into a fixed-layout record"""
+    transaction_type = str(transaction.get('type', 'TRANSFER')).upper()
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError(f"Unknown transaction type: {transaction_type}")
+    return TRANSACTION_RECORD.pack(
+        float(transaction.get('amount', 0.0)),
+        float(transaction.get('oldbalanceOrg', 0.0)),
+        float(transaction.get('newbalanceOrig', 0.0)),
+        float(transaction.get('oldbalanceDest', 0.0)),
+        float(transaction.get('newbalanceDest', 0.0)),
+        int(transaction.get('step', -1)),
+        TRANSACTION_TYPES.index(transaction_type),
+        _account_id(transaction.get('nameOrig', '')),
+        _account_id(transaction.get('nameDest', '')),
+    )
+
+
+def encode_request(transactions: List[Dict], request_id: int, exact: bool = False) -> bytes:
+    """Length-prefixed request frame for up to MAX_RECORDS transactions"""
+    if len(transactions) > MAX_RECORDS:
+        raise ValueError(f"At most {MAX_RECORDS} transactions per frame")
+    payload = REQUEST_HEADER.pack(PROTOCOL_VERSION, FLAG_EXACT if exact else 0, len(transactions), request_id)
+    payload += b''.join(encode_transaction(t) for t in transactions)
+    return FRAME_LENGTH.pack(len(payload)) + payload
+
+
+def decode_result(data, offset: int = 0) -> Dict:
+    probability, level, flags, reason = RESULT_RECORD.unpack_from(data, offset)
+    result = {
+        'is_fraud': bool(flags & RESULT_IS_FRAUD),
+        'fraud_probability': probability,
+        'risk_level': RISK_LEVELS[level],
+        'should_block': bool(flags & RESULT_SHOULD_BLOCK),
+        'requires_review': bool(flags & RESULT_REQUIRES_REVIEW),
+        'scorer': 'rules' if flags & RESULT_RULES else 'model',
+    }
+    if flags & RESULT_INEXACT:
+        result['probability_exact'] = False
+    if reason:
+        result['degraded_reason'] = DEGRADED_REASONS[reason]
+    return result
+
+
+class ScoringClient:
+    """
+    Connection to the scoring sidecar
+
+    score() and score_batch() are blocking round trips; send() and receive()
+    pipeline requests on the one connection. Not thread-safe; use one client
+    per thread.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._ids = itertools.count(1)
+        self._pending = deque()
+        # Response bytes read while sending; see _send
+        self._inbox = bytearray()
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, transactions: List[Dict], exact: bool = False) -> int:
+        """Queue a request without waiting for its response; returns its id"""
+        request_id = next(self._ids) & 0xFFFFFFFF
+        self._send(encode_request(transactions, request_id, exact))
+        self._pending.append(request_id)
+        return request_id
+
+    def receive(self) -> Tuple[int, List[Dict]]:
+        """Next response in request order, as (request id, results)"""
+        expected = self._pending.popleft()
+        payload = self._read_exact(FRAME_LENGTH.unpack(self._read_exact(FRAME_LENGTH.size))[0])
+        version, status, count, request_id = RESPONSE_HEADER.unpack_from(payload)
+        if request_id != expected:
+            raise ScoringError(f"Response for request {request_id}, expected {expected}")
+        if status != STATUS_OK:
+            raise ScoringError(bytes(payload[RESPONSE_HEADER.size:]).decode('utf-8', 'replace'))
+        return request_id, [
+            decode_result(payload, RESPONSE_HEADER.size + i * RESULT_RECORD.size) for i in range(count)
+        ]
+
+    def score(self, transaction: Dict, exact: bool = False) -> Dict:
+        """Score one transaction"""
+        self.send([transaction], exact)
+        return self.receive()[1][0]
+
+    def score_batch(self, transactions: List[Dict], exact: bool = False) -> List[Dict]:
+        """Score any number of transactions, pipelining frames of MAX_RECORDS"""
+        for start in range(0, len(transactions), MAX_RECORDS):
+            self.send(transactions[start:start + MAX_RECORDS], exact)
+        results = []
+        while self._pending:
+            results.extend(self.receive()[1])
+        return results
+
+    def _send(self, frame: bytes):
+        """
+        Write a frame while draining responses into the inbox, so a long
+        pipeline can't deadlock with both sides blocked writing
+        """
+        view = memoryview(frame)
+        while view:
+            readable, writable, _ = select.select([self._sock], [self._sock], [], self.timeout)
+            if not (readable or writable):
+                raise TimeoutError('Timed out sending to the scoring socket')
+            if readable:
+                chunk = self._sock.recv(256 * 1024)
+                if not chunk:
+                    raise ConnectionError('Scoring socket closed by the server')
+                self._inbox += chunk
+            if writable:
+                view = view[self._sock.send(view):]
+
+    def _read_exact(self, n: int) -> bytes:
+        while len(self._inbox) < n:
+            chunk = self._sock.recv(max(n - len(self._inbox), 256 * 1024))
+            if not chunk:
+                raise ConnectionError('Scoring socket closed by the server')
+            self._inbox += chunk
+        data = bytes(self._inbox[:n])
+        del self._inbox[:n]
+        return data
+
+
+def _synthetic_transactions(n: int, seed: int = 42) -> List[Dict]:
+    rng = random.Random(seed)
+    transactions = []
+    for _ in range(n):
+        amount = round(rng.lognormvariate(9, 1.5), 2)
+        balance = round(amount * rng.choice([0.5, 1.0, 1.0, 3.0]), 2)
+        recipient_balance = round(rng.lognormvariate(10, 2), 2)
+        transactions.append({
+            'type': rng.choice(['TRANSFER', 'CASH_OUT', 'PAYMENT']),
+            'amount': amount,
+            'nameOrig': f"C{rng.randrange(10**9, 10**10)}",
+            'oldbalanceOrg': balance,
+            'newbalanceOrig': max(0.0, balance - amount),
+            'nameDest': f"C{rng.randrange(10**9, 10**10)}",
+            'oldbalanceDest': recipient_balance,
+            'newbalanceDest': recipient_balance + amount,
+        })
+    return transactions
+
+
+def _percentiles(samples_ms: List[float]) -> str:
+    ordered = sorted(samples_ms)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return (f"p50 {statistics.median(ordered):7.3f} ms   p95 {pick(0.95):7.3f} ms   "
+            f"p99 {pick(0.99):7.3f} ms")
+
+
+def main():
+    """Latency of the socket sidecar against HTTP /api/analyze on the same transactions"""
+    parser = argparse.ArgumentParser(description='Compare socket sidecar and HTTP scoring latency')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help='Sidecar socket path')
+    parser.add_argument('--url', default='http://localhost:5001', help='Fraud API base URL')
+    parser.add_argument('--requests', type=int, default=2000, help='Single-transaction requests per path')
+    parser.add_argument('--pipeline', type=int, default=32, help='Requests in flight for the pipelined run')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SCORING LATENCY: UNIX SOCKET vs HTTP")
+    print("=" * 60)
+
+    transactions = _synthetic_transactions(args.requests)
+
+    url = urlparse(args.url)
+    http_conn = http.client.HTTPConnection(url.hostname, url.port or 80)
+    http_ms = []
+    for t in transactions:
+        body = json.dumps({
+            'sender_id': t['nameOrig'], 'recipient_id': t['nameDest'], 'amount': t['amount'],
+            'sender_balance': t['oldbalanceOrg'], 'recipient_balance': t['oldbalanceDest'],
+            'transaction_type': t['type']
+        })
+        start = time.perf_counter()
+        http_conn.request('POST', '/api/analyze?explain=0', body, {'Content-Type': 'application/json'})
+        http_conn.getresponse().read()
+        http_ms.append((time.perf_counter() - start) * 1000)
+    http_conn.close()
+
+    with ScoringClient(args.socket) as client:
+        socket_ms = []
+        for t in transactions:
+            start = time.perf_counter()
+            client.score(t)
+            socket_ms.append((time.perf_counter() - start) * 1000)
+
+        # Keep args.pipeline single-transaction requests in flight
+        start = time.perf_counter()
+        for t in transactions[:args.pipeline]:
+            client.send([t])
+        for t in transactions[args.pipeline:]:
+            client.receive()
+            client.send([t])
+        while client._pending:
+            client.receive()
+        pipelined_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.score_batch(transactions)
+        batch_seconds = time.perf_counter() - start
+
+    print(f"\nSingle transaction, one request at a time ({args.requests:,} requests):")
+    print(f"  HTTP /api/analyze  {_percentiles(http_ms)}")
+    print(f"  Unix socket        {_percentiles(socket_ms)}")
+    print(f"\nThroughput:")
+    print(f"  HTTP sequential    {args.requests / (sum(http_ms) / 1000):>10,.0f} tx/sec")
+    print(f"  Socket sequential  {args.requests / (sum(socket_ms) / 1000):>10,.0f} tx/sec")
+    print(f"  Socket pipelined   {args.requests / pipelined_seconds:>10,.0f} tx/sec ({args.pipeline} in flight)")
+    print(f"  Socket one batch   {args.requests / batch_seconds:>10,.0f} tx/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Local Scoring Socket Sidecar
+Unix domain socket listener that scores fixed-layout binary transaction
+records with the API server's FraudDetector, skipping HTTP parsing, Flask
+routing and JSON. Protocol and client: socket_client.py.
+
+Records are decoded straight into column arrays with a numpy structured
+dtype. Frames a client has pipelined are scored together: everything
+already buffered on a connection goes through one predict_columns call.
+"""
+
+import os
+import socketserver
+import threading
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Optional
+
+import numpy as np
+
+from fraud_predictor import ANONYMOUS_ACCOUNT, NUMERIC_FIELDS, FraudDetector
+from velocity import current_step
+from socket_client import (
+    DEFAULT_SOCKET_PATH, DEGRADED_REASONS, FLAG_EXACT, FRAME_LENGTH, MAX_FRAME_BYTES, PROTOCOL_VERSION,
+    REQUEST_HEADER, RESPONSE_HEADER, RESULT_INEXACT, RESULT_IS_FRAUD, RESULT_RECORD, RESULT_REQUIRES_REVIEW,
+    RESULT_RULES, RESULT_SHOULD_BLOCK, RISK_LEVELS, STATUS_ERROR, STATUS_OK, TRANSACTION_RECORD,
+    TRANSACTION_TYPES
+)
+
+# numpy view of socket_client.TRANSACTION_RECORD
+TRANSACTION_DTYPE = np.dtype({
+    'names': ['amount', 'oldbalanceOrg', 'newbalanceOrig', 'oldbalanceDest', 'newbalanceDest',
+              'step', 'type', 'nameOrig', 'nameDest'],
+    'formats': ['<f8', '<f8', '<f8', '<f8', '<f8', '<i4', 'u1', 'S16', 'S16'],
+    'offsets': [0, 8, 16, 24, 32, 40, 44, 48, 64],
+    'itemsize': TRANSACTION_RECORD.size
+})
+
+RESULT_DTYPE = np.dtype({
+    'names': ['fraud_probability', 'risk_level', 'flags', 'degraded_reason'],
+    'formats': ['<f8', 'u1', 'u1', 'u1'],
+    'offsets': [0, 8, 9, 10],
+    'itemsize': RESULT_RECORD.size
+})
+
+RECV_BYTES = 256 * 1024
+SOCKET_ROUTE = 'unix-socket'
+
+_TYPE_NAMES = np.array(TRANSACTION_TYPES)
+_RISK_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+_REASON_CODES = {reason: code for code, reason in enumerate(DEGRADED_REASONS)}
+
+
+class _Frame:
+    """One parsed request frame"""
+
+    def __init__(self, payload: memoryview):
+        self.error = None
+        self.records = None
+        self.exact = False
+        self.request_id = 0
+        if len(payload) < REQUEST_HEADER.size:
+            self.error = 'Truncated request header'
+            return
+        version, flags, count, self.request_id = REQUEST_HEADER.unpack_from(payload)
+        self.exact = bool(flags & FLAG_EXACT)
+        if version != PROTOCOL_VERSION:
+            self.error = f'Unsupported protocol version {version}'
+        elif len(payload) != REQUEST_HEADER.size + count * TRANSACTION_RECORD.size:
+            self.error = f'Frame length does not match {count} records'
+        else:
+            self.records = np.frombuffer(payload, dtype=TRANSACTION_DTYPE, offset=REQUEST_HEADER.size)
+            if len(self.records) and self.records['type'].max() >= len(TRANSACTION_TYPES):
+                self.error = 'Unknown transaction type code'
+
+
+def records_to_columns(records: np.ndarray) -> Dict[str, np.ndarray]:
+    """Column arrays for FraudDetector.predict_columns from decoded records"""
+    columns = {name: records[name].astype(np.float64) for name in
+               ['amount', 'oldbalanceOrg', 'newbalanceOrig', 'oldbalanceDest', 'newbalanceDest']}
+    step = records['step'].astype(np.float64)
+    given = step >= 0
+    columns['step'] = np.where(given, step, NUMERIC_FIELDS['step'])
+    # Same as the HTTP path: velocity windows use the wall-clock hour without a step
+    columns['velocityStep'] = np.where(given, step, current_step())
+    columns['type'] = _TYPE_NAMES[records['type']]
+    for name in ['nameOrig', 'nameDest']:
+        ids = records[name].astype(str)
+        columns[name] = np.where(ids == '', ANONYMOUS_ACCOUNT, ids)
+    return columns
+
+
+def encode_results(results: List[Dict]) -> np.ndarray:
+    packed = np.zeros(len(results), dtype=RESULT_DTYPE)
+    for i, result in enumerate(results):
+        level = result['risk_level']
+        flags = 0
+        if result['is_fraud']:
+            flags |= RESULT_IS_FRAUD
+        if result['is_fraud'] or level == 'critical':
+            flags |= RESULT_SHOULD_BLOCK
+        if level in ('high', 'critical'):
+            flags |= RESULT_REQUIRES_REVIEW
+        if result.get('scorer') == 'rules':
+            flags |= RESULT_RULES
+        if result.get('probability_exact') is False:
+            flags |= RESULT_INEXACT
+        packed[i] = (result['fraud_probability'], _RISK_CODES.get(level, _RISK_CODES['unknown']), flags,
+                     _REASON_CODES.get(result.get('degraded_reason'), 0))
+    return packed
+
+
+def _response(request_id: int, status: int, body: bytes, count: int = 0) -> bytes:
+    payload = RESPONSE_HEADER.pack(PROTOCOL_VERSION, status, count, request_id) + body
+    return FRAME_LENGTH.pack(len(payload)) + payload
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Reads frames off one connection and answers them in order"""
+
+    def setup(self):
+        with self.server.sidecar._stats_lock:
+            self.server.sidecar.stats['connections'] += 1
+
+    def handle(self):
+        buffer = bytearray()
+        while True:
+            data = self.request.recv(RECV_BYTES)
+            if not data:
+                return
+            buffer += data
+            frames, consumed = [], 0
+            while len(buffer) - consumed >= FRAME_LENGTH.size:
+                length = FRAME_LENGTH.unpack_from(buffer, consumed)[0]
+                if length > MAX_FRAME_BYTES:
+                    self.request.sendall(_response(0, STATUS_ERROR, b'Frame too large'))
+                    return
+                if len(buffer) - consumed < FRAME_LENGTH.size + length:
+                    break
+                start = consumed + FRAME_LENGTH.size
+                frames.append(_Frame(memoryview(bytes(buffer[start:start + length]))))
+                consumed = start + length
+            del buffer[:consumed]
+            if frames:
+                self.request.sendall(self.server.sidecar.answer(frames))
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ScoringSidecar:
+    """Unix socket listener sharing a FraudDetector with the HTTP server"""
+
+    def __init__(self, detector: FraudDetector, path: str = DEFAULT_SOCKET_PATH,
+                 admit: Optional[Callable[[], ContextManager[Optional[str]]]] = None,
+                 audit: Optional[Callable[[str, Dict[str, np.ndarray], List[Dict]], None]] = None):
+        """
+        Args:
+            detector: Detector to score with (the API server's instance)
+            path: Socket file to listen on; a stale file there is replaced
+            admit: Admission context, yields None or the fallback reason
+                (see AdmissionController.admit); admitted unconditionally if None
+            audit: Called with (endpoint, columns, results) after scoring
+        """
+        self.detector = detector
+        self.path = path
+        self.admit = admit or (lambda: nullcontext(None))
+        self.audit = audit
+        self.stats = {'connections': 0, 'frames': 0, 'rows': 0, 'scoring_calls': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = _UnixServer(self.path, _Handler)
+        self._server.sidecar = self
+        # Same-host callers only: owner and group may connect
+        os.chmod(self.path, 0o660)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='scoring-socket', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def report(self) -> Dict:
+        with self._stats_lock:
+            return {'path': self.path, **self.stats}
+
+    def answer(self, frames: List[_Frame]) -> bytes:
+        """Score a run of pipelined frames; returns their responses, in order"""
+        responses = [None] * len(frames)
+        for exact in (False, True):
+            batch = [i for i, f in enumerate(frames) if f.error is None and f.exact == exact]
+            if not batch:
+                continue
+            records = np.concatenate([frames[i].records for i in batch])
+            try:
+                columns = records_to_columns(records)
+                with self.admit() as fallback:
+                    results = self.detector.predict_columns(columns, exact=exact, explain=False,
+                                                            fallback=fallback)
+                if self.audit:
+                    self.audit(SOCKET_ROUTE, columns, results)
+                packed = encode_results(results)
+            except Exception as e:
+                for i in batch:
+                    frames[i].error = f'Prediction error: {e}'
+                continue
+            offset = 0
+            for i in batch:
+                n = len(frames[i].records)
+                responses[i] = _response(frames[i].request_id, STATUS_OK, packed[offset:offset + n].tobytes(), n)
+                offset += n
+            with self._stats_lock:
+                self.stats['scoring_calls'] += 1
+                self.stats['rows'] += len(records)
+
+        for i, frame in enumerate(frames):
+            if frame.error is not None:
+                responses[i] = _response(frame.request_id, STATUS_ERROR, frame.error.encode('utf-8'))
+        with self._stats_lock:
+            self.stats['frames'] += len(frames)
+            self.stats['errors'] += sum(f.error is not None for f in frames)
+        return b''.join(responses)
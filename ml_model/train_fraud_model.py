@@ -20,9 +20,25 @@ from imblearn.over_sampling import SMOTE
 from imblearn.under_sampling import RandomUnderSampler
 from imblearn.pipeline import Pipeline as ImbPipeline
 import joblib
+import argparse
+import time
 import warnings
 import os
 
+from velocity import VELOCITY_FEATURES, VelocityStore, add_velocity_features
+from cascade import (
+    SCREENING_PATH, cascade_report, choose_margins, save_screening_model, train_screening_model
+)
+from model_backends import (
+    BACKENDS, DEFAULT_BACKEND, backend_path, build_model, evaluate_backend, print_leaderboard
+)
+from drift import DRIFT_REFERENCE_PATH, build_reference, save_drift_reference
+from balanced_sampler import DEFAULT_RESERVOIR_ROWS, StreamingBalancedSampler
+from compact_forest import (
+    COMPACT_MODEL_PATH, CompactForest, compression_report, print_compression_report, save_compact_model
+)
+from forest_eval import supports_early_exit
+
 warnings.filterwarnings('ignore')
 
 # Get the directory where this script is located
@@ -32,15 +48,22 @@ MODEL_PATH = os.path.join(SCRIPT_DIR, 'fraud_detection_model.joblib')
 SCALER_PATH = os.path.join(SCRIPT_DIR, 'scaler.joblib')
 ENCODER_PATH = os.path.join(SCRIPT_DIR, 'label_encoder.joblib')
 
-def load_and_explore_data():
+# Fraud : non-fraud after undersampling, and after SMOTE
+UNDERSAMPLING_RATIO = 0.1
+SMOTE_RATIO = 0.5
+TEST_SIZE = 0.2
+
+# CSV rows parsed at a time by the streaming sampler
+DEFAULT_CHUNK_ROWS = 250000
+
+def load_and_explore_data(data_path=DATA_PATH):
     """Load dataset and perform initial exploration"""
     print("=" * 60)
     print("FRAUD DETECTION MODEL TRAINING")
     print("=" * 60)
-    print(f"\nLoading dataset from: {DATA_PATH}")
+    print(f"\nLoading dataset from: {data_path}")
     
-    # Read dataset in chunks for memory efficiency
-    df = pd.read_csv(DATA_PATH)
+    df = pd.read_csv(data_path)
     
     print(f"\nDataset Shape: {df.shape}")
     print(f"Total Transactions: {len(df):,}")
@@ -54,15 +77,8 @@ def load_and_explore_data():
     return df
 
 
-def feature_engineering(df):
-    """Create meaningful features for fraud detection"""
-    print("\n" + "=" * 60)
-    print("FEATURE ENGINEERING")
-    print("=" * 60)
-    
-    # Create a copy to avoid modifying original
-    df = df.copy()
-    
+def add_row_features(df):
+    """Features computed from each transaction alone (added in place)"""
     # 1. Balance difference features
     df['origBalanceDiff'] = df['oldbalanceOrg'] - df['newbalanceOrig']
     df['destBalanceDiff'] = df['newbalanceDest'] - df['oldbalanceDest']
@@ -86,17 +102,38 @@ def feature_engineering(df):
     # 6. Merchant indicator (names starting with 'M')
     df['isMerchant'] = df['nameDest'].str.startswith('M').astype(int)
     
-    # 7. Large transaction indicator
-    amount_threshold = df['amount'].quantile(0.95)
-    df['isLargeTransaction'] = (df['amount'] > amount_threshold).astype(int)
-    
     # 8. Hour of day (simulated from step - each step represents 1 hour)
     df['hourOfDay'] = df['step'] % 24
     df['dayOfMonth'] = (df['step'] // 24) % 30
+    return df
+
+
+def add_dataset_features(df, amount_threshold, label_encoder):
+    """Features that depend on the whole dataset: its amount percentile and type classes (added in place)"""
+    # 7. Large transaction indicator
+    df['isLargeTransaction'] = (df['amount'] > amount_threshold).astype(int)
     
     # 9. Transaction type encoding
-    le = LabelEncoder()
-    df['typeEncoded'] = le.fit_transform(df['type'])
+    df['typeEncoded'] = label_encoder.transform(df['type'])
+    return df
+
+
+def feature_engineering(df, velocity_features=False):
+    """Create meaningful features for fraud detection"""
+    print("\n" + "=" * 60)
+    print("FEATURE ENGINEERING")
+    print("=" * 60)
+    
+    # Create a copy to avoid modifying original
+    df = add_row_features(df.copy())
+    
+    le = LabelEncoder().fit(df['type'])
+    df = add_dataset_features(df, df['amount'].quantile(0.95), le)
+    
+    # 10. Sender velocity (replayed through the same windows used when scoring)
+    if velocity_features:
+        print("Replaying transactions for sender velocity features...")
+        df = add_velocity_features(df)
     
     print(f"Created {len(df.columns) - 11} new features")
     print(f"Total features: {len(df.columns)}")
@@ -104,13 +141,8 @@ def feature_engineering(df):
     return df, le
 
 
-def prepare_features(df):
-    """Prepare feature matrix and target variable"""
-    print("\n" + "=" * 60)
-    print("PREPARING FEATURES")
-    print("=" * 60)
-    
-    # Select features for modeling
+def model_feature_columns(velocity_features=False):
+    """Features the model is trained on, in order"""
     feature_columns = [
         'step', 'amount', 'oldbalanceOrg', 'newbalanceOrig',
         'oldbalanceDest', 'newbalanceDest', 'typeEncoded',
@@ -120,6 +152,19 @@ def prepare_features(df):
         'completeTransfer', 'isMerchant', 'isLargeTransaction',
         'hourOfDay', 'dayOfMonth'
     ]
+    if velocity_features:
+        feature_columns += VELOCITY_FEATURES
+    return feature_columns
+
+
+def prepare_features(df, velocity_features=False):
+    """Prepare feature matrix and target variable"""
+    print("\n" + "=" * 60)
+    print("PREPARING FEATURES")
+    print("=" * 60)
+    
+    # Select features for modeling
+    feature_columns = model_feature_columns(velocity_features)
     
     X = df[feature_columns]
     y = df['isFraud']
@@ -143,14 +188,18 @@ def handle_class_imbalance(X_train, y_train):
     
     # Use combination of undersampling majority and SMOTE for minority
     # First undersample majority class, then apply SMOTE
-    under_sampler = RandomUnderSampler(sampling_strategy=0.1, random_state=42)
-    smote = SMOTE(sampling_strategy=0.5, random_state=42)
+    under_sampler = RandomUnderSampler(sampling_strategy=UNDERSAMPLING_RATIO, random_state=42)
     
     # Apply undersampling first
     X_under, y_under = under_sampler.fit_resample(X_train, y_train)
     print(f"After undersampling: {len(y_under):,} samples")
     
-    # Apply SMOTE
+    return oversample_minority(X_under, y_under)
+
+
+def oversample_minority(X_under, y_under):
+    """SMOTE the already undersampled training set up to SMOTE_RATIO"""
+    smote = SMOTE(sampling_strategy=SMOTE_RATIO, random_state=42)
     X_resampled, y_resampled = smote.fit_resample(X_under, y_under)
     print(f"After SMOTE: {len(y_resampled):,} samples")
     print(f"Final fraud cases: {y_resampled.sum():,}")
@@ -159,8 +208,86 @@ def handle_class_imbalance(X_train, y_train):
     return X_resampled, y_resampled
 
 
-def train_model(X_train, y_train, X_test, y_test):
-    """Train and evaluate fraud detection model"""
+def stream_balanced_data(data_path=DATA_PATH, velocity_features=False, chunk_rows=DEFAULT_CHUNK_ROWS,
+                         reservoir_rows=DEFAULT_RESERVOIR_ROWS):
+    """
+    Split and undersample while streaming the CSV (balanced_sampler.py),
+    in place of load_and_explore_data, feature_engineering, the split and
+    the undersampling step
+    
+    Row features are computed per chunk and the account IDs dropped before
+    rows are kept. The amount percentile and type encoding need the whole
+    dataset, so they're applied to the kept rows at the end; velocity is
+    replayed chunk by chunk through one store, which matches the in-memory
+    replay as long as the file is in step order (as PaySim is).
+    
+    Returns:
+        (X_train, X_test, y_train, y_test, label_encoder, feature_columns);
+        X_train is undersampled to UNDERSAMPLING_RATIO, ready for SMOTE
+    """
+    print("=" * 60)
+    print("FRAUD DETECTION MODEL TRAINING")
+    print("=" * 60)
+    print(f"\nStreaming dataset from: {data_path} ({chunk_rows:,} rows per chunk)")
+    
+    feature_columns = model_feature_columns(velocity_features)
+    keep_columns = [c for c in feature_columns if c not in ('isLargeTransaction', 'typeEncoded')]
+    keep_columns += ['type', 'isFraud']
+    sampler = StreamingBalancedSampler(ratio=UNDERSAMPLING_RATIO, test_size=TEST_SIZE,
+                                       reservoir_rows=reservoir_rows)
+    store = VelocityStore() if velocity_features else None
+    amounts, type_counts = [], pd.Series(dtype=int)
+    fraud_rows = 0
+    
+    for chunk in pd.read_csv(data_path, chunksize=chunk_rows):
+        chunk = add_row_features(chunk)
+        if velocity_features:
+            chunk = add_velocity_features(chunk, store=store)
+        amounts.append(chunk['amount'].to_numpy())
+        type_counts = type_counts.add(chunk['type'].value_counts(), fill_value=0)
+        fraud_rows += int(chunk['isFraud'].sum())
+        sampler.update(chunk[keep_columns].astype({'type': 'category'}))
+    
+    amounts = np.concatenate(amounts)
+    print(f"\nTotal Transactions: {sampler.rows:,}")
+    print(f"Fraud Percentage: {fraud_rows / sampler.rows * 100:.4f}%")
+    print(f"\nTransaction Types:\n{type_counts.astype(int).sort_values(ascending=False).to_string()}")
+    
+    # Same threshold and classes as feature_engineering on the full frame
+    amount_threshold = pd.Series(amounts).quantile(0.95)
+    label_encoder = LabelEncoder().fit(np.asarray(type_counts.index, dtype=object))
+    del amounts
+    
+    train, test = sampler.sample()
+    frames = []
+    for df in (train, test):
+        df = add_dataset_features(df.astype({'type': str}), amount_threshold, label_encoder)
+        frames += [df[feature_columns], df['isFraud']]
+    X_train, y_train, X_test, y_test = frames
+    
+    print("\n" + "=" * 60)
+    print("STREAMING CLASS-BALANCED SAMPLE")
+    print("=" * 60)
+    print(f"Training set: {sampler.rows - len(y_test):,} samples, "
+          f"{sampler.majority_rows:,} non-fraud streamed through the reservoir")
+    print(f"After undersampling: {len(y_train):,} samples ({int(y_train.sum()):,} fraud)")
+    print(f"Test set: {len(y_test):,} samples")
+    
+    return X_train, X_test, y_train, y_test, label_encoder, feature_columns
+
+
+def train_model(X_train, y_train, X_test, y_test, backends=(DEFAULT_BACKEND,), select=None):
+    """
+    Train each model backend, compare them on the test set and pick one to serve
+    
+    Args:
+        backends: Backend names (see model_backends.BACKENDS)
+        select: Backend to serve, 'best' for the highest ROC-AUC, or None for
+            the first one listed
+    
+    Returns:
+        (selected model, scaler, selected backend name, {name: model}, leaderboard rows)
+    """
     print("\n" + "=" * 60)
     print("MODEL TRAINING")
     print("=" * 60)
@@ -170,28 +297,30 @@ def train_model(X_train, y_train, X_test, y_test):
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Train Random Forest (best for fraud detection)
-    print("\nTraining Random Forest Classifier...")
-    rf_model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=20,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        class_weight='balanced',
-        random_state=42,
-        n_jobs=-1,
-        verbose=1
-    )
-    
-    rf_model.fit(X_train_scaled, y_train)
+    models, leaderboard = {}, []
+    for name in backends:
+        print(f"\nTraining {name}...")
+        model = build_model(name)
+        start = time.perf_counter()
+        model.fit(X_train_scaled, y_train)
+        train_seconds = time.perf_counter() - start
+        models[name] = model
+        leaderboard.append(evaluate_backend(name, model, train_seconds, X_test_scaled, np.asarray(y_test)))
+    
+    if select == 'best':
+        select = max(leaderboard, key=lambda row: row['roc_auc'])['backend']
+    selected = select or backends[0]
+    if selected not in models:
+        raise ValueError(f"Selected backend '{selected}' was not trained (--backends {','.join(backends)})")
+    model = models[selected]
     
     # Predictions
-    y_pred = rf_model.predict(X_test_scaled)
-    y_pred_proba = rf_model.predict_proba(X_test_scaled)[:, 1]
+    y_pred = model.predict(X_test_scaled)
+    y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
     
     # Evaluation
     print("\n" + "=" * 60)
-    print("MODEL EVALUATION")
+    print(f"MODEL EVALUATION ({selected})")
     print("=" * 60)
     
     print("\nClassification Report:")
@@ -210,16 +339,77 @@ def train_model(X_train, y_train, X_test, y_test):
     f1 = f1_score(y_test, y_pred)
     print(f"F1 Score: {f1:.4f}")
     
+    print("\n" + "=" * 60)
+    print("BACKEND LEADERBOARD")
+    print("=" * 60)
+    print_leaderboard(leaderboard, selected)
+    
     # Feature importance
     print("\n" + "=" * 60)
     print("FEATURE IMPORTANCE")
     print("=" * 60)
     
-    return rf_model, scaler
+    return model, scaler, selected, models, leaderboard
 
 
-def save_model(model, scaler, label_encoder, feature_columns):
-    """Save trained model and preprocessing objects"""
+def train_cascade(X_train, y_train, X_test, y_test, forest, scaler, args):
+    """Train the screening stage and calibrate its margins against the forest"""
+    print("\n" + "=" * 60)
+    print("CASCADE SCREENING MODEL")
+    print("=" * 60)
+    
+    print(f"\nTraining screening model ({args.screening_model})...")
+    screening = train_screening_model(scaler.transform(X_train), y_train, kind=args.screening_model)
+    
+    # Calibrate margins on one half of the test set, report on the other
+    X_cal, X_eval, y_cal, y_eval = train_test_split(
+        X_test, y_test, test_size=0.5, random_state=42, stratify=y_test
+    )
+    X_cal = scaler.transform(X_cal)
+    X_eval = scaler.transform(X_eval)
+    low_margin, high_margin = choose_margins(
+        screening.predict_proba(X_cal)[:, 1],
+        forest.predict_proba(X_cal)[:, 1],
+        np.asarray(y_cal),
+        max_recall_loss=args.cascade_max_recall_loss,
+        max_false_critical=args.cascade_max_false_critical
+    )
+    if args.cascade_low_margin is not None:
+        low_margin = args.cascade_low_margin
+    if args.cascade_high_margin is not None:
+        high_margin = args.cascade_high_margin
+    
+    report = cascade_report(screening, low_margin, high_margin, forest, X_eval, np.asarray(y_eval))
+    
+    print(f"\nMargins: low < {report['low_margin']}, critical > {report['high_margin']}")
+    print(f"Short-circuited: {report['short_circuit_fraction'] * 100:.1f}% of traffic "
+          f"({report['short_circuit_low'] * 100:.1f}% low, {report['short_circuit_critical'] * 100:.1f}% critical)")
+    print(f"Batch latency ({report['rows']:,} rows): "
+          f"forest {report['batch_ms']['forest']:.0f} ms, cascade {report['batch_ms']['cascade']:.0f} ms")
+    print(f"Single transaction: forest {report['single_row_us']['forest']:.0f} µs, "
+          f"cascade {report['single_row_us']['cascade']:.0f} µs")
+    print("\nFraud recall at risk-level thresholds:")
+    for threshold, recall in report['recall'].items():
+        print(f"  >= {threshold}: forest {recall['forest']:.4f}, cascade {recall['cascade']:.4f} "
+              f"(loss {recall['loss']:.4f})")
+    
+    save_screening_model(screening, low_margin, high_margin, report)
+    print(f"\nScreening model saved to: {SCREENING_PATH}")
+    return report
+
+
+def save_model(model, scaler, label_encoder, feature_columns, cascade=None,
+               backend=DEFAULT_BACKEND, other_models=None, leaderboard=None, drift_reference=None,
+               compact_model=None):
+    """Save trained model and preprocessing objects
+    
+    The selected backend becomes the default model; the other trained
+    backends are saved under backends/ and can be served with
+    FraudDetector(backend=...). The drift reference sketches (drift.py)
+    are what the API compares live traffic against. compact_model is a
+    (CompactForest, compression report) pair, saved as the smaller
+    inference artifact served with FraudDetector(compact=True).
+    """
     print("\n" + "=" * 60)
     print("SAVING MODEL")
     print("=" * 60)
@@ -228,6 +418,13 @@ def save_model(model, scaler, label_encoder, feature_columns):
     joblib.dump(model, MODEL_PATH)
     print(f"Model saved to: {MODEL_PATH}")
     
+    # Save the other trained backends
+    for name, other in (other_models or {}).items():
+        path = backend_path(SCRIPT_DIR, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(other, path)
+        print(f"Backend {name} saved to: {path}")
+    
     # Save scaler
     joblib.dump(scaler, SCALER_PATH)
     print(f"Scaler saved to: {SCALER_PATH}")
@@ -241,12 +438,29 @@ def save_model(model, scaler, label_encoder, feature_columns):
     joblib.dump(feature_columns, feature_path)
     print(f"Feature columns saved to: {feature_path}")
     
+    # Save drift reference sketches
+    if drift_reference is not None:
+        save_drift_reference(drift_reference, DRIFT_REFERENCE_PATH)
+        print(f"Drift reference saved to: {DRIFT_REFERENCE_PATH}")
+    
+    # Save the compressed inference artifact
+    if compact_model is not None:
+        save_compact_model(compact_model[0], COMPACT_MODEL_PATH)
+        print(f"Compact model saved to: {COMPACT_MODEL_PATH}")
+    
     # Save model metadata
     metadata = {
-        'model_type': 'RandomForestClassifier',
+        'model_type': type(model).__name__,
+        'backend': backend,
+        'backends': sorted(other_models or {}),
+        'leaderboard': leaderboard,
         'n_features': len(feature_columns),
         'feature_columns': feature_columns,
         'training_samples': 'PaySim Dataset',
+        'velocity_features': all(c in feature_columns for c in VELOCITY_FEATURES),
+        'cascade': cascade,
+        'drift_reference': drift_reference is not None,
+        'compact_model': compact_model[1] if compact_model is not None else None,
         'version': '1.0.0'
     }
     metadata_path = os.path.join(SCRIPT_DIR, 'model_metadata.joblib')
@@ -254,46 +468,119 @@ def save_model(model, scaler, label_encoder, feature_columns):
     print(f"Metadata saved to: {metadata_path}")
 
 
+def parse_args():
+    """Command line options for the training pipeline"""
+    parser = argparse.ArgumentParser(description='Train the fraud detection model')
+    parser.add_argument('--data', default=DATA_PATH, help='PaySim CSV to train on')
+    parser.add_argument('--sampler', choices=['streaming', 'in-memory'], default='streaming',
+                        help='Build the undersampled training set while streaming the CSV '
+                             '(balanced_sampler.py), or load everything and resample afterwards')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='CSV rows per chunk when streaming')
+    parser.add_argument('--reservoir-rows', type=int, default=DEFAULT_RESERVOIR_ROWS,
+                        help='Non-fraud rows held while streaming; must exceed the undersampled count')
+    parser.add_argument('--velocity-features', action='store_true',
+                        help='Add per-sender 1h/24h velocity features (see velocity.py)')
+    parser.add_argument('--screening-model', choices=['tree', 'logistic'], default='tree',
+                        help='First-stage model for the scoring cascade (see cascade.py)')
+    parser.add_argument('--cascade-max-recall-loss', type=float, default=0.002,
+                        help='Share of forest-caught frauds the screening stage may wave through')
+    parser.add_argument('--cascade-max-false-critical', type=float, default=0.001,
+                        help='Share of traffic the screening stage may mark critical against the forest')
+    parser.add_argument('--cascade-low-margin', type=float, default=None,
+                        help='Override the calibrated low margin')
+    parser.add_argument('--cascade-high-margin', type=float, default=None,
+                        help='Override the calibrated high margin')
+    parser.add_argument('--compact-leaf-bits', type=int, choices=[8, 16], default=8,
+                        help='Leaf probability bits in the compact forest artifact (see compact_forest.py)')
+    parser.add_argument('--backends', default=DEFAULT_BACKEND,
+                        help=f'Comma-separated model backends to train and compare ({", ".join(BACKENDS)})')
+    parser.add_argument('--select', default=None,
+                        help="Backend to serve: a name from --backends, or 'best' for the highest ROC-AUC "
+                             "(default: the first listed)")
+    return parser.parse_args()
+
+
 def main():
     """Main training pipeline"""
-    # Load data
-    df = load_and_explore_data()
-    
-    # Feature engineering
-    df, label_encoder = feature_engineering(df)
-    
-    # Prepare features
-    X, y, feature_columns = prepare_features(df)
-    
-    # Split data
-    print("\n" + "=" * 60)
-    print("SPLITTING DATA")
-    print("=" * 60)
-    
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    print(f"Training set: {len(X_train):,} samples")
-    print(f"Test set: {len(X_test):,} samples")
-    
-    # Handle class imbalance
-    X_train_balanced, y_train_balanced = handle_class_imbalance(X_train, y_train)
+    args = parse_args()
+    
+    if args.sampler == 'streaming':
+        # Split and undersample while reading; only SMOTE runs on the reduced set
+        X_train, X_test, y_train, y_test, label_encoder, feature_columns = stream_balanced_data(
+            args.data, velocity_features=args.velocity_features,
+            chunk_rows=args.chunk_rows, reservoir_rows=args.reservoir_rows
+        )
+        X_train_balanced, y_train_balanced = oversample_minority(X_train, y_train)
+    else:
+        # Load data
+        df = load_and_explore_data(args.data)
+        
+        # Feature engineering
+        df, label_encoder = feature_engineering(df, velocity_features=args.velocity_features)
+        
+        # Prepare features
+        X, y, feature_columns = prepare_features(df, velocity_features=args.velocity_features)
+        
+        # Split data
+        print("\n" + "=" * 60)
+        print("SPLITTING DATA")
+        print("=" * 60)
+        
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, random_state=42, stratify=y
+        )
+        
+        print(f"Training set: {len(X_train):,} samples")
+        print(f"Test set: {len(X_test):,} samples")
+        
+        # Handle class imbalance
+        X_train_balanced, y_train_balanced = handle_class_imbalance(X_train, y_train)
     
     # Train model
-    model, scaler = train_model(X_train_balanced, y_train_balanced, X_test, y_test)
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    model, scaler, backend, models, leaderboard = train_model(
+        X_train_balanced, y_train_balanced, X_test, y_test, backends=backends, select=args.select
+    )
     
     # Show feature importance
-    feature_importance = pd.DataFrame({
-        'feature': feature_columns,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = pd.DataFrame({
+            'feature': feature_columns,
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("\nTop 10 Most Important Features:")
+        print(feature_importance.head(10).to_string(index=False))
+    else:
+        print(f"\nNot available for {type(model).__name__}")
+    
+    # Screening stage for cascade mode
+    cascade = train_cascade(X_train_balanced, y_train_balanced, X_test, y_test, model, scaler, args)
+    
+    # Reference distribution for drift monitoring: the untouched test split
+    # (not the resampled training data) and the served model's output on it
+    drift_reference = build_reference(
+        X_test.to_numpy(dtype=np.float64), model.predict_proba(scaler.transform(X_test))[:, 1],
+        feature_columns, backend=backend
+    )
     
-    print("\nTop 10 Most Important Features:")
-    print(feature_importance.head(10).to_string(index=False))
+    # Compressed inference artifact, checked against the full forest on the test split
+    compact_model = None
+    if supports_early_exit(model):
+        print("\n" + "=" * 60)
+        print("COMPACT FOREST ARTIFACT")
+        print("=" * 60)
+        compact = CompactForest(model, leaf_bits=args.compact_leaf_bits)
+        report = compression_report(model, compact, scaler.transform(X_test))
+        print_compression_report(report)
+        compact_model = (compact, report)
     
     # Save model
-    save_model(model, scaler, label_encoder, feature_columns)
+    other_models = {name: m for name, m in models.items() if name != backend}
+    save_model(model, scaler, label_encoder, feature_columns, cascade=cascade,
+               backend=backend, other_models=other_models, leaderboard=leaderboard,
+               drift_reference=drift_reference, compact_model=compact_model)
     
     print("\n" + "=" * 60)
     print("TRAINING COMPLETE!")
@@ -302,6 +589,12 @@ def main():
     print(f"  - {MODEL_PATH}")
     print(f"  - {SCALER_PATH}")
     print(f"  - {ENCODER_PATH}")
+    print(f"  - {SCREENING_PATH}")
+    print(f"  - {DRIFT_REFERENCE_PATH}")
+    if compact_model is not None:
+        print(f"  - {COMPACT_MODEL_PATH}")
+    for name in other_models:
+        print(f"  - {backend_path(SCRIPT_DIR, name)}")
     print("\nYou can now use the fraud_predictor.py for real-time predictions.")
 
 
@@ -0,0 +1,182 @@
+"""
+Per-Account Velocity Features
+Bounded-memory sliding windows over recent activity of each sending account,
+shared by the online scoring path and the offline training replay
+"""
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# One bucket per PaySim step (1 step = 1 hour), 24 buckets = the 24h window
+WINDOW_STEPS = 24
+
+VELOCITY_FEATURES = [
+    'origTxCount1h', 'origAmountSum1h',
+    'origTxCount24h', 'origAmountSum24h',
+    'origDistinctDest24h'
+]
+
+# Accounts tracked before the least recently active one is evicted
+DEFAULT_MAX_ACCOUNTS = 100000
+
+# Rows allocated by the first write; capacity then doubles up to max_accounts
+_INITIAL_ROWS = 1024
+
+# Stamp of a bucket that has never been written
+_EMPTY_STAMP = -(1 << 62)
+
+# Bits per bucket in the distinct-recipient bitmap (linear counting)
+_DEST_BITS = 64
+
+
+def _dest_bit(name_dest: str) -> int:
+    return 1 << (zlib.crc32(str(name_dest).encode('utf-8')) % _DEST_BITS)
+
+
+def _estimate_distinct(bitmap: int) -> float:
+    """Linear-counting estimate of distinct recipients from an OR-ed bitmap"""
+    ones = bitmap.bit_count()
+    if ones >= _DEST_BITS:
+        ones = _DEST_BITS - 1
+    return float(round(-_DEST_BITS * np.log(1 - ones / _DEST_BITS), 1))
+
+
+class VelocityStore:
+    """
+    Time-bucketed ring buffers per sending account with LRU eviction
+
+    Each tracked account owns one row of fixed-size arrays (24 hourly
+    buckets of count, amount sum and recipient bitmap), so memory is
+    bounded by max_accounts and every update or lookup is O(1). Rows are
+    allocated as accounts arrive, doubling up to max_accounts, so a store
+    that is never written (e.g. a shadow candidate's) costs nothing.
+    """
+
+    def __init__(self, max_accounts: int = DEFAULT_MAX_ACCOUNTS):
+        self.max_accounts = max_accounts
+        self.counts = np.zeros((0, WINDOW_STEPS), dtype=np.uint32)
+        self.sums = np.zeros((0, WINDOW_STEPS), dtype=np.float64)
+        self.stamps = np.full((0, WINDOW_STEPS), _EMPTY_STAMP, dtype=np.int64)
+        self.dest_bits = np.zeros((0, WINDOW_STEPS), dtype=np.uint64)
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _grow(self):
+        rows = min(self.max_accounts, max(_INITIAL_ROWS, 2 * len(self.stamps))) - len(self.stamps)
+        self.counts = np.concatenate([self.counts, np.zeros((rows, WINDOW_STEPS), dtype=np.uint32)])
+        self.sums = np.concatenate([self.sums, np.zeros((rows, WINDOW_STEPS), dtype=np.float64)])
+        self.stamps = np.concatenate([self.stamps, np.full((rows, WINDOW_STEPS), _EMPTY_STAMP, dtype=np.int64)])
+        self.dest_bits = np.concatenate([self.dest_bits, np.zeros((rows, WINDOW_STEPS), dtype=np.uint64)])
+
+    def _slot(self, account_id: str, create: bool) -> Optional[int]:
+        slot = self._slots.get(account_id)
+        if slot is not None:
+            self._slots.move_to_end(account_id)
+            return slot
+        if not create:
+            return None
+        if len(self._slots) < self.max_accounts:
+            slot = len(self._slots)
+            if slot == len(self.stamps):
+                self._grow()
+        else:
+            # Reuse the least recently active account's row
+            _, slot = self._slots.popitem(last=False)
+            self.stamps[slot] = _EMPTY_STAMP
+            self.evictions += 1
+        self._slots[account_id] = slot
+        return slot
+
+    def _features(self, slot: Optional[int], step: int) -> Dict[str, float]:
+        if slot is None:
+            return dict.fromkeys(VELOCITY_FEATURES, 0)
+        stamps = self.stamps[slot]
+        valid = (stamps > step - WINDOW_STEPS) & (stamps <= step)
+        current = step % WINDOW_STEPS
+        in_hour = stamps[current] == step
+        bitmap = int(np.bitwise_or.reduce(self.dest_bits[slot][valid])) if valid.any() else 0
+        return {
+            'origTxCount1h': int(self.counts[slot, current]) if in_hour else 0,
+            'origAmountSum1h': float(self.sums[slot, current]) if in_hour else 0.0,
+            'origTxCount24h': int(self.counts[slot][valid].sum()),
+            'origAmountSum24h': float(self.sums[slot][valid].sum()),
+            'origDistinctDest24h': _estimate_distinct(bitmap)
+        }
+
+    def lookup(self, account_id: str, step: int) -> Dict[str, float]:
+        """Velocity features for an account as of a step, without recording anything"""
+        with self._lock:
+            return self._features(self._slot(account_id, create=False), step)
+
+    def observe(self, account_id: str, step: int, amount: float, name_dest: str) -> Dict[str, float]:
+        """
+        Return the account's velocity features prior to this transaction,
+        then record the transaction in its current bucket
+        """
+        with self._lock:
+            slot = self._slot(account_id, create=True)
+            features = self._features(slot, step)
+            bucket = step % WINDOW_STEPS
+            if self.stamps[slot, bucket] != step:
+                self.stamps[slot, bucket] = step
+                self.counts[slot, bucket] = 0
+                self.sums[slot, bucket] = 0.0
+                self.dest_bits[slot, bucket] = 0
+            self.counts[slot, bucket] += 1
+            self.sums[slot, bucket] += amount
+            self.dest_bits[slot, bucket] |= np.uint64(_dest_bit(name_dest))
+            return features
+
+    def get_info(self) -> Dict:
+        nbytes = self.counts.nbytes + self.sums.nbytes + self.stamps.nbytes + self.dest_bits.nbytes
+        return {
+            'tracked_accounts': len(self._slots),
+            'max_accounts': self.max_accounts,
+            'allocated_accounts': len(self.stamps),
+            'evictions': self.evictions,
+            'memory_mb': round(nbytes / 1e6, 2)
+        }
+
+
+def current_step() -> int:
+    """Wall-clock hour used as the step for live transactions without one"""
+    return int(time.time() // 3600)
+
+
+def add_velocity_features(df: pd.DataFrame, max_accounts: int = DEFAULT_MAX_ACCOUNTS,
+                          store: Optional[VelocityStore] = None) -> pd.DataFrame:
+    """
+    Replay transactions in step order through a VelocityStore and attach
+    the same features the scoring path computes
+
+    Args:
+        df: PaySim frame with step, amount, nameOrig and nameDest
+        max_accounts: Memory cap for the replay. Defaults to the serving
+            cap so evictions during training match production.
+        store: Store to continue replaying into, e.g. across the chunks of
+            a stream in step order (max_accounts is then ignored)
+    """
+    order = np.argsort(df['step'].to_numpy(), kind='stable')
+    store = store if store is not None else VelocityStore(max_accounts)
+
+    steps = df['step'].to_numpy()[order]
+    amounts = df['amount'].to_numpy(dtype=np.float64)[order]
+    origs = df['nameOrig'].to_numpy()[order]
+    dests = df['nameDest'].to_numpy()[order]
+
+    values = np.zeros((len(df), len(VELOCITY_FEATURES)), dtype=np.float64)
+    for i in range(len(df)):
+        features = store.observe(origs[i], int(steps[i]), float(amounts[i]), dests[i])
+        values[order[i]] = [features[name] for name in VELOCITY_FEATURES]
+
+    df = df.copy()
+    for j, name in enumerate(VELOCITY_FEATURES):
+        df[name] = values[:, j]
+    return df
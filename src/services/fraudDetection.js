@@ -58,6 +58,51 @@ export const analyzeTransaction = async (transaction) => {
   }
 };
 
+/**
+ * Risk curve of a transaction over a range of amounts, scored in one request
+ * @param {Object} transaction - Transaction details (amount is ignored)
+ * @param {Object} range - { minAmount, maxAmount, points, scale: 'linear' | 'log' }
+ * @returns {Promise<Object|null>} Curve and max safe amount, or null if unavailable
+ */
+export const analyzeAmountSweep = async (transaction, range = {}) => {
+  try {
+    const senderBalance = parseFloat(transaction.senderBalance) || 0;
+    const response = await fetch(`${FRAUD_API_URL}/analyze/sweep`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        sender_id: transaction.senderId || 'C0000000000',
+        recipient_id: transaction.recipientId || 'C0000000000',
+        sender_balance: senderBalance,
+        recipient_balance: parseFloat(transaction.recipientBalance) || 0,
+        transaction_type: transaction.type || 'transfer',
+        min_amount: range.minAmount || 1,
+        max_amount: range.maxAmount || senderBalance,
+        points: range.points || 100,
+        scale: range.scale || 'linear',
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Amount sweep unavailable');
+    }
+
+    const result = await response.json();
+    return {
+      amounts: result.amounts,
+      fraudProbability: result.fraud_probability,
+      riskLevel: result.risk_level,
+      bands: result.bands,
+      maxSafeAmount: result.max_safe_amount,
+    };
+  } catch (error) {
+    // No curve to show; single-amount analysis still works
+    return null;
+  }
+};
+
 /**
  * Check if the fraud detection service is available
  * @returns {Promise<boolean>}
@@ -217,6 +262,7 @@ export const analyzeTransactionBatch = async (transactions) => {
 
 export default {
   analyzeTransaction,
+  analyzeAmountSweep,
   checkFraudServiceHealth,
   getModelInfo,
   analyzeTransactionBatch,